@@ -97,6 +97,7 @@ async def setup_tools():
     # mcp.tool(project_service.update_nc_code)
     # mcp.tool(project_service.get_product_logs_by_project_id)
     # mcp.tool(project_service.get_machine_status_info)
+    return machine_service
     
     
 # import asyncio
@@ -105,9 +106,13 @@ async def setup_tools():
 
 async def run_mcp():
     await setup_resources()
-    await setup_tools()            
+    machine_service = await setup_tools()
     await history_logger.initialize()
-    await mcp.run_async(transport="stdio")
+    try:
+        await mcp.run_async(transport="stdio")
+    finally:
+        # 종료 시 Torus Gateway 연결 풀 정리
+        await machine_service.aclose()
 
 import anyio
 anyio.run(run_mcp)
\ No newline at end of file
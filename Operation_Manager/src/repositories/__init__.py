@@ -1,11 +1,68 @@
 import os
+from typing import Optional
+
+from src.repositories.database import get_grid_fs
+from src.repositories.file import FileRepository
 from src.repositories.machine import MachineRepository
+from src.utils.cache import build_cache_classes
+
+TORUS_MANUAL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'torus_manual')
 
 # --- Torus Gateway API 연동 리포지토리 반환 ---
 async def get_machine_repository() -> MachineRepository:
     """
     Torus Gateway 외부 API와 연동하는 머신 리포지토리 반환.
     환경 변수 TORUS_GATEWAY_URL 사용
+    TORUS_BATCH_SIZE > 0 이면 get_data 호출을 POST /batch로 묶어 전송 (배치 엔드포인트를 지원하는 서버 전용)
+    TORUS_HTTP_POOL=0 이면 연결 풀을 쓰지 않고 호출마다 새 연결 사용
+    TORUS_HTTP_MAX_CONNECTIONS / TORUS_HTTP_MAX_KEEPALIVE / TORUS_HTTP_KEEPALIVE_EXPIRY: 연결 풀 크기와 유휴 연결 유지 시간(초)
+    TORUS_HTTP2=1 이면 HTTP/2 사용, TORUS_HTTP_TIMEOUT: 요청 타임아웃(초)
+    TORUS_MACHINE_CONCURRENCY: 장비 하나에 동시에 보낼 최대 요청 수 (게이트웨이 전체는 TORUS_HTTP_MAX_CONNECTIONS)
+    TORUS_ADAPTIVE_LIMIT=0 이면 동시 요청 수를 응답 지연/오류에 따라 조정하지 않고 최대값으로 고정
+    TORUS_COALESCE=0 이면 동시에 진행 중인 같은 get_data 요청을 병합하지 않음
+    TORUS_CACHE=0 이면 get_data 읽기 캐시를 쓰지 않음 (캐시 등급은 torus_manual의 api_category.yaml/uri_params.json 기준)
+    TORUS_CACHE_SIZE: 캐시 최대 항목 수
+    TORUS_BREAKER_THRESHOLD: 장비별 회로 차단기를 여는 연속 실패 횟수 (0이면 사용 안 함), TORUS_RETRIES: get_data 일시적 오류 재시도 횟수
+    TORUS_FAST_JSON=0 이면 get_data 응답을 orjson 대신 표준 json으로 디코딩
+    TORUS_NC_DIR_TTL / TORUS_NC_INDEX_TTL: NC 업로드 시 루트 경로·폴더 존재 / 폴더 파일 목록 캐시 시간(초, 0이면 매번 조회)
     """
     torus_url = os.getenv("TORUS_GATEWAY_URL", "http://localhost:8000")
-    return MachineRepository(torus_url)
\ No newline at end of file
+    batch_size = int(os.getenv("TORUS_BATCH_SIZE", "0"))
+    cache_classes = None
+    if os.getenv("TORUS_CACHE", "1") != "0":
+        cache_classes = build_cache_classes(
+            os.path.join(TORUS_MANUAL_DIR, 'api_category.yaml'),
+            os.path.join(TORUS_MANUAL_DIR, 'uri_params.json'),
+        )
+    return MachineRepository(
+        torus_url,
+        batch_size=batch_size,
+        pooled=os.getenv("TORUS_HTTP_POOL", "1") != "0",
+        max_connections=int(os.getenv("TORUS_HTTP_MAX_CONNECTIONS", "20")),
+        max_keepalive_connections=int(os.getenv("TORUS_HTTP_MAX_KEEPALIVE", "20")),
+        keepalive_expiry=float(os.getenv("TORUS_HTTP_KEEPALIVE_EXPIRY", "30")),
+        http2=os.getenv("TORUS_HTTP2", "0") == "1",
+        timeout=float(os.getenv("TORUS_HTTP_TIMEOUT", "5")),
+        machine_concurrency=int(os.getenv("TORUS_MACHINE_CONCURRENCY", "8")),
+        adaptive=os.getenv("TORUS_ADAPTIVE_LIMIT", "1") != "0",
+        coalesce=os.getenv("TORUS_COALESCE", "1") != "0",
+        cache_classes=cache_classes,
+        cache_size=int(os.getenv("TORUS_CACHE_SIZE", "10000")),
+        breaker_threshold=int(os.getenv("TORUS_BREAKER_THRESHOLD", "5")),
+        retries=int(os.getenv("TORUS_RETRIES", "2")),
+        nc_dir_ttl=float(os.getenv("TORUS_NC_DIR_TTL", "60")),
+        nc_index_ttl=float(os.getenv("TORUS_NC_INDEX_TTL", "10")),
+        fast_json=os.getenv("TORUS_FAST_JSON", "1") != "0",
+    )
+
+
+# --- GridFS 파일 리포지토리 반환 ---
+async def get_file_repository() -> Optional[FileRepository]:
+    """
+    NC 파일이 저장된 GridFS(files 버킷) 리포지토리 반환.
+    환경 변수 MONGO_URL / DATABASE_NAME 사용 (src/repositories/database.py).
+    MONGO_URL이 설정되지 않았으면 None (NC 파일 업로드를 사용하지 않는 구성)
+    """
+    if not os.getenv("MONGO_URL"):
+        return None
+    return FileRepository(await get_grid_fs())
@@ -0,0 +1,33 @@
+# src/repositories/database.py
+import os
+from functools import lru_cache
+from typing import Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase, AsyncIOMotorGridFSBucket
+
+MONGO_URL = os.getenv("MONGO_URL", "mongodb://mongo:27017")
+DATABASE_NAME = os.getenv("DATABASE_NAME", "iso14649")
+
+
+@lru_cache()
+def get_motor_client() -> AsyncIOMotorClient:
+    """
+    MongoDB 클라이언트(싱글턴) 반환.
+    - 실제 연결은 첫 요청 때 맺으므로 만들기만 해서는 MongoDB에 접속하지 않음
+    """
+    return AsyncIOMotorClient(MONGO_URL)
+
+
+async def get_db() -> AsyncIOMotorDatabase:
+    """비동기 MongoDB 데이터베이스 핸들러 반환"""
+    return get_motor_client()[DATABASE_NAME]
+
+
+async def get_grid_fs(db: Optional[AsyncIOMotorDatabase] = None) -> AsyncIOMotorGridFSBucket:
+    """
+    NC 파일이 저장된 GridFS 버킷(files) 핸들러 반환.
+    - db가 None이면 내부에서 get_db() 호출
+    """
+    if db is None:
+        db = await get_db()
+    return AsyncIOMotorGridFSBucket(db, bucket_name="files")
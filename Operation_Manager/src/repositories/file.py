@@ -0,0 +1,76 @@
+# src/repositories/file.py
+import io
+import inspect
+from typing import AsyncIterator, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from gridfs.errors import NoFile
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+
+from src.utils.exceptions import CustomException, ExceptionEnum
+
+
+class GridFSFileStream:
+    """
+    GridFS 파일을 청크(기본 255 KiB) 단위로 읽는 스트림.
+    파일 전체를 메모리에 올리지 않으므로 파일 크기와 상관없이 청크 하나만큼의 메모리만 사용한다.
+    """
+
+    def __init__(self, grid_out):
+        self._grid_out = grid_out
+        self.filename: str = grid_out.filename
+        self.length: int = grid_out.length
+        self.chunk_size: int = grid_out.chunk_size
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        """저장된 청크를 순서대로 하나씩 반환"""
+        while True:
+            chunk = await self._grid_out.readchunk()
+            if not chunk:
+                break
+            yield chunk
+
+    async def close(self):
+        """GridFS 읽기 스트림 닫기"""
+        result = self._grid_out.close()
+        if inspect.isawaitable(result):
+            await result
+
+
+class FileRepository:
+    """
+    GridFS(files 버킷)에 저장된 NC 파일을 조회하는 리포지토리.
+    """
+
+    def __init__(self, bucket: AsyncIOMotorGridFSBucket):
+        """
+        :param bucket: GridFS 버킷 (src.repositories.database.get_grid_fs)
+        """
+        self.bucket = bucket
+
+    async def open_file_stream(self, file_id: str) -> GridFSFileStream:
+        """
+        파일을 청크 단위로 읽을 스트림을 연다.
+        :param file_id: GridFS 파일 ID
+        :raises CustomException: 파일이 없거나 ID 형식이 잘못된 경우 (NC_NOT_FOUND)
+        """
+        try:
+            grid_out = await self.bucket.open_download_stream(ObjectId(file_id))
+        except (NoFile, InvalidId, TypeError) as e:
+            raise CustomException(ExceptionEnum.NC_NOT_FOUND, detail=str(e))
+        except Exception as e:
+            raise CustomException(ExceptionEnum.DATABASE_ERROR, detail=str(e))
+        return GridFSFileStream(grid_out)
+
+    async def get_file_byteio_and_name(self, file_id: str) -> Tuple[io.BytesIO, str]:
+        """
+        파일 전체를 메모리로 읽어 (BytesIO, 파일명)으로 반환.
+        큰 파일은 open_file_stream으로 청크 단위로 읽는 것이 좋다.
+        """
+        stream = await self.open_file_stream(file_id)
+        buffer = io.BytesIO()
+        async for chunk in stream.chunks():
+            buffer.write(chunk)
+        buffer.seek(0)
+        return buffer, stream.filename
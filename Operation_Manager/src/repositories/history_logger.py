@@ -1,17 +1,20 @@
 # services/history_logger.py
 from datetime import datetime
 from datetime import timedelta
-from database import get_db
+from src.repositories.database import get_db
 from typing import Optional, Dict, Any, List
 from pymongo import DESCENDING
 from zoneinfo import ZoneInfo
 import asyncio
+import os
 
 class APIHistoryLogger:
     def __init__(self):
         self.db = None
         self.history_coll = None
         self.error_coll = None
+        # HISTORY_LOG_ENABLED=0 이면 log_batch 저장 생략 (MongoDB 없이 부하 테스트 등)
+        self.enabled = os.getenv("HISTORY_LOG_ENABLED", "1") != "0"
 
     async def initialize(self):
         """초기화"""
@@ -38,6 +41,9 @@ class APIHistoryLogger:
         API 호출 결과 일괄 저장 (문서당 하나의 로그)
         에러 여부에 따라 서로 다른 컬렉션에 저장합니다.
         """
+        if not self.enabled:
+            return
+
         if self.history_coll is None or self.error_coll is None:
             await self.initialize()
 
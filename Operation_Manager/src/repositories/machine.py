@@ -1,17 +1,326 @@
+import asyncio
+import copy
 import httpx
 import logging
+import random
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
 from src.utils.exceptions import CustomException, ExceptionEnum
+from src.utils.breaker import CircuitBreaker, CircuitOpenError
+from src.utils.cache import TTL_CLASSES, NcPathCache, TTLCache
+from src.utils.limiter import AdaptiveLimiter
+
+# 장비와 통신할 수 없음을 뜻하는 TORUS 응답 코드 (회로 차단기 실패로 집계하고 재시도)
+LINK_FAILURE_CODES = {
+    565575680,  # NC와의 통신에 실패
+    565714944,  # 해당 NC와의 통신 중에 HANDLE에 문제가 발생
+    558891036,  # LibRpcClient Connect 오류
+    558891055,  # LibRpcClient TimeOut 오류
+}
+LINK_STATE_ENDPOINT = "/machine/ncLinkState"
+
+
+class _LinkFailure(Exception):
+    """get_data 응답이 LINK_FAILURE_CODES인 경우 (세션에서 실패로 집계하기 위한 내부 예외)"""
+
+    def __init__(self, error: dict):
+        super().__init__(f"{error['status_hex']}: {error['message']}")
+        self.error = error
+
+
+def error_record(status: int, message: str, endpoint: str, params: dict, retry_after: float = None) -> dict:
+    """
+    get_data 에러 객체. 에러 종류와 상관없이 항상 같은 키를 가진다.
+    - status: TORUS 에러 코드 (HTTP/연결 오류와 회로 차단은 -1), status_hex: 16진수 코드 (-1이면 None)
+    - retry_after: 회로가 열린 장비면 다음 점검까지 남은 시간(초), 그 외에는 None
+    """
+    return {
+        "__error__": True,
+        "status": status,
+        "status_hex": hex(status) if status >= 0 else None,
+        "message": message,
+        "endpoint": endpoint,
+        "params": params,
+        "retry_after": retry_after,
+    }
+
 
 class MachineRepository:
     """
     Torus Gateway API와 통신하여 CNC 장비의 정보, NC 파일 관리, 상태 조회 등의 기능을 제공하는 리포지토리.
     """
 
-    def __init__(self, base_url: str):
+    def __init__(self, base_url: str, batch_size: int = 0, batch_window: float = 0.002,
+                 pooled: bool = True, max_connections: int = 20, max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30.0, http2: bool = False, timeout: float = 5.0,
+                 machine_concurrency: int = 8, adaptive: bool = True, coalesce: bool = True,
+                 cache_classes: dict = None, cache_ttls: dict = None, cache_size: int = 10000,
+                 breaker_threshold: int = 5, probe_interval: float = 1.0, max_probe_interval: float = 30.0,
+                 retries: int = 2, retry_backoff: float = 0.05, max_retry_backoff: float = 0.5,
+                 nc_dir_ttl: float = 60.0, nc_index_ttl: float = 10.0, fast_json: bool = True):
         """
         :param base_url: Torus Gateway API의 기본 URL (ex: http://host.docker.internal:5001)
+        :param batch_size: 0보다 크면 배치 모드 사용. get_data 호출을 장비별로 모아 POST /batch 한 번에 최대 batch_size개씩 전송
+            (장비별 제한기, 회로 차단기, 재시도는 개별 요청과 같이 적용)
+        :param batch_window: 배치 모드에서 호출을 모으는 최대 대기 시간(초)
+        :param pooled: True면 리포지토리 수명 동안 하나의 httpx 클라이언트(연결 풀)를 재사용, False면 호출마다 새 클라이언트
+        :param max_connections: 연결 풀의 최대 동시 연결 수
+        :param max_keepalive_connections: 요청 후 유지할 최대 유휴(keep-alive) 연결 수
+        :param keepalive_expiry: 유휴 연결 유지 시간(초)
+        :param http2: HTTP/2 사용 여부 (h2 패키지가 없으면 HTTP/1.1로 동작)
+        :param timeout: 연결/읽기/쓰기/풀 대기 타임아웃(초)
+        :param machine_concurrency: 장비 하나에 동시에 보낼 최대 요청 수
+        :param adaptive: True면 동시 요청 수(게이트웨이 전체: max_connections 이하, 장비별: machine_concurrency 이하)를
+            응답 지연/오류에 따라 AIMD 방식으로 조정, False면 최대값으로 고정
+        :param coalesce: True면 동시에 진행 중인 같은 get_data 요청(endpoint+params)을 하나로 병합
+        :param cache_classes: {엔드포인트: 캐시 등급} (build_cache_classes 결과). 주면 get_data 결과를 등급별 TTL 동안 캐시
+        :param cache_ttls: 등급별 유지 시간(초) 변경 (기본값 TTL_CLASSES)
+        :param cache_size: 캐시 최대 항목 수 (넘으면 가장 오래 사용하지 않은 항목부터 제거)
+        :param breaker_threshold: 장비별 연속 실패가 이 횟수에 도달하면 회로를 열고 요청을 바로 실패 처리 (0이면 사용 안 함)
+        :param probe_interval / max_probe_interval: 회로가 열린 장비의 ncLinkState 점검 간격(초)의 시작값/최대값
+        :param retries: get_data의 일시적 오류(연결 실패, 502/503/504, NC 통신 실패 코드) 재시도 횟수
+        :param retry_backoff / max_retry_backoff: 재시도 대기 시간(초) 상한의 시작값/최대값 (0~상한 사이 임의 대기)
+        :param nc_dir_ttl: NC 루트 경로와 존재가 확인된 폴더를 캐시할 시간(초, 0이면 매번 조회)
+        :param nc_index_ttl: NC 폴더 파일 목록을 캐시할 시간(초, 0이면 매번 조회)
+        :param fast_json: get_data 응답을 orjson으로 디코딩 (orjson 패키지가 없으면 표준 json)
         """
         self.base_url = base_url
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self._batch_pending = []  # (endpoint, params, future) 대기열
+        self._batch_timer = None
+
+        self.pooled = pooled
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(timeout)
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logging.warning("h2 패키지가 없어 HTTP/1.1로 연결합니다 (pip install httpx[http2])")
+                http2 = False
+        self.http2 = http2
+        self._client = None
+
+        # get_data 응답 디코더 (orjson.loads는 bytes를 바로 디코딩하므로 response.json()보다 빠름)
+        self._json_loads = None
+        if fast_json:
+            try:
+                import orjson
+                self._json_loads = orjson.loads
+            except ImportError:
+                logging.warning("orjson 패키지가 없어 표준 json으로 디코딩합니다 (pip install orjson)")
+        self.fast_json = self._json_loads is not None
+
+        # 게이트웨이 전체/장비별 동시 요청 수 제한. 제한을 넘는 요청은 여기서 대기
+        # (httpcore 풀 대기열은 대기 요청이 많을수록 요청마다 대기열 전체를 훑어 느려짐)
+        self.adaptive = adaptive
+        self.machine_concurrency = machine_concurrency
+        self._global_limiter = self._new_limiter(max_connections)
+        self._machine_limiters = {}
+
+        # 진행 중인 get_data 요청 (요청 키 -> [태스크, 호출자 수])
+        self.coalesce = coalesce
+        self._inflight = {}
+        self._coalesce_stats = {"requests": 0, "upstream": 0, "hits": 0, "merged": 0}
+
+        # get_data 읽기 캐시. 목록에 없는 엔드포인트와 TTL이 0인 등급(live)은 캐시하지 않음
+        self._cache_classes = cache_classes or {}
+        self.cache_ttls = {**TTL_CLASSES, **(cache_ttls or {})}
+        self._cache = TTLCache(cache_size) if cache_classes else None
+        self._cache_bypass = 0
+
+        # 장비별 회로 차단기와 재시도
+        self.breaker_threshold = breaker_threshold
+        self.probe_interval = probe_interval
+        self.max_probe_interval = max_probe_interval
+        self._breakers = {}
+        self._probes = {}  # 장비 -> 점검 태스크
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+
+        # NC 업로드용 원격 경로 상태 (루트 경로, 존재하는 폴더, 폴더별 파일 목록)
+        self._nc_paths = NcPathCache(nc_dir_ttl, nc_index_ttl)
+
+    def _new_limiter(self, max_limit: int) -> AdaptiveLimiter:
+        if self.adaptive:
+            return AdaptiveLimiter(initial=max_limit, max_limit=max_limit)
+        return AdaptiveLimiter(initial=max_limit, min_limit=max_limit, max_limit=max_limit)
+
+    def _machine_limiter(self, machine) -> AdaptiveLimiter:
+        key = str(machine)  # 1과 "1"을 같은 장비로
+        limiter = self._machine_limiters.get(key)
+        if limiter is None:
+            limiter = self._machine_limiters[key] = self._new_limiter(self.machine_concurrency)
+        return limiter
+
+    def limiter_stats(self) -> dict:
+        """게이트웨이 전체/장비별 동시 요청 제한 상태 (현재 window, 처리 중/대기 요청 수, 증가/감소 횟수 등)"""
+        return {
+            "global": self._global_limiter.snapshot(),
+            "machines": {machine: limiter.snapshot() for machine, limiter in self._machine_limiters.items()},
+        }
+
+    @staticmethod
+    def _is_overload(e: Exception) -> bool:
+        """게이트웨이 과부하로 볼 오류 (타임아웃/연결 오류, 429/5xx 응답). 장비 상태 오류 등은 제외"""
+        if isinstance(e, httpx.HTTPStatusError):
+            return e.response.status_code == 429 or e.response.status_code >= 500
+        return isinstance(e, httpx.TransportError)
+
+    def _breaker(self, machine) -> CircuitBreaker:
+        key = str(machine)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = self._breakers[key] = CircuitBreaker(
+                self.breaker_threshold, self.probe_interval, self.max_probe_interval)
+        return breaker
+
+    def breaker_stats(self) -> dict:
+        """장비별 회로 차단기 상태 (state, 연속 실패 수, 열린 이유, 다음 점검까지 남은 시간 등)"""
+        return {machine: breaker.snapshot() for machine, breaker in self._breakers.items()}
+
+    @staticmethod
+    def _is_machine_failure(e: Exception) -> bool:
+        """장비(또는 게이트웨이의 장비 연결) 장애로 볼 오류. 429(과부하)와 장비 상태 오류는 제외"""
+        if isinstance(e, httpx.HTTPStatusError):
+            return e.response.status_code >= 500
+        return isinstance(e, (httpx.TransportError, _LinkFailure))
+
+    @staticmethod
+    def _is_transient(e: Exception) -> bool:
+        """
+        재시도할 오류. 타임아웃까지 기다린 요청(ReadTimeout 등)은 재시도하면 대기 시간만 늘어나므로 제외
+        """
+        if isinstance(e, httpx.HTTPStatusError):
+            return e.response.status_code in (502, 503, 504)
+        return isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout, httpx.ReadError, httpx.WriteError,
+                              httpx.RemoteProtocolError, _LinkFailure))
+
+    def _open_circuit(self, machine, breaker: CircuitBreaker, reason: str):
+        """회로를 열고 백그라운드 점검을 시작"""
+        breaker.trip(reason)
+        key = str(machine)
+        if key not in self._probes:
+            logging.warning(f"장비 {machine} 회로 차단: {reason}")
+            self._probes[key] = asyncio.create_task(self._probe(machine, breaker))
+
+    async def _probe(self, machine, breaker: CircuitBreaker):
+        """회로가 열린 장비의 ncLinkState를 점점 긴 간격으로 조회해, 연결되어 있으면 회로를 닫는다"""
+        try:
+            while breaker.is_open:
+                await asyncio.sleep(breaker.next_probe_delay())
+                try:
+                    async with self._session(machine, probe=True) as client:
+                        response = await client.get(f"{self.base_url}{LINK_STATE_ENDPOINT}",
+                                                    params={"machine": machine})
+                        response.raise_for_status()
+                        data = self._decode(response)
+                    value = self._unwrap_response(LINK_STATE_ENDPOINT, {"machine": machine}, data)
+                except Exception as e:
+                    breaker.reason = f"probe failed: {type(e).__name__}: {e}"
+                    continue
+                if self._link_up(value):
+                    logging.info(f"장비 {machine} 회로 복구")
+                    breaker.close()
+                else:
+                    breaker.reason = f"probe: ncLinkState={value}"
+        finally:
+            self._probes.pop(str(machine), None)
+
+    @staticmethod
+    def _link_up(value) -> bool:
+        """ncLinkState 응답 값(True 또는 [True])이 연결 상태인지 (에러 객체면 False)"""
+        if isinstance(value, dict):
+            return False
+        if isinstance(value, list):
+            return bool(value) and bool(value[0])
+        return bool(value)
+
+    def _decode(self, response: httpx.Response):
+        """응답 본문 JSON 디코딩 (fast_json이면 orjson)"""
+        if self._json_loads is not None:
+            return self._json_loads(response.content)
+        return response.json()
+
+    def _new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(verify=False, limits=self.limits, timeout=self.timeout, http2=self.http2)
+
+    @asynccontextmanager
+    async def _session(self, machine=None, probe: bool = False, bulk: bool = False):
+        """
+        요청에 사용할 httpx 클라이언트.
+        풀 사용 시 공유 클라이언트를 처음 필요할 때 만들어 재사용하고 (닫지 않음), 아니면 호출마다 새로 만들어 닫는다.
+        machine을 주면 장비별 제한, 이어서 게이트웨이 전체 제한의 자리를 얻은 뒤 요청하고,
+        종료 시 소요 시간과 과부하 오류 여부를 두 제한기에 알려 window를 조정한다.
+        장비의 회로가 열려 있으면 요청하지 않고 CircuitOpenError를 발생시키며 (probe=True인 점검 요청은 제외),
+        장비 장애로 볼 오류가 이어지면 회로를 연다.
+        bulk=True(파일 전송 등)면 소요 시간이 데이터 크기에 비례하므로 제한기 window 조정에 반영하지 않는다.
+        """
+        limiters = [self._global_limiter]
+        breaker = None
+        if machine is not None:
+            # 장비별 자리를 먼저 얻어야 한 장비에 몰린 요청이 전체 자리를 차지하고 기다리지 않음
+            limiters.insert(0, self._machine_limiter(machine))
+            if self.breaker_threshold > 0 and not probe:
+                breaker = self._breaker(machine)
+        acquired = []
+        try:
+            for limiter in limiters:
+                if breaker is not None and breaker.is_open:
+                    # 자리를 기다리는 동안 회로가 열린 경우도 바로 실패
+                    raise breaker.reject(machine)
+                await limiter.acquire()
+                acquired.append(limiter)
+        except BaseException:
+            for limiter in acquired:
+                limiter.release()
+            raise
+
+        started = time.perf_counter()
+        ok = True
+        try:
+            if not self.pooled:
+                async with self._new_client() as client:
+                    yield client
+            else:
+                if self._client is None or self._client.is_closed:
+                    self._client = self._new_client()
+                yield self._client
+        except asyncio.CancelledError:
+            ok = None
+            raise
+        except Exception as e:
+            if self._is_overload(e):
+                ok = False
+            if breaker is not None and self._is_machine_failure(e):
+                if breaker.record_failure(f"{type(e).__name__}: {e}"):
+                    self._open_circuit(machine, breaker, breaker.reason)
+            raise
+        else:
+            if breaker is not None:
+                breaker.record_success()
+        finally:
+            latency = time.perf_counter() - started
+            if bulk and ok:
+                ok = None
+            for limiter in acquired:
+                limiter.release(latency, ok)
+
+    async def aclose(self):
+        """장비 점검 태스크를 멈추고 공유 클라이언트의 연결 풀을 닫는다 (MCP 서버 종료 시 호출)"""
+        for task in list(self._probes.values()):
+            task.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     async def get_machine_list(self):
         """
@@ -20,98 +329,303 @@ class MachineRepository:
         :return: 장비 정보 리스트(dict)
         """
         try:
-            async with httpx.AsyncClient(verify=False) as client:
+            async with self._session() as client:
                 response = await client.get(f"{self.base_url}/machine/list")
                 response.raise_for_status()
                 raw_data = response.json()
                 status = raw_data.get("status", 0)
                 if status != 0:
                     raise CustomException(ExceptionEnum.EXTERNAL_REQUEST_ERROR)
-                return raw_data.get("value", [])
+                value = raw_data.get("value", raw_data)
+                if isinstance(value, dict):
+                    # {"machines": [...]} 형식 (모의 서버)
+                    value = value.get("machines", [])
+                return value
         except Exception as e:
             raise CustomException(ExceptionEnum.EXTERNAL_REQUEST_ERROR, detail=str(e))
 
-    async def get_data(self, endpoint: str, params: dict = None):
+    async def get_data(self, endpoint: str, params: dict = None, use_cache: bool = True):
         """
         주어진 endpoint 경로로 GET 요청을 전송하여 데이터를 반환합니다.
+        배치 모드(batch_size > 0)에서는 동시에 들어온 호출들을 모아 POST /batch로 전송합니다.
+        캐시(cache_classes)를 쓰면 유지 시간이 남은 이전 결과를 먼저 반환합니다.
+        같은 endpoint+params 요청이 이미 진행 중이면 새로 보내지 않고 그 결과를 함께 받습니다 (coalesce=True).
+        이때 호출자들은 같은 결과 객체를 공유하므로 결과를 수정하지 않아야 합니다.
+        (캐시에는 복사본을 저장하고 캐시 적중 시에도 복사본을 돌려주므로 캐시된 값은 호출자의 수정에 영향받지 않습니다.)
         
         :param endpoint: base_url 뒤에 붙는 API 경로 (예: '/machine/list')
         :param params: 요청 파라미터 (dict)
+        :param use_cache: False면 캐시된 결과를 쓰지 않고 새로 조회 (진행 중인 같은 요청에는 합류하고, 결과는 캐시에 저장)
         :raises CustomException: API 호출 실패 또는 상태 오류 시 (error_info 포함)
         :return: 응답 데이터의 value 필드 또는 전체 json
         """
-        try:
-            url = f"{self.base_url}{endpoint}"
-            async with httpx.AsyncClient(verify=False) as client:
-                response = await client.get(url, params=params)
-                data = response.json()
-            
-                status = data.get("status", 0)
-            
-                if status == 0:
-                # 성공 시 기존처럼 데이터만 반환
-                    return data.get("value", data)
+        key = self._request_key(endpoint, params)
+        ttl = 0.0
+        if self._cache is not None:
+            ttl_class = self._cache_classes.get(endpoint, "live")
+            ttl = self.cache_ttls.get(ttl_class, 0.0)
+            if ttl > 0:
+                if use_cache:
+                    hit, value = self._cache.get(key, ttl_class)
+                    if hit:
+                        # 캐시된 객체는 이후 호출자와 공유되므로 list/dict는 복사본을 돌려줌
+                        return copy.deepcopy(value) if isinstance(value, (list, dict)) else value
+            else:
+                self._cache_bypass += 1
+
+        if not self.coalesce:
+            return await self._load_data(endpoint, params, key, ttl)
+
+        self._coalesce_stats["requests"] += 1
+        entry = self._inflight.get(key)
+        if entry is None:
+            task = asyncio.create_task(self._load_data(endpoint, params, key, ttl))
+            entry = self._inflight[key] = [task, 1]
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            self._coalesce_stats["upstream"] += 1
+        else:
+            task = entry[0]
+            entry[1] += 1
+            self._coalesce_stats["hits"] += 1
+            if entry[1] == 2:
+                self._coalesce_stats["merged"] += 1
+        # 한 호출자가 취소되어도 같은 요청을 기다리는 다른 호출자에게는 영향이 없도록 shield
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def _request_key(endpoint: str, params: dict = None):
+        """요청 식별 키. 파라미터 순서와 값의 타입(1과 "1")에 상관없이 같은 쿼리 문자열이 되는 요청은 같은 키"""
+        return endpoint, tuple(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+
+    def coalesce_stats(self) -> dict:
+        """
+        get_data 요청 병합 통계.
+        requests: get_data 호출 수, upstream: 실제로 보낸 요청 수,
+        hits: 진행 중인 요청에 합류한 호출 수, merged: 두 명 이상의 호출자가 함께 받은 요청 수
+        """
+        stats = dict(self._coalesce_stats)
+        stats["hit_ratio"] = round(stats["hits"] / stats["requests"], 4) if stats["requests"] else 0.0
+        stats["in_flight"] = len(self._inflight)
+        return stats
+
+    def cache_stats(self) -> dict:
+        """
+        get_data 캐시 통계 (캐시를 쓰지 않으면 None).
+        hits/misses/hit_ratio: 캐시 대상 조회 기준 (전체와 등급별), bypass: 캐시하지 않는 엔드포인트 조회 수
+        """
+        if self._cache is None:
+            return None
+        return {**self._cache.stats(), "bypass": self._cache_bypass}
+
+    def clear_cache(self):
+        if self._cache is not None:
+            self._cache.clear()
+
+    async def _load_data(self, endpoint: str, params: dict, key, ttl: float):
+        """요청을 보내고 ttl > 0이면 정상 결과를 캐시에 저장 (에러 객체는 저장하지 않음)"""
+        result = await self._fetch_data(endpoint, params)
+        if ttl > 0 and not (isinstance(result, dict) and result.get("__error__")):
+            # 호출자가 받은 결과를 수정해도 캐시가 바뀌지 않도록 복사본을 저장
+            self._cache.set(key, copy.deepcopy(result) if isinstance(result, (list, dict)) else result, ttl)
+        return result
+
+    async def _fetch_data(self, endpoint: str, params: dict = None):
+        """
+        get_data의 실제 요청 (병합 없이 전송).
+        일시적 오류는 최대 retries번, 0~상한(retry_backoff부터 두 배씩, 최대 max_retry_backoff) 사이 임의 시간 뒤 재시도한다.
+        """
+        machine = (params or {}).get("machine")
+        url = f"{self.base_url}{endpoint}"
+        for attempt in range(self.retries + 1):
+            try:
+                if self.batch_size > 0:
+                    # 배치 전송도 장비별로 묶어 같은 세션(제한기, 회로 차단기)을 거치며 실패는 예외로 돌아옴
+                    result = await self._get_data_batched(endpoint, params)
                 else:
-                # 에러 시 에러 정보가 포함된 특별한 객체 반환
-                    return {
-                        "__error__": True,
-                        "status": status,
-                        "status_hex": hex(status),
-                        "message": data.get('message', 'No message'),
-                        "endpoint": endpoint,
-                        "params": params,
-                        "full_api_response": data
-                    }
-                
+                    async with self._session(machine) as client:
+                        response = await client.get(url, params=params)
+                        if response.status_code == 429 or response.status_code >= 500:
+                            # 과부하 응답은 연결 오류와 같이 처리 (동시 요청 수 제한기가 window를 줄이도록)
+                            response.raise_for_status()
+                        data = self._decode(response)
+                        result = self._unwrap_response(endpoint, params, data)
+                        if self._is_link_failure(result):
+                            raise _LinkFailure(result)
+            except CircuitOpenError as e:
+                return self._circuit_open_error(endpoint, params, e)
+            except Exception as e:
+                if attempt < self.retries and self._is_transient(e) and not (
+                        machine is not None and self.breaker_threshold > 0 and self._breaker(machine).is_open):
+                    backoff = min(self.max_retry_backoff, self.retry_backoff * 2 ** attempt)
+                    await asyncio.sleep(random.uniform(0, backoff))
+                    continue
+                if isinstance(e, _LinkFailure):
+                    return e.error
+                return self._connection_error(endpoint, params, e)
+
+            if endpoint == LINK_STATE_ENDPOINT and machine is not None and self.breaker_threshold > 0 \
+                    and not isinstance(result, dict) and not self._link_up(result):
+                self._open_circuit(machine, self._breaker(machine), "ncLinkState == false")
+            return result
+
+    @staticmethod
+    def _is_link_failure(result) -> bool:
+        """NC 통신 실패 코드(LINK_FAILURE_CODES)의 에러 객체인지"""
+        return isinstance(result, dict) and bool(result.get("__error__")) and result["status"] in LINK_FAILURE_CODES
+
+    def _unwrap_response(self, endpoint: str, params: dict, data):
+        """
+        TORUS 응답({"status": ..., "value": ...})에서 값을 꺼내거나 에러 객체를 만든다.
+        (모의 서버처럼 값만 반환하는 경우에는 그대로 반환)
+        """
+        if not isinstance(data, dict):
+            return data
+
+        status = data.get("status", 0)
+        if status == 0:
+            # 성공 시 기존처럼 데이터만 반환
+            return data.get("value", data)
+        # 에러 시 상태 코드와 메시지만 담은 에러 객체 반환 (원본 응답은 status/message와 중복이므로 담지 않음)
+        return error_record(status, data.get("message", "No message"), endpoint, params)
+
+    def _circuit_open_error(self, endpoint: str, params: dict, e: CircuitOpenError):
+        """회로가 열린 장비에 대한 get_data 에러 객체 (요청을 보내지 않음)"""
+        return error_record(-1, f"Machine Unavailable: {e}", endpoint, params, retry_after=round(e.retry_after, 2))
+
+    def _connection_error(self, endpoint: str, params: dict, e: Exception):
+        """HTTP/연결 오류를 get_data의 에러 객체 형식으로 변환"""
+        return error_record(-1, f"HTTP/Connection Error: {type(e).__name__}: {e}", endpoint, params)
+
+    async def _get_data_batched(self, endpoint: str, params: dict = None):
+        """
+        get_data 호출을 대기열에 넣고 결과를 기다린다.
+        대기열이 batch_size에 도달하거나 batch_window가 지나면 한 번의 POST /batch로 전송된다.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._batch_pending.append((endpoint, params, future))
+
+        if len(self._batch_pending) >= self.batch_size:
+            self._flush_batch()
+        elif self._batch_timer is None:
+            self._batch_timer = loop.call_later(self.batch_window, self._flush_batch)
+        return await future
+
+    def _flush_batch(self):
+        """대기열을 장비별로 나누고 batch_size 단위로 잘라 전송 태스크를 시작"""
+        if self._batch_timer is not None:
+            self._batch_timer.cancel()
+            self._batch_timer = None
+        pending, self._batch_pending = self._batch_pending, []
+        groups: Dict[object, list] = {}
+        for item in pending:
+            groups.setdefault((item[1] or {}).get("machine"), []).append(item)
+        for machine, items in groups.items():
+            for i in range(0, len(items), self.batch_size):
+                asyncio.create_task(self._send_batch(machine, items[i:i + self.batch_size]))
+
+    async def _send_batch(self, machine, items: list):
+        """
+        장비 하나의 get_data 호출들을 POST /batch로 보내고 항목별 결과를 각 호출자의 future에 전달.
+        항목별 status로 성공/실패를 따로 판단하므로 일부 실패가 다른 항목에 영향을 주지 않는다.
+        개별 요청과 같이 장비별 세션(제한기, 회로 차단기)을 거치며, 연결 오류/회로 차단/NC 통신 실패는
+        호출자(_fetch_data)에게 예외로 전달해 같은 재시도 정책을 적용한다.
+        NC 통신 실패 항목이 있으면 배치 요청 하나를 장비 장애 한 번으로 집계한다.
+        """
+        payload = [{"endpoint": endpoint, "params": params or {}} for endpoint, params, _ in items]
+        results = None
+        try:
+            async with self._session(machine) as client:
+                response = await client.post(f"{self.base_url}/batch", json=payload)
+                response.raise_for_status()
+                values = self._decode(response).get("value", [])
+                if len(values) == len(items):
+                    results = [
+                        self._unwrap_response(endpoint, params, value)
+                        for (endpoint, params, _), value in zip(items, values)
+                    ]
+                    failure = next((result for result in results if self._is_link_failure(result)), None)
+                    if failure is not None:
+                        raise _LinkFailure(failure)
+            if results is None:
+                raise ValueError(f"batch response size mismatch ({len(values)} != {len(items)})")
+        except _LinkFailure:
+            pass  # 세션에서 장애로 집계됨, 항목별 결과는 아래에서 전달
         except Exception as e:
-            return {
-               "__error__": True,
-               "status": -1,
-               "message": f"HTTP/Connection Error: {str(e)}",
-               "exception_type": type(e).__name__,
-               "endpoint": endpoint,
-               "params": params
-            }
+            for _, _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, _, future), result in zip(items, results):
+            if future.done():
+                continue
+            if self._is_link_failure(result):
+                future.set_exception(_LinkFailure(result))
+            else:
+                future.set_result(result)
+
+    def nc_path_stats(self) -> dict:
+        """NC 경로 캐시(루트 경로, 폴더 존재, 파일 목록) 통계"""
+        return self._nc_paths.stats()
+
+    def invalidate_nc_paths(self, machine_id: int, path: str = None):
+        """NC 경로 캐시 삭제 (path가 없으면 장비 전체). 장비에서 직접 파일/폴더를 바꾼 경우 사용"""
+        self._nc_paths.invalidate(machine_id, path)
 
     async def get_nc_root_path(self, machine_id: int):
         """
-        지정한 장비의 NC 파일 최상위 루트 경로 반환.
+        지정한 장비의 NC 파일 최상위 루트 경로 반환 (nc_dir_ttl 동안 캐시).
         :param machine_id: 장비 ID
         :raises CustomException: 외부 API 호출 실패 또는 상태 코드 이상시
         :return: NC 루트 경로 (str)
         """
+        root = self._nc_paths.root(machine_id)
+        if root is not None:
+            return root
         try:
-            async with httpx.AsyncClient(verify=False) as client:
+            async with self._session(machine_id) as client:
                 response = await client.get(
                     f"{self.base_url}/machine/ncMemory/rootPath",
                     params={"machine": machine_id}
                 )
                 response.raise_for_status()
                 data = response.json()
-                status = data.get("status", 0)
-                if status != 0:
-                    raise CustomException(ExceptionEnum.EXTERNAL_REQUEST_ERROR)
-                return data.get("value", [""])[0]
+                if isinstance(data, dict):
+                    status = data.get("status", 0)
+                    if status != 0:
+                        raise CustomException(ExceptionEnum.EXTERNAL_REQUEST_ERROR)
+                    data = data.get("value", [""])
+                # 모의 서버처럼 값만 반환하는 경우에는 그대로 사용
+                root = data[0] if isinstance(data, list) else data
         except Exception as e:
             raise CustomException(ExceptionEnum.EXTERNAL_REQUEST_ERROR, detail=str(e))
+        self._nc_paths.set_root(machine_id, root)
+        return root
 
-    async def ensure_folder_exists(self, machine_id: int, path: str):
+    async def ensure_folder_exists(self, machine_id: int, path: str, check: bool = True) -> bool:
         """
-        지정한 장비 내 경로의 폴더가 없으면 생성.
+        지정한 장비 내 경로의 폴더가 없으면 생성. 존재가 확인된 폴더는 nc_dir_ttl 동안 다시 확인하지 않는다.
         :param machine_id: 장비 ID
         :param path: 폴더 경로
+        :param check: False면 존재 확인 없이 바로 생성 (상위 폴더를 방금 만들어 없는 것이 확실한 경우)
         :raises CustomException: 폴더 생성 실패시
+        :return: 폴더를 새로 만들었으면 True
         """
+        if self._nc_paths.has_dir(machine_id, path):
+            return False
         try:
             params = {
                 "machine": machine_id,
                 "ncpath": path
             }
-            async with httpx.AsyncClient(verify=False) as client:
-                response = await client.get(f"{self.base_url}/file/machine/ncpath/exists", params=params)
-                response.raise_for_status()
-                result = response.json()
-                exists = result.get("value", [False])[0]
+            async with self._session(machine_id) as client:
+                exists = False
+                if check:
+                    response = await client.get(f"{self.base_url}/file/machine/ncpath/exists", params=params)
+                    response.raise_for_status()
+                    result = response.json()
+                    exists = result.get("value", [False])[0]
                 if not exists:
                     payload = {
                         "machine": machine_id,
@@ -125,33 +639,67 @@ class MachineRepository:
                     if create_result.get("status", -1) != 0:
                         raise CustomException(ExceptionEnum.EXTERNAL_REQUEST_ERROR)
         except Exception as e:
+            self._nc_paths.invalidate(machine_id, path)
             raise CustomException(ExceptionEnum.EXTERNAL_REQUEST_ERROR, detail=str(e))
+        # 새로 만든 폴더는 비어 있으므로 파일 목록도 함께 기록
+        self._nc_paths.add_dir(machine_id, path, empty=not exists)
+        return not exists
 
-    async def remove_file_if_exists(self, machine_id: int, path: str, filename: str):
+    async def list_nc_files(self, machine_id: int, path: str) -> set:
         """
-        지정한 경로에 동일한 파일명이 있을 경우 삭제.
+        지정한 경로의 파일명 목록. 목록이 캐시되어 있으면(nc_index_ttl 이내) 조회하지 않는다.
         :param machine_id: 장비 ID
         :param path: NC 경로
-        :param filename: NC 파일명
-        :raises CustomException: 삭제 실패시
+        :raises CustomException: 조회 실패시
+        :return: 파일명 set (캐시와 공유하므로 수정하지 말 것)
         """
+        files = self._nc_paths.files(machine_id, path)
+        if files is not None:
+            return files
         try:
             params = {"machine": machine_id, "ncpath": path}
-            async with httpx.AsyncClient(verify=False) as client:
+            async with self._session(machine_id) as client:
                 response = await client.get(
                     f"{self.base_url}/file/machine/ncpath/list", params=params
                 )
                 response.raise_for_status()
                 data = response.json()
                 files = data.get("files", [])
-                if filename in files:
-                    del_params = {'machine': machine_id, 'ncpath': f"{path}{filename}"}
-                    del_response = await client.delete(
-                        f"{self.base_url}/file/machine/ncpath/delete", params=del_params
-                    )
-                    del_response.raise_for_status()
         except Exception as e:
             raise CustomException(ExceptionEnum.EXTERNAL_REQUEST_ERROR, detail=str(e))
+        self._nc_paths.set_files(machine_id, path, files)
+        return set(files)
+
+    async def delete_nc_file(self, machine_id: int, path: str, filename: str):
+        """
+        지정한 경로의 파일 삭제.
+        :param machine_id: 장비 ID
+        :param path: NC 경로
+        :param filename: NC 파일명
+        :raises CustomException: 삭제 실패시
+        """
+        try:
+            del_params = {'machine': machine_id, 'ncpath': f"{path}{filename}"}
+            async with self._session(machine_id) as client:
+                del_response = await client.delete(
+                    f"{self.base_url}/file/machine/ncpath/delete", params=del_params
+                )
+                del_response.raise_for_status()
+        except Exception as e:
+            self._nc_paths.invalidate(machine_id, path)
+            raise CustomException(ExceptionEnum.EXTERNAL_REQUEST_ERROR, detail=str(e))
+        self._nc_paths.remove_file(machine_id, path, filename)
+
+    async def remove_file_if_exists(self, machine_id: int, path: str, filename: str):
+        """
+        지정한 경로에 동일한 파일명이 있을 경우 삭제.
+        :param machine_id: 장비 ID
+        :param path: NC 경로
+        :param filename: NC 파일명
+        :raises CustomException: 삭제 실패시
+        """
+        if filename in await self.list_nc_files(machine_id, path):
+            await self.delete_nc_file(machine_id, path, filename)
 
     async def put_nc_file(self, machine_id: int, path: str, filename: str, data: bytes):
         """
@@ -170,7 +718,7 @@ class MachineRepository:
                 "machine": machine_id,
                 "ncpath": path
             }
-            async with httpx.AsyncClient(verify=False) as client:
+            async with self._session(machine_id, bulk=True) as client:
                 response = await client.put(
                     f"{self.base_url}/file/machine/ncpath",
                     files=files,
@@ -181,30 +729,82 @@ class MachineRepository:
                 if result.get("status", 0) != 0:
                     raise CustomException(ExceptionEnum.EXTERNAL_REQUEST_ERROR)
         except Exception as e:
+            self._nc_paths.invalidate(machine_id, path)
             raise CustomException(ExceptionEnum.EXTERNAL_REQUEST_ERROR, detail=str(e))
+        self._nc_paths.add_file(machine_id, path, filename)
 
-    async def get_machine_status(self, machine_id: int):
+    async def put_nc_file_stream(self, machine_id: int, path: str, filename: str,
+                                 chunks: AsyncIterator[bytes], size: int = None):
         """
-        장비의 현재 프로그램 가공 모드(programMode) 반환.
+        NC 파일을 청크 단위로 읽으면서 CNC 장비로 업로드 (put_nc_file과 같은 multipart 요청).
+        파일 전체를 메모리에 올리지 않으므로 파일 크기와 상관없이 청크 하나만큼의 메모리만 사용한다.
         :param machine_id: 장비 ID
-        :raises CustomException: API 오류시
-        :return: int 또는 None (예: 3:가공중, 1:대기)
+        :param path: 업로드 경로
+        :param filename: 파일 이름
+        :param chunks: 파일 내용을 순서대로 반환하는 비동기 이터레이터
+        :param size: 파일 크기(byte). 주면 Content-Length를 지정하고, 없으면 chunked 전송
+        :raises CustomException: 업로드 실패시
         """
+        boundary = uuid.uuid4().hex
+        quoted_name = filename.replace('"', "%22")
+        head = (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="file"; filename="{quoted_name}"\r\n'
+            "Content-Type: application/octet-stream\r\n\r\n"
+        ).encode()
+        tail = f"\r\n--{boundary}--\r\n".encode()
+
+        async def body():
+            yield head
+            async for chunk in chunks:
+                yield chunk
+            yield tail
+
+        headers = {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+        if size is not None:
+            headers["Content-Length"] = str(len(head) + size + len(tail))
         try:
-            params = {'machine': machine_id, 'channel': 1}
-            async with httpx.AsyncClient(verify=False) as client:
-                response = await client.get(
-                    f"{self.base_url}/machine/channel/currentProgram/programMode",
+            params = {
+                "machine": machine_id,
+                "ncpath": path
+            }
+            async with self._session(machine_id, bulk=True) as client:
+                response = await client.put(
+                    f"{self.base_url}/file/machine/ncpath",
+                    content=body(),
+                    headers=headers,
                     params=params
                 )
                 response.raise_for_status()
-                data = response.json()
-                status = data.get("status", 0)
-                if status != 0:
+                result = response.json()
+                if result.get("status", 0) != 0:
                     raise CustomException(ExceptionEnum.EXTERNAL_REQUEST_ERROR)
-                return data.get("value", [None])[0]
         except Exception as e:
+            self._nc_paths.invalidate(machine_id, path)
             raise CustomException(ExceptionEnum.EXTERNAL_REQUEST_ERROR, detail=str(e))
+        self._nc_paths.add_file(machine_id, path, filename)
+
+    async def _get_state_value(self, endpoint: str, machine_id: int):
+        """
+        가공 상태 추적용 채널 1 상태 값 조회. get_data를 거치므로 MCP 도구의 같은 조회와 진행 중인 요청을 공유하고
+        (요청 병합, 회로 차단기/재시도 적용), 캐시된 값 대신 항상 새 값을 읽는다.
+        :raises CustomException: API 오류시
+        """
+        value = await self.get_data(endpoint, {'machine': machine_id, 'channel': 1}, use_cache=False)
+        if isinstance(value, dict) and value.get("__error__"):
+            raise CustomException(ExceptionEnum.EXTERNAL_REQUEST_ERROR, detail=value.get("message"))
+        if isinstance(value, list):
+            return value[0] if value else None
+        return value
+
+    async def get_machine_status(self, machine_id: int):
+        """
+        장비의 현재 프로그램 가공 모드(programMode) 반환.
+        :param machine_id: 장비 ID
+        :raises CustomException: API 오류시
+        :return: int 또는 None (예: 3:가공중, 1:대기)
+        """
+        return await self._get_state_value("/machine/channel/currentProgram/programMode", machine_id)
 
     async def get_current_program_name(self, machine_id: int):
         """
@@ -213,21 +813,9 @@ class MachineRepository:
         :raises CustomException: API 오류시
         :return: 파일명 (str)
         """
-        try:
-            params = {'machine': machine_id, 'channel': 1}
-            async with httpx.AsyncClient(verify=False) as client:
-                response = await client.get(
-                    f"{self.base_url}/machine/channel/currentProgram/currentFile/programNameWithPath",
-                    params=params
-                )
-                response.raise_for_status()
-                data = response.json()
-                status = data.get("status", 0)
-                if status != 0:
-                    raise CustomException(ExceptionEnum.EXTERNAL_REQUEST_ERROR)
-                return data.get("value", [None])[0]
-        except Exception as e:
-            raise CustomException(ExceptionEnum.EXTERNAL_REQUEST_ERROR, detail=str(e))
+        return await self._get_state_value(
+            "/machine/channel/currentProgram/currentFile/programNameWithPath", machine_id
+        )
 
     async def get_active_tool_number(self, machine_id: int):
         """
@@ -236,17 +824,6 @@ class MachineRepository:
         :return: 공구 번호 (int) / 실패시 -1
         """
         try:
-            params = {"machine": machine_id, "channel": 1}
-            async with httpx.AsyncClient(verify=False) as client:
-                res = await client.get(
-                    f"{self.base_url}/machine/channel/activeTool/toolNumber",
-                    params=params
-                )
-                res.raise_for_status()
-                data = res.json()
-                status = data.get("status", 0)
-                if status != 0:
-                    raise CustomException(ExceptionEnum.EXTERNAL_REQUEST_ERROR)
-                return int(data.get("value", [0])[0])
+            return int(await self._get_state_value("/machine/channel/activeTool/toolNumber", machine_id))
         except Exception:
             return -1  # API 오류 발생 시 -1 반환
@@ -1,5 +1,6 @@
+from datetime import datetime
 from pydantic import BaseModel
-from typing import List
+from typing import List, Literal, Optional
 
 class MachineInfo(BaseModel):
     id: int
@@ -21,4 +22,27 @@ class MachineFileUploadResponse(BaseModel):
     status: int   
     filename: str        
     machine_id: int     
-    ncpath: str        
\ No newline at end of file
+    ncpath: str        
+class MachineUploadResult(BaseModel):
+    machine_id: int
+    status: int                   # 0: 성공, 실패 시 HTTP 상태 코드 (CustomException.status_code, 알 수 없는 오류는 500)
+    ncpath: Optional[str] = None  # 업로드한 폴더 경로 (성공 시)
+    error: Optional[str] = None   # 실패 사유
+    elapsed_ms: float = 0.0
+
+class MachineFleetUploadResponse(BaseModel):
+    filename: str
+    succeeded: int
+    failed: int
+    results: List[MachineUploadResult]
+
+class MachineEvent(BaseModel):
+    type: Literal["program_started", "program_finished", "tool_changed", "alarm_raised", "alarm_cleared"]
+    machine_id: int
+    at: datetime                        # 변경을 처음 관측한 샘플 시각
+    project_id: Optional[str] = None    # program_started / program_finished
+    program: Optional[str] = None       # program_started / program_finished (파일명)
+    tool: Optional[int] = None          # 현재 공구 (program_finished는 마지막 공구)
+    previous_tool: Optional[int] = None # tool_changed
+    alarm_number: Optional[int] = None  # alarm_raised / alarm_cleared (해제된 알람 번호)
+    alarm_text: Optional[str] = None    # alarm_raised
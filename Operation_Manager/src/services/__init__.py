@@ -1,8 +1,12 @@
+import os
+from typing import Optional
 # from src.services.project import ProjectService
 from src.services.machine import MachineService
 
 from src.repositories import (
+    FileRepository,
     MachineRepository,
+    get_file_repository,
     get_machine_repository
 )
 # from src.repositories import (
@@ -16,9 +20,37 @@ async def get_machine_service():
     """
     MachineService 의존성 주입 팩토리.
     각 Repository의 async 생성자를 호출하여 서비스 객체를 반환.
+    가공 상태 추적 스케줄러 설정 (환경 변수):
+    TORUS_TRACK_BUSY_INTERVAL: 가공 중인 장비 조회 간격(초)
+    TORUS_TRACK_IDLE_INTERVAL / TORUS_TRACK_MAX_IDLE_INTERVAL: 대기 중인 장비 조회 간격(초)의 시작값/최대값
+    TORUS_TRACK_CONCURRENCY: 동시에 조회할 최대 장비 수
+    장비 상태 이벤트 설정 (환경 변수):
+    TORUS_EVENT_QUEUE_SIZE: 구독자별 최대 대기 이벤트 수
+    TORUS_EVENT_TOOL_DEBOUNCE / TORUS_EVENT_ALARM_DEBOUNCE: 공구/알람 변경으로 인정할 연속 관측 횟수
+    공구 수명 표 설정 (환경 변수):
+    TORUS_TOOL_STRUCTURE_TTL: 공구 구성(공구/날 수, 수명 단위, 최대 수명)을 다시 읽는 주기(초)
+    TORUS_TOOL_ACTIVE_TTL / TORUS_TOOL_IDLE_TTL: 최근 사용한 공구 / 나머지 공구의 수명 값을 다시 읽는 주기(초)
+    NC 파일 업로드용 GridFS 리포지토리는 MONGO_URL이 설정된 경우에만 만듦
     """
     machine_repo: MachineRepository = await get_machine_repository()
-    # file_repo: FileRepository = await get_file_repository()
+    file_repo: Optional[FileRepository] = await get_file_repository()
     # log_repo: MachineLogRepository = await get_log_repository()
     # redis_repo: RedisRepository = await get_redis_repository()
-    return MachineService(machine_repo)
\ No newline at end of file
+    tracker_options = {
+        "busy_interval": float(os.getenv("TORUS_TRACK_BUSY_INTERVAL", "1")),
+        "idle_interval": float(os.getenv("TORUS_TRACK_IDLE_INTERVAL", "3")),
+        "max_idle_interval": float(os.getenv("TORUS_TRACK_MAX_IDLE_INTERVAL", "15")),
+        "concurrency": int(os.getenv("TORUS_TRACK_CONCURRENCY", "16")),
+    }
+    event_options = {
+        "queue_size": int(os.getenv("TORUS_EVENT_QUEUE_SIZE", "1000")),
+        "tool_debounce": int(os.getenv("TORUS_EVENT_TOOL_DEBOUNCE", "1")),
+        "alarm_debounce": int(os.getenv("TORUS_EVENT_ALARM_DEBOUNCE", "2")),
+    }
+    tool_life_options = {
+        "structure_ttl": float(os.getenv("TORUS_TOOL_STRUCTURE_TTL", "600")),
+        "active_ttl": float(os.getenv("TORUS_TOOL_ACTIVE_TTL", "1")),
+        "idle_ttl": float(os.getenv("TORUS_TOOL_IDLE_TTL", "60")),
+    }
+    return MachineService(machine_repo, file_repo=file_repo, tracker_options=tracker_options,
+                          event_options=event_options, tool_life_options=tool_life_options)
\ No newline at end of file
@@ -0,0 +1,167 @@
+import asyncio
+import inspect
+import logging
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional
+
+from src.schemas.machine import MachineEvent
+
+PROGRAM_STARTED = "program_started"
+PROGRAM_FINISHED = "program_finished"
+TOOL_CHANGED = "tool_changed"
+ALARM_RAISED = "alarm_raised"
+ALARM_CLEARED = "alarm_cleared"
+PROGRAM_EVENTS = (PROGRAM_STARTED, PROGRAM_FINISHED, TOOL_CHANGED)
+ALARM_EVENTS = (ALARM_RAISED, ALARM_CLEARED)
+
+
+class DebouncedSignal:
+    """
+    주기적으로 샘플링하는 값 하나. 새 값이 samples번 연속 관측되어야 바뀐 것으로 인정한다.
+    바뀐 시각은 인정한 시점이 아니라 새 값을 처음 관측한 샘플 시각.
+    """
+
+    def __init__(self, samples: int = 1, value=None):
+        self.samples = max(1, samples)
+        self.value = value
+        self.changed_at: Optional[datetime] = None
+        self._pending = None
+        self._pending_at: Optional[datetime] = None
+        self._count = 0
+
+    def update(self, value, at: datetime) -> bool:
+        """샘플 하나를 반영. 값이 바뀐 것으로 인정되면 True (이전 값은 호출 전에 value로 확인)"""
+        if value == self.value:
+            self._count = 0
+            return False
+        if self._count == 0 or value != self._pending:
+            self._pending, self._pending_at, self._count = value, at, 0
+        self._count += 1
+        if self._count < self.samples:
+            return False
+        self.value, self.changed_at, self._count = value, self._pending_at, 0
+        return True
+
+    def reset(self, value=None):
+        self.value = value
+        self._count = 0
+
+
+class _Subscription:
+    def __init__(self, types: Optional[Iterable[str]], queue_size: int, callback: Optional[Callable] = None):
+        self.types = frozenset(types) if types else None  # None이면 모든 이벤트
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.callback = callback
+        self.task: Optional[asyncio.Task] = None
+        self.delivered = 0
+        self.dropped = 0
+
+    def accepts(self, event_type: str) -> bool:
+        return self.types is None or event_type in self.types
+
+
+class MachineEventBus:
+    """
+    장비 상태 변경 이벤트(MachineEvent)를 프로세스 안에서 구독자에게 전달하는 비동기 이벤트 버스.
+    - 이벤트는 추적 스케줄러가 한 번 읽은 값에서 만들어지므로, 구독자가 늘어도 게이트웨이 요청은 늘지 않음
+    - 구독자마다 큐를 두고 순서대로 전달하므로 느린 구독자가 발행(추적 루프)이나 다른 구독자를 막지 않음
+      (큐가 가득 차면 가장 오래된 이벤트를 버리고 dropped로 집계)
+    - 콜백 구독(subscribe) 또는 async for 구독(listen)
+    """
+
+    def __init__(self, queue_size: int = 1000):
+        """
+        :param queue_size: 구독자별로 쌓아 둘 최대 이벤트 수
+        """
+        self.queue_size = max(1, queue_size)
+        self._subscriptions: List[_Subscription] = []
+        self._published: Dict[str, int] = {}
+
+    # ------------------------------------------------------------------ 구독
+
+    def subscribe(self, callback: Callable, types: Iterable[str] = None) -> Callable:
+        """
+        이벤트 콜백 등록. callback(event)
+        - types: 받을 이벤트 종류 (없으면 전체)
+        - 코루틴 함수면 이벤트마다 await (구독자별로 발행 순서대로 처리)
+        """
+        self._subscriptions.append(_Subscription(types, self.queue_size, callback))
+        return callback
+
+    def unsubscribe(self, callback: Callable):
+        for subscription in [s for s in self._subscriptions if s.callback is callback]:
+            self._subscriptions.remove(subscription)
+            if subscription.task is not None:
+                subscription.task.cancel()
+
+    async def listen(self, types: Iterable[str] = None) -> AsyncIterator[MachineEvent]:
+        """
+        async for로 이벤트를 받는 구독. 반복을 멈추면(break, 취소) 구독도 해제된다.
+        예) async for event in service.events.listen([ALARM_RAISED]): ...
+        """
+        subscription = _Subscription(types, self.queue_size)
+        self._subscriptions.append(subscription)
+        try:
+            while True:
+                event = await subscription.queue.get()
+                subscription.delivered += 1
+                yield event
+        finally:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def wants(self, *types: str) -> bool:
+        """해당 종류의 이벤트를 받는 구독자가 있는지 (없으면 발행에 필요한 값을 읽지 않아도 됨)"""
+        return any(s.accepts(t) for s in self._subscriptions for t in types)
+
+    # ------------------------------------------------------------------ 발행
+
+    def publish(self, event: MachineEvent):
+        """이벤트를 받는 구독자들의 큐에 넣음 (기다리지 않음)"""
+        self._published[event.type] = self._published.get(event.type, 0) + 1
+        for subscription in self._subscriptions:
+            if not subscription.accepts(event.type):
+                continue
+            if subscription.queue.full():
+                subscription.queue.get_nowait()
+                subscription.dropped += 1
+            subscription.queue.put_nowait(event)
+            if subscription.callback is not None and (subscription.task is None or subscription.task.done()):
+                subscription.task = asyncio.create_task(self._deliver(subscription))
+
+    @staticmethod
+    async def _deliver(subscription: _Subscription):
+        while not subscription.queue.empty():
+            event = subscription.queue.get_nowait()
+            try:
+                result = subscription.callback(event)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logging.error(f"❌ Machine event subscriber failed ({event.type} {event.machine_id}): {e}",
+                              exc_info=True)
+            subscription.delivered += 1
+
+    async def drain(self):
+        """콜백 구독자가 지금까지 발행된 이벤트를 모두 처리할 때까지 대기"""
+        tasks = [s.task for s in self._subscriptions if s.task is not None and not s.task.done()]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def close(self):
+        """콜백 전달 태스크를 멈추고 구독을 모두 해제"""
+        for subscription in self._subscriptions:
+            if subscription.task is not None:
+                subscription.task.cancel()
+        self._subscriptions.clear()
+
+    # ------------------------------------------------------------------ 상태
+
+    def stats(self) -> dict:
+        return {
+            "published": dict(self._published),
+            "subscribers": len(self._subscriptions),
+            "pending": sum(s.queue.qsize() for s in self._subscriptions),
+            "delivered": sum(s.delivered for s in self._subscriptions),
+            "dropped": sum(s.dropped for s in self._subscriptions),
+        }
@@ -1,6 +1,8 @@
 import asyncio
 from datetime import datetime
+import inspect
 import re
+import time
 from typing import Dict
 from typing import List
 from typing import Any, Tuple
@@ -11,13 +13,22 @@ import uuid
 import json
 import logging
 from src.repositories import MachineRepository
+from src.repositories.file import FileRepository
 from src.schemas.machine import (
-    MachineFileUploadResponse, MachineListResponse, MachineProgramStatusResponse, MachineInfo
+    MachineFileUploadResponse, MachineFleetUploadResponse, MachineListResponse, MachineProgramStatusResponse,
+    MachineEvent, MachineInfo, MachineUploadResult
 )
 from src.utils.exceptions import CustomException, ExceptionEnum
 import logging
 
 from src.repositories.history_logger import history_logger
+from src.services.events import (
+    ALARM_CLEARED, ALARM_EVENTS, ALARM_RAISED, PROGRAM_EVENTS, PROGRAM_FINISHED, PROGRAM_STARTED, TOOL_CHANGED,
+    DebouncedSignal, MachineEventBus
+)
+from src.services.registry import MachineRegistry
+from src.services.toollife import ToolLifeTable
+from src.services.tracker import FleetTracker
 
 
 def load_json_file(file_path: Path) -> Dict:
@@ -45,6 +56,28 @@ def load_yaml_file(file_path: Path) -> Dict[str, Any]:
         logging.critical(f"치명적 오류: 설정 파일({file_path})의 YAML 형식이 잘못되었습니다. 상세: {e}")
         raise  # 예외를 다시 발생시켜 프로그램 중단
 
+class MachineTrackingState:
+    """장비 하나의 가공 추적 상태 (가공 중인 프로그램, 공구, 알람)"""
+
+    def __init__(self, tool_debounce: int = 1, alarm_debounce: int = 2):
+        self.is_processing = False
+        self.current_project_id = None
+        self.current_filename = None
+        self.tool = DebouncedSignal(tool_debounce)
+        self.alarm = DebouncedSignal(alarm_debounce, value=0)  # 0: 알람 없음
+
+    @property
+    def current_tool(self):
+        return self.tool.value
+
+    def finish(self):
+        """가공 종료 후 다음 제품을 위해 초기화"""
+        self.is_processing = False
+        self.current_project_id = None
+        self.current_filename = None
+        self.tool.reset()
+
+
 class MachineService:
     """
     CNC 장비와 연동되는 주요 비즈니스 로직(목록 조회, 파일 전송, 상태 추적 등)을 담당하는 서비스 계층.
@@ -59,62 +92,144 @@ class MachineService:
     
     def __init__(
         self, 
-        machine_repo: MachineRepository
-        # file_repo: FileRepository, 
-        # log_repo: MachineLogRepository, 
-        # job_tracker: RedisRepository
+        machine_repo: MachineRepository,
+        file_repo: FileRepository = None,
+        log_repo=None,
+        job_tracker=None,
+        tracker_options: dict = None,
+        event_options: dict = None,
+        tool_life_options: dict = None
     ):
         """
         :param machine_repo: 장비 관련 외부 API 통신 리포지토리
-        :param file_repo: 파일(GridFS) 관리 리포지토리
-        :param log_repo: MongoDB 가공 로그 관리 리포지토리
-        :param job_tracker: Redis 기반 상태 추적기
+        :param file_repo: 파일(GridFS) 관리 리포지토리 (NC 파일 업로드 시 필요)
+        :param log_repo: MongoDB 가공 로그 관리 리포지토리 (insert_log(doc), 없으면 가공 로그 구독을 하지 않음)
+        :param job_tracker: Redis 기반 상태 추적기 (없으면 업로드/가공 상태를 기록하지 않고, 가공 중인 프로그램을 프로젝트와 연결하지 않음)
+        :param tracker_options: 가공 상태 추적 스케줄러(FleetTracker) 설정
+            (busy_interval, idle_interval, max_idle_interval, concurrency)
+        :param event_options: 장비 상태 이벤트 설정
+            (queue_size: 구독자별 최대 대기 이벤트 수,
+             tool_debounce / alarm_debounce: 공구/알람 변경으로 인정할 연속 관측 횟수)
+        :param tool_life_options: 공구 수명 표(ToolLifeTable) 설정
+            (structure_ttl, active_ttl, idle_ttl, active_window)
         """
         self.machine_repo = machine_repo
-        # self.file_repo = file_repo
-        # self.log_repo = log_repo
-        # self.job_tracker = job_tracker
+        # 장비 목록 (백그라운드 갱신, ID/제조사 색인)
+        self.registry = MachineRegistry(machine_repo)
+        # 가공 상태 추적: 전체 장비를 하나의 스케줄러 루프에서 조회 (장비 ID -> 추적 상태)
+        self.tracker = FleetTracker(self._poll_machine, **(tracker_options or {}))
+        self._tracking_states: Dict[int, MachineTrackingState] = {}
+        # 장비 상태 변경 이벤트 (추적 스케줄러가 발행, 가공 로그 등이 구독)
+        event_options = dict(event_options or {})
+        self._tool_debounce = event_options.pop("tool_debounce", 1)
+        self._alarm_debounce = event_options.pop("alarm_debounce", 2)
+        self.events = MachineEventBus(**event_options)
+        self._product_logs: Dict[int, dict] = {}  # 장비 ID -> 진행 중인 가공 로그
+        if log_repo is not None:
+            self.events.subscribe(self._log_product_event, PROGRAM_EVENTS)
+        # 공구 수명 표 (장비별 캐시). 활성 공구 번호는 T 코드이고 표는 등록 순번 기준이라 공구 교체 이벤트로
+        # 표의 공구를 특정할 수 없으므로, 사용 중인 공구는 수명 값 변화로 판단
+        self.tool_life = ToolLifeTable(machine_repo, **(tool_life_options or {}))
+        self.file_repo = file_repo
+        self.log_repo = log_repo
+        self.job_tracker = job_tracker
         
+    async def aclose(self):
+        """장비 목록 갱신/추적 태스크를 멈추고 리포지토리 연결(HTTP 연결 풀) 정리. MCP 서버 종료 시 호출"""
+        await self.registry.stop()
+        await self.tracker.stop()
+        await self.events.drain()
+        await self.events.close()
+        await self.tool_life.close()
+        await self.machine_repo.aclose()
+
+
+    # 한 번에 여러 장비로 보낼 때 메모리에 한 번만 읽어 두고 공유할 최대 파일 크기 (넘으면 장비마다 GridFS에서 다시 읽음)
+    FLEET_UPLOAD_BUFFER_LIMIT = 64 * 1024 * 1024
+
+    async def _open_nc_file(self, file_id: str):
+        """GridFS 파일 스트림을 열고 첫 청크(O번호 검증용)를 읽음 -> (스트림, 나머지 청크 이터레이터, 첫 청크)"""
+        if self.file_repo is None:
+            raise CustomException(ExceptionEnum.FILE_OPERATION_ERROR, detail="file repository is not configured")
+        stream = await self.file_repo.open_file_stream(file_id)
+        chunks = stream.chunks()
+        header = await anext(chunks, b"")
+        return stream, chunks, header
+
+    @staticmethod
+    def _check_fanuc_program(filename: str, header: bytes):
+        """
+        FANUC 계열 NC 파일명 포맷 검증 (O번호는 프로그램 첫머리에 있으므로 첫 청크만 확인).
+        :raises CustomException: O번호가 없거나 파일명이 O번호로 시작하지 않는 경우
+        """
+        content_str = header.decode(errors="ignore")
+        o_match = re.search(r"\bO(\d+)", content_str)
+        if not o_match:
+            raise CustomException(ExceptionEnum.INVALID_SIMENSE_FORMAT)
+        o_number = f"O{o_match.group(1)}"
+        if not filename.startswith(o_number):
+            raise CustomException(ExceptionEnum.INVALID_FILE_NAME_FORMAT)
+
+    async def _prepare_nc_folder(self, machine_id: int, project_id: str):
+        """NC 루트 경로 및 작업 폴더 확보, 작업 폴더의 파일 목록 조회 -> (폴더 경로, 파일명 set)"""
+        ncpath_root = await self.machine_repo.get_nc_root_path(machine_id)
+        om_folder_path = f"{ncpath_root}OM/"
+        created = await self.machine_repo.ensure_folder_exists(machine_id, om_folder_path)
+        folder_path = f"{om_folder_path}{project_id}/"
+        # 상위 폴더를 방금 만들었으면 하위 폴더는 없으므로 존재 확인 생략
+        await self.machine_repo.ensure_folder_exists(machine_id, folder_path, check=not created)
+        files = await self.machine_repo.list_nc_files(machine_id, folder_path)
+        return folder_path, files
+
+    async def _send_nc_file(self, project_id: str, machine_id: int, folder_path: str, existing_files,
+                            filename: str, body, size: int):
+        """동일 파일 삭제 후 업로드, 업로드 상태 기록"""
+        if filename in existing_files:
+            await self.machine_repo.delete_nc_file(machine_id, folder_path, filename)
+        await self.machine_repo.put_nc_file_stream(machine_id, folder_path, filename, body, size=size)
+        if self.job_tracker is not None:
+            self.job_tracker.set_status(project_id, filename, machine_id, "가공 대기")
 
     async def upload_torus_file(self, project_id: str, machine_id: int, file_id: str) -> MachineFileUploadResponse:
         """
         NC 파일을 장비로 업로드 (중복 파일 삭제, 폴더 생성, 포맷 검증 등 포함).
+        파일 열기와 장비 정보 확인은 동시에 진행하고, 장비/파일명 검증을 통과한 뒤에만 작업 폴더를 준비한다
+        (루트 경로 -> 폴더 생성 -> 파일 목록). 루트 경로/폴더 존재/파일 목록은 리포지토리 캐시를 사용해
+        반복 업로드 시 게이트웨이 왕복을 생략한다.
         :param project_id: 프로젝트 ID
         :param machine_id: 장비 ID
         :param file_id: 업로드할 NC 파일의 GridFS ID
         :return: 업로드 결과 정보
         """
-        # 1. 파일 내용 로드 및 파일명 추출
-        byte_io, filename = await self.file_repo.get_file_byteio_and_name(file_id)
-        file_data = byte_io.read()
-        # 2. NC 루트 경로 및 작업 폴더 경로 확보
-        ncpath_root = await self.machine_repo.get_nc_root_path(machine_id)
-        project_folder_path = f"{ncpath_root}OM/"
-        await self.machine_repo.ensure_folder_exists(machine_id, project_folder_path)
-        
-        project_folder_path = project_folder_path + f"{project_id}/"
+        if self.file_repo is None:
+            raise CustomException(ExceptionEnum.FILE_OPERATION_ERROR, detail="file repository is not configured")
 
-        # 3. 해당 장비 정보 확인
-        machines: MachineListResponse = await self.get_machine_list()
-        matched_machine = next((m for m in machines.machines if m.id == machine_id), None)
+        # 1. 파일 스트림 열기 (GridFS 청크 단위로 읽어 전체 파일을 메모리에 올리지 않음)
+        # 2. 해당 장비 정보 확인 (1~2 동시 진행, 게이트웨이에는 요청하지 않음)
+        (stream, chunks, header), matched_machine = await asyncio.gather(
+            self._open_nc_file(file_id), self.registry.get(machine_id)
+        )
+        filename = stream.filename
         if not matched_machine:
             raise CustomException(ExceptionEnum.MACHINE_NOT_FOUND)
 
-        # 4. FANUC 계열인 경우 NC 파일명 포맷 검증
+        # 3. FANUC 계열인 경우 NC 파일명 포맷 검증
         if matched_machine.vendorCode.lower() == "fanuc":
-            content_str = file_data.decode(errors="ignore")
-            o_match = re.search(r"\bO(\d+)", content_str)
-            if not o_match:
-                raise CustomException(ExceptionEnum.INVALID_SIMENSE_FORMAT)
-            o_number = f"O{o_match.group(1)}"
-            if not filename.startswith(o_number):
-                raise CustomException(ExceptionEnum.INVALID_FILE_NAME_FORMAT)
-
-        # 5. 폴더 생성 및 동일 파일 삭제, 파일 업로드
-        await self.machine_repo.ensure_folder_exists(machine_id, project_folder_path)
-        await self.machine_repo.remove_file_if_exists(machine_id, project_folder_path, filename)
-        await self.machine_repo.put_nc_file(machine_id, project_folder_path, filename, file_data)
-        self.job_tracker.set_status(project_id, filename, machine_id, "가공 대기")
+            self._check_fanuc_program(filename, header)
+
+        # 4. NC 루트 경로 및 작업 폴더 확보, 작업 폴더의 파일 목록 조회 (검증을 통과한 뒤에만)
+        project_folder_path, existing_files = await self._prepare_nc_folder(machine_id, project_id)
+
+        # 5. 동일 파일 삭제, 파일 업로드 (첫 청크 + 나머지 청크를 그대로 요청 본문으로 전송)
+        async def body():
+            if header:
+                yield header
+            async for chunk in chunks:
+                yield chunk
+
+        await self._send_nc_file(
+            project_id, machine_id, project_folder_path, existing_files, filename, body(), stream.length
+        )
 
         return MachineFileUploadResponse(
             status=0,
@@ -123,123 +238,369 @@ class MachineService:
             ncpath=project_folder_path
         )
 
-
-    async def track_all_machines_forever(self):
+    async def upload_torus_file_to_machines(self, project_id: str, machine_ids: List[int], file_id: str,
+                                            concurrency: int = 4, on_progress=None) -> MachineFleetUploadResponse:
         """
-        모든 CNC 장비의 가공 상태를 백그라운드에서 지속적으로 추적.
-        신규 장비가 추가되면 자동으로 트래킹을 시작.
-        """
-        tracked_machines = set()
-        while True:
-            machines = await self.get_machine_list()
-            machine_ids = [m.id for m in machines.machines]
-            logging.info(f"📡 Found {len(machine_ids)} machines: {machine_ids}")
-
-            for machine_id in machine_ids:
-                if machine_id not in tracked_machines:
-                    tracked_machines.add(machine_id)
-                    logging.info(f"🛰️ Starting tracking for machine {machine_id}")
-                    asyncio.create_task(self._track_single_machine(machine_id))
-            await asyncio.sleep(10)
-
-    async def _track_single_machine(self, machine_id: int):
-        """
-        단일 CNC 장비의 가공 상태를 실시간 모니터링, 공구 교체, 로그 적재 및 상태 변경 처리.
-        (내부에서만 사용)
-        """
-        current_tool = None
-        operation_index = 1
-        product_uuid = str(uuid.uuid4())
-        log_doc = None
-        is_processing = False
-        current_project_id = None
-        current_filename = None
-
-        while True:
-            try:
-                status = await self.get_machine_status(machine_id)
-                logging.info(f"🔍 Machine {machine_id} status = {status.programMode}")
+        같은 NC 파일을 여러 장비로 동시에 업로드.
+        파일은 한 번만 읽고 검증한 뒤(FLEET_UPLOAD_BUFFER_LIMIT 이하면 메모리에 한 번만 올려 모든 장비가 공유),
+        최대 concurrency대씩 동시에 전송한다. 일부 장비가 실패해도 나머지 장비의 업로드는 계속 진행한다.
+        :param project_id: 프로젝트 ID
+        :param machine_ids: 장비 ID 목록 (중복은 한 번만 업로드)
+        :param file_id: 업로드할 NC 파일의 GridFS ID
+        :param concurrency: 동시에 업로드할 최대 장비 수
+        :param on_progress: 장비별 진행 상황 알림 callback(machine_id, stage, sent_bytes)
+            - stage: "preparing" | "uploading" | "done" | "failed", 코루틴 함수면 태스크로 실행
+        :raises CustomException: 파일을 읽을 수 없는 경우 (장비별 실패는 결과에 기록)
+        :return: 장비별 업로드 결과
+        """
+        # 1. 파일 한 번 읽기 (작은 파일은 청크를 모두 메모리에 보관)
+        stream, chunks, header = await self._open_nc_file(file_id)
+        filename, size = stream.filename, stream.length
+        buffered = None
+        if size <= self.FLEET_UPLOAD_BUFFER_LIMIT:
+            buffered = [header] if header else []
+            buffered += [chunk async for chunk in chunks]
+
+        # 2. O번호 검증 한 번 (결과는 FANUC 장비에만 적용)
+        fanuc_error = None
+        try:
+            self._check_fanuc_program(filename, header)
+        except CustomException as e:
+            fanuc_error = e
 
-                if status.programMode == 3:  # 가공 중
-                    program_path = await self.machine_repo.get_current_program_name(machine_id)
-                    dir_path = os.path.dirname(program_path) 
-                    program_name = os.path.basename(program_path)
-                    project_id = self.job_tracker.find_project_id_by_filename(program_name, machine_id)
+        # 코루틴 callback 태스크 (참조를 유지해 도중에 GC되지 않게 하고, 업로드가 끝나면 모두 기다림)
+        progress_tasks = set()
 
-                    if dir_path == "//CNC_MEM/USER/LIBRARY":
-                        continue
+        def progress_done(task: asyncio.Task):
+            progress_tasks.discard(task)
+            if not task.cancelled() and task.exception() is not None:
+                logging.error(f"❌ Upload progress callback failed: {task.exception()}", exc_info=task.exception())
 
-                    if not project_id:
-                        logging.warning(f"⚠️ No project found for {program_name} on machine {machine_id}")
-                        await asyncio.sleep(3)
-                        continue
+        def notify(machine_id: int, stage: str, sent: int = 0):
+            if on_progress is None:
+                return
+            try:
+                result = on_progress(machine_id, stage, sent)
+                if inspect.isawaitable(result):
+                    task = asyncio.ensure_future(result)
+                    progress_tasks.add(task)
+                    task.add_done_callback(progress_done)
+            except Exception as e:
+                logging.error(f"❌ Upload progress callback failed ({machine_id} {stage}): {e}", exc_info=True)
+
+        # 큰 파일은 1단계에서 연 스트림을 처음 전송하는 장비가 그대로 쓰고, 나머지 장비는 GridFS에서 다시 읽음
+        first_stream = None if buffered is not None else (stream, chunks, header)
+
+        async def read_chunks():
+            """공유 버퍼 또는 GridFS에서 읽은 청크"""
+            nonlocal first_stream
+            if buffered is not None:
+                for chunk in buffered:
+                    yield chunk
+                return
+            if first_stream is not None:
+                (opened, rest, first), first_stream = first_stream, None
+            else:
+                opened, rest, first = await self._open_nc_file(file_id)
+            try:
+                if first:
+                    yield first
+                async for chunk in rest:
+                    yield chunk
+            finally:
+                await opened.close()
+
+        async def body(machine_id: int):
+            """장비 하나의 요청 본문 (보낸 바이트 수를 진행 상황으로 알림)"""
+            sent = 0
+            async for chunk in read_chunks():
+                yield chunk
+                sent += len(chunk)
+                notify(machine_id, "uploading", sent)
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        # 3. 장비별 업로드 (실패는 결과로 기록하고 다른 장비는 계속 진행)
+        async def upload_one(machine_id: int) -> MachineUploadResult:
+            async with semaphore:
+                started = time.perf_counter()
+                notify(machine_id, "preparing")
+                try:
+                    # 장비 정보는 메모리 색인에서 찾으므로 먼저 확인해 없는/검증 실패 장비에는 요청을 보내지 않음
+                    machine = await self.registry.get(machine_id)
+                    if not machine:
+                        raise CustomException(ExceptionEnum.MACHINE_NOT_FOUND)
+                    if fanuc_error is not None and machine.vendorCode.lower() == "fanuc":
+                        raise fanuc_error
+                    folder_path, existing_files = await self._prepare_nc_folder(machine_id, project_id)
+                    await self._send_nc_file(
+                        project_id, machine_id, folder_path, existing_files, filename, body(machine_id), size
+                    )
+                except Exception as e:
+                    if isinstance(e, CustomException):
+                        status, error = e.status_code, f"{e.name} ({e.detail})" if e.detail else e.name
+                    else:
+                        status, error = 500, str(e)
+                    logging.warning(f"⚠️ NC upload to machine {machine_id} failed: {error}")
+                    notify(machine_id, "failed")
+                    return MachineUploadResult(machine_id=machine_id, status=status, error=error,
+                                               elapsed_ms=(time.perf_counter() - started) * 1000)
+                notify(machine_id, "done", size)
+                return MachineUploadResult(machine_id=machine_id, status=0, ncpath=folder_path,
+                                           elapsed_ms=(time.perf_counter() - started) * 1000)
 
-                    self.job_tracker.mark_processing(project_id, program_name, machine_id)
-                    tool = await self.machine_repo.get_active_tool_number(machine_id)
-
-                    if not is_processing:
-                        # 가공 시작 시 로그 초기화
-                        is_processing = True
-                        current_tool = tool
-                        current_project_id = project_id
-                        current_filename = program_name
-                        log_doc = {
-                            "project_id": project_id,
-                            "machine_id": machine_id,
-                            "product_uuid": product_uuid,
-                            "start_time": datetime.now(),
-                            "finish_time": None,
-                            "finished": False,
-                            "operations": []
-                        }
-                        await self._log_product_operation(log_doc, operation_index, current_tool, "start")
-                    elif tool != current_tool:
-                        # 공구 변경 감지 시 이전 공구 종료 + 새 공구 시작
-                        await self._log_product_operation(log_doc, operation_index, current_tool, "end")
-                        operation_index += 1
-                        await self._log_product_operation(log_doc, operation_index, tool, "start")
-                        current_tool = tool
-
-                elif is_processing:
-                    # 가공 종료 시 상태 및 로그 정리
-                    self.job_tracker.mark_finished(current_project_id, current_filename, machine_id)
-                    logging.info(f"🏁 Finished: {current_filename} on machine {machine_id}")
-                    await self._log_product_operation(log_doc, operation_index, current_tool, "end")
-                    log_doc["finish_time"] = datetime.now()
-                    log_doc["finished"] = True
-                    await self.log_repo.insert_log(log_doc)
-                    # 상태 초기화
-                    product_uuid = str(uuid.uuid4())
-                    is_processing = False
-                    log_doc = None
-                    current_project_id = None
-                    current_filename = None
+        try:
+            results = await asyncio.gather(*(upload_one(machine_id) for machine_id in dict.fromkeys(machine_ids)))
+        finally:
+            # 버퍼에 모두 읽었거나 어느 장비도 가져가지 않은 스트림 닫기
+            if buffered is not None or first_stream is not None:
+                await stream.close()
+            if progress_tasks:
+                await asyncio.gather(*progress_tasks, return_exceptions=True)
+        succeeded = sum(1 for result in results if result.status == 0)
+        return MachineFleetUploadResponse(
+            filename=filename,
+            succeeded=succeeded,
+            failed=len(results) - succeeded,
+            results=list(results)
+        )
 
-            except Exception as e:
-                logging.error(f"❌ Error tracking machine {machine_id}: {e}", exc_info=True)
-            await asyncio.sleep(3)
 
-    async def _log_product_operation(self, log_doc: dict, index: int, tool_number: int, action: str):
+    async def track_all_machines_forever(self):
+        """
+        모든 CNC 장비의 가공 상태를 백그라운드에서 지속적으로 추적.
+        장비 목록(registry)을 구독해 신규 장비가 추가되면 스케줄러(tracker)에 등록하고, 제거되면 추적을 중단.
+        조회 주기는 스케줄러가 장비별로 정함 (가공 중이면 짧게, 대기 중이면 점점 길게).
+        """
+        self.registry.subscribe(self._on_machine_changed)
+        self.tracker.start()
+        await self.registry.start()
+
+    def tracker_stats(self) -> dict:
+        """가공 상태 추적 스케줄러 상태 (장비별 조회 간격, 조회 수, 오류 수, 예정 대비 지연 등)"""
+        return self.tracker.stats()
+
+    def _on_machine_changed(self, event: str, machine: MachineInfo):
+        """장비 목록 변경 알림: 추가된 장비는 추적 시작, 제거된 장비는 추적 중단"""
+        if event == "added" and machine.id not in self._tracking_states:
+            logging.info(f"🛰️ Starting tracking for machine {machine.id}")
+            self._tracking_states[machine.id] = self._new_tracking_state()
+            self.tracker.add(machine.id)
+        elif event == "removed" and machine.id in self._tracking_states:
+            logging.info(f"🛑 Stopping tracking for machine {machine.id}")
+            self.tracker.remove(machine.id)
+            del self._tracking_states[machine.id]
+            self._product_logs.pop(machine.id, None)
+
+    def _new_tracking_state(self) -> MachineTrackingState:
+        return MachineTrackingState(self._tool_debounce, self._alarm_debounce)
+
+    @staticmethod
+    async def _timed(awaitable):
+        """읽기 하나를 실행해 (값, 샘플 시각) 반환. 샘플 시각은 요청 전송~응답 수신의 중간 시각"""
+        started = time.time()
+        value = await awaitable
+        return value, datetime.fromtimestamp((started + time.time()) / 2)
+
+    async def _read_tracking_sample(self, machine_id: int, speculative: bool):
+        """
+        추적에 필요한 값(가공 모드, 프로그램 경로, 공구 번호)을 값마다 샘플 시각과 함께 읽음.
+        - speculative=True (직전 조회에서 가공 중): 세 값을 동시에 조회 (게이트웨이 왕복 1회)
+        - speculative=False: 가공 모드만 조회하고, 가공 중이면 나머지 두 값을 동시에 조회 (대기 중이면 1회, 가공 시작 시 2회)
+        :return: (mode, program, tool). 각각 (값, 샘플 시각)이며 가공 중이 아니면 program/tool은 None
+        """
+        repo = self.machine_repo
+        if speculative:
+            mode, program, tool = await asyncio.gather(
+                self._timed(repo.get_machine_status(machine_id)),
+                self._timed(repo.get_current_program_name(machine_id)),
+                self._timed(repo.get_active_tool_number(machine_id)),
+                return_exceptions=True
+            )
+            if isinstance(mode, BaseException):
+                raise mode
+            if mode[0] != 3:
+                return mode, None, None  # 가공이 끝났으면 미리 읽은 값(실패 포함)은 사용하지 않음
+            if isinstance(program, BaseException):
+                raise program
+            return mode, program, tool
+
+        mode = await self._timed(repo.get_machine_status(machine_id))
+        if mode[0] != 3:
+            return mode, None, None
+        program, tool = await asyncio.gather(
+            self._timed(repo.get_current_program_name(machine_id)),
+            self._timed(repo.get_active_tool_number(machine_id))
+        )
+        return mode, program, tool
+
+    async def _read_alarm(self, machine_id: int):
+        """
+        첫 번째 알람 번호를 샘플 시각과 함께 읽음 (0: 알람 없음).
+        :return: (알람 번호, 샘플 시각). 읽지 못하면 None (추적은 계속)
+        """
+        params = {"machine": machine_id, "channel": 1, "alarm": 1}
+        value, at = await self._timed(self.machine_repo.get_data("/machine/channel/alarm/alarmNumber", params))
+        if isinstance(value, list):
+            value = value[0] if value else 0
+        try:
+            return int(value or 0), at
+        except (TypeError, ValueError):
+            return None
+
+    async def _update_alarm(self, machine_id: int, state: MachineTrackingState, sample):
+        """알람 번호 샘플을 반영해 연속으로 관측된 변경만 alarm_raised / alarm_cleared로 발행"""
+        if sample is None:
+            return
+        previous = state.alarm.value
+        if not state.alarm.update(*sample):
+            return
+        at = state.alarm.changed_at
+        if previous:
+            self.events.publish(MachineEvent(type=ALARM_CLEARED, machine_id=machine_id, at=at, alarm_number=previous))
+        if state.alarm.value:
+            params = {"machine": machine_id, "channel": 1, "alarm": 1}
+            text = await self.machine_repo.get_data("/machine/channel/alarm/alarmText", params)
+            if isinstance(text, list):
+                text = text[0] if text else None
+            self.events.publish(MachineEvent(
+                type=ALARM_RAISED, machine_id=machine_id, at=at, alarm_number=state.alarm.value,
+                alarm_text=text if isinstance(text, str) else None
+            ))
+
+    async def _poll_machine(self, machine_id: int) -> bool:
+        """
+        단일 CNC 장비의 가공 상태를 한 번 조회해 상태 변경 이벤트(가공 시작/종료, 공구 교체, 알람 발생/해제)를 발행
+        (스케줄러가 주기적으로 호출, 내부에서만 사용).
+        이벤트 시각은 처리 시점이 아니라 바뀐 값을 처음 읽은 샘플 시각이다.
+        알람은 구독자가 있을 때만 가공 상태와 함께 읽는다.
+        :return: 가공 중이면 True (스케줄러가 짧은 간격으로 다시 조회)
+        """
+        state = self._tracking_states.get(machine_id)
+        if state is None:
+            return False
+
+        # 직전에 가공 중이었으면 프로그램/공구도 함께 미리 조회
+        sample = self._read_tracking_sample(machine_id, speculative=state.is_processing)
+        if self.events.wants(*ALARM_EVENTS):
+            sample, alarm = await asyncio.gather(sample, self._read_alarm(machine_id))
+            await self._update_alarm(machine_id, state, alarm)
+        else:
+            sample = await sample
+        (program_mode, mode_at), program, tool_sample = sample
+        logging.info(f"🔍 Machine {machine_id} status = {program_mode}")
+
+        if program_mode == 3:  # 가공 중
+            program_path = program[0]
+            dir_path = os.path.dirname(program_path) 
+            program_name = os.path.basename(program_path)
+            if dir_path == "//CNC_MEM/USER/LIBRARY":
+                return True
+
+            # 프로젝트 연결과 상태 기록은 작업 추적기가 있을 때만. 이벤트는 프로젝트가 없어도 발행 (project_id=None)
+            project_id = None
+            if self.job_tracker is not None:
+                project_id = self.job_tracker.find_project_id_by_filename(program_name, machine_id)
+                if project_id:
+                    self.job_tracker.mark_processing(project_id, program_name, machine_id)
+                else:
+                    logging.warning(f"⚠️ No project found for {program_name} on machine {machine_id}")
+            tool, tool_at = tool_sample
+            if tool == -1:
+                tool = None  # 공구 번호를 읽지 못함: 변경으로 보지 않고 샘플이 없는 것으로 처리
+
+            if not state.is_processing:
+                state.is_processing = True
+                state.current_project_id = project_id
+                state.current_filename = program_name
+                state.tool.reset(tool)
+                self.events.publish(MachineEvent(
+                    type=PROGRAM_STARTED, machine_id=machine_id, at=mode_at,
+                    project_id=project_id, program=program_name, tool=tool
+                ))
+            elif tool is not None and state.current_tool is None:
+                state.tool.reset(tool)  # 가공 시작 시 읽지 못한 공구 번호를 처음 읽음 (교체 아님)
+            elif tool is not None:
+                previous = state.current_tool
+                if state.tool.update(tool, tool_at):
+                    self.events.publish(MachineEvent(
+                        type=TOOL_CHANGED, machine_id=machine_id, at=state.tool.changed_at,
+                        tool=tool, previous_tool=previous
+                    ))
+            return True
+
+        if state.is_processing:
+            if self.job_tracker is not None and state.current_project_id:
+                self.job_tracker.mark_finished(state.current_project_id, state.current_filename, machine_id)
+            logging.info(f"🏁 Finished: {state.current_filename} on machine {machine_id}")
+            self.events.publish(MachineEvent(
+                type=PROGRAM_FINISHED, machine_id=machine_id, at=mode_at,
+                project_id=state.current_project_id, program=state.current_filename, tool=state.current_tool
+            ))
+            state.finish()
+        return False
+
+    async def _log_product_event(self, event: MachineEvent):
+        """
+        가공 로그 구독자 (program_started / tool_changed / program_finished).
+        가공 시작 시 로그를 만들고 공구 교체마다 operation을 추가하며, 가공 종료 시 MongoDB에 적재.
+        (log_repo가 있을 때만 구독)
+        """
+        if event.type == PROGRAM_STARTED:
+            if not event.project_id:
+                return  # 프로젝트와 연결되지 않은 가공은 로그를 남기지 않음
+            log_doc = {
+                "project_id": event.project_id,
+                "machine_id": event.machine_id,
+                "product_uuid": str(uuid.uuid4()),
+                "start_time": event.at,
+                "finish_time": None,
+                "finished": False,
+                "operations": []
+            }
+            self._product_logs[event.machine_id] = {"log_doc": log_doc, "operation_index": 1, "tool": event.tool}
+            await self._log_product_operation(log_doc, 1, event.tool, "start", at=event.at)
+            return
+
+        product = self._product_logs.get(event.machine_id)
+        if product is None:
+            return  # 시작을 보지 못한 가공 (추적 도중 등록된 구독 등)
+        log_doc = product["log_doc"]
+        await self._log_product_operation(log_doc, product["operation_index"], product["tool"], "end", at=event.at)
+        if event.type == TOOL_CHANGED:
+            product["operation_index"] += 1
+            product["tool"] = event.tool
+            await self._log_product_operation(log_doc, product["operation_index"], event.tool, "start", at=event.at)
+        elif event.type == PROGRAM_FINISHED:
+            del self._product_logs[event.machine_id]
+            log_doc["finish_time"] = event.at
+            log_doc["finished"] = True
+            await self.log_repo.insert_log(log_doc)
+
+    async def _log_product_operation(self, log_doc: dict, index: int, tool_number: int, action: str,
+                                     at: datetime = None):
         """
         가공/공구 로그를 기록 (operation 배열에 추가/수정).
         :param log_doc: 현재 가공 로그 dict
         :param index: operation index
         :param tool_number: 공구 번호
         :param action: 'start' or 'end'
+        :param at: 기록할 시각 (값을 읽은 샘플 시각, 없으면 현재 시각)
         """
+        at = at or datetime.now()
         if action == "start":
             operation = {
                 "uuid": str(uuid.uuid4()),
                 "index": index,
                 "toolNumber": tool_number,
-                "start_time": datetime.now(),
+                "start_time": at,
                 "end_time": None
             }
             log_doc["operations"].append(operation)
         elif action == "end":
             for op in reversed(log_doc["operations"]):
                 if op["index"] == index and op["end_time"] is None:
-                    op["end_time"] = datetime.now()
+                    op["end_time"] = at
                     break
  
 
@@ -250,9 +611,7 @@ class MachineService:
         현재 시스템에 등록된 모든 장비 정보를 반환.
         :return: MachineListResponse (장비 목록)
         """
-        raw_list = await self.machine_repo.get_machine_list()
-        machines = [MachineInfo(**item) for item in raw_list]
-        return MachineListResponse(machines=machines)
+        return await self.registry.list()
 
     async def get_category_info(self, category: str):
         """
@@ -493,97 +852,29 @@ class MachineService:
     
     
     
-    async def get_toolLife_info(self, machine: int):
+    async def get_toolLife_info(self, machine: int, since: int = None):
         """
-        등록순 기준 공구 수명 정보를 비동기적으로 효율적이게 조회합니다. 장비 번호만 입력하면 됩니다.
+        등록순 기준 공구 수명 정보를 조회합니다. 장비 번호만 입력하면 됩니다.
+        공구 구성(공구/날 수, 수명 단위, 최대 수명)은 캐시해 두고, 남은 수명/사용 횟수는 최근 사용한 공구 위주로 다시 읽습니다.
         Args:
             machine (int): 조회할 장비 번호.
+            since (int, optional): 이전 조회 결과의 version. 주면 그 이후 바뀐 행만 {"version", "full", "rows"}로 반환합니다.
+                (처음에는 0, full이 true면 공구 구성이 바뀌어 전체 표를 반환한 것)
         """
-        machine_param = {"machine": machine, "toolArea": 1}
-        numberOfRegisteredTools = await self.machine_repo.get_data("/machine/toolArea/numberOfRegisteredTools", machine_param)
+        result = await self.tool_life.get(machine, since=since)
+        if since is None and isinstance(result, dict) and "rows" in result:
+            return result["rows"]
+        return result
 
-        # 1) 에러 응답이면 바로 리턴
-        if isinstance(numberOfRegisteredTools, dict) and numberOfRegisteredTools.get("__error__"):
-            return numberOfRegisteredTools
-
-        # 2) 정상 값 정제
-        # 리스트 형태인 경우 [17] → 17
-        if isinstance(numberOfRegisteredTools, list):
-            if numberOfRegisteredTools and isinstance(numberOfRegisteredTools[0], int):
-                numberOfRegisteredTools = numberOfRegisteredTools[0]
-            else:
-                return "유효한 공구 개수를 확인할 수 없습니다."
-
-        # 3) int가 아니면 잘못된 값
-        if not isinstance(numberOfRegisteredTools, int):
-            return "유효한 공구 개수를 확인할 수 없습니다."
-
-        # 4) 정상 값인데 0 이하
-        if numberOfRegisteredTools <= 0:
-            return "등록된 공구가 없습니다."
-
-        # 1. 모든 공구의 날(edge) 개수를 동시에 조회
-        edge_tasks = []
-        for i in range(1, numberOfRegisteredTools + 1):
-            edge_params = machine_param.copy()
-            edge_params["registerTools"] = i
-            edge_tasks.append(
-                self.machine_repo.get_data("/machine/toolArea/registerTools/numberOfEdges", edge_params)
-            )
-        numberOftoolEdgesList = await asyncio.gather(*edge_tasks)
-        cleaned_edges_list = [n if isinstance(n, int) else 1 for n in numberOftoolEdgesList]
-        # 2. 모든 공구의 모든 날에 대한 수명 정보 요청 태스크 생성
-        life_info_tasks = []
-        for i, num_edges in enumerate(cleaned_edges_list):
-            tool_num = i + 1
-            
-            for j in range(1, num_edges + 1):
-                base_params = {**machine_param, "registerTools": tool_num, "toolEdge": j}
-                
-                # 4가지 수명 정보 요청을 태스크 리스트에 추가
-                life_info_tasks.append(self.machine_repo.get_data("/machine/toolArea/registerTools/toolEdge/toolLife/restToolLife", {**base_params, "restToolLife": 1}))
-                life_info_tasks.append(self.machine_repo.get_data("/machine/toolArea/registerTools/toolEdge/toolLife/maxToolLife", {**base_params, "maxToolLife": 1}))
-                life_info_tasks.append(self.machine_repo.get_data("/machine/toolArea/registerTools/toolEdge/toolLife/toolLifeCount", {**base_params, "toolLifeCount": 1}))
-                base_params = {**{k: v for k, v in base_params.items() if k != "toolEdge"}, "toolLifeUnit": 1}
-                life_info_tasks.append(self.machine_repo.get_data("/machine/toolArea/registerTools/toolLifeUnit", base_params))
-                #life_info_tasks.append(self.machine_repo.get_data("/machine/toolArea/registerTools/toolEdge/toolLife/toolLifeAlarm", base_params))
-
-        if not life_info_tasks:
-            return "등록된 공구의 날 정보가 없습니다."
-
-        # 3. 생성된 모든 수명 정보 태스크를 한 번에 실행
-        all_results = await asyncio.gather(*life_info_tasks)
-
-        # 4. 결과를 올바른 구조로 조합
-        toolLife_info = []
-        task_idx = 0  # 'results' 리스트를 순회하기 위한 인덱스 카운터
-    
-        for i, num_edges in enumerate(cleaned_edges_list):
-            tool_num = i + 1
-             # 날 개수가 유효한 정수일 때만 처리
-            
-            for j in range(1, num_edges + 1):
-                # 4개의 결과가 한 세트
-                result_chunk = all_results[task_idx : task_idx + 4]
-
-                # API 에러 처리: 4개 중 하나라도 에러면 'error'로 표기, 아니면 값 할당
-                rest_life = result_chunk[0] if not (isinstance(result_chunk[0], dict) and result_chunk[0].get("__error__")) else "error"
-                max_life = result_chunk[1] if not (isinstance(result_chunk[1], dict) and result_chunk[1].get("__error__")) else "error"
-                life_count = result_chunk[2] if not (isinstance(result_chunk[2], dict) and result_chunk[2].get("__error__")) else "error"
-                #life_alarm = result_chunk[3] if not (isinstance(result_chunk[3], dict) and result_chunk[3].get("__error__")) else "error"
-                life_unit = result_chunk[3] if not (isinstance(result_chunk[3], dict) and result_chunk[3].get("__error__")) else "error"
-                toolLife_info.append({
-                    "registerTools": tool_num,
-                    "toolEdges": j,
-                    "restToolLife": rest_life,
-                    "maxToolLife": max_life,
-                    "toolLifeCount": life_count,
-                    "toolLifeUnit": life_unit
-                    #"toolLifeAlarm": life_alarm
-                })
-                task_idx += 4 # 다음 결과 세트를 위해 인덱스를 4 증가
-
-        return toolLife_info
+    async def stream_toolLife_info(self, machine: int):
+        """
+        공구 수명 정보를 공구 단위로 흘려보내는 비동기 제너레이터 (get_toolLife_info의 스트리밍 버전).
+        공구 구성을 새로 읽는 경우 공구별 조회가 끝나는 대로 그 공구의 행 목록을 yield하므로
+        느린 공구가 있어도 나머지 공구의 결과를 먼저 받을 수 있습니다.
+        예) async for rows in service.stream_toolLife_info(1): ...
+        """
+        async for rows in self.tool_life.stream(machine):
+            yield rows
     # =============================================================================================================
     
     
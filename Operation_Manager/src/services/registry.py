@@ -0,0 +1,155 @@
+import asyncio
+import inspect
+import logging
+import time
+from typing import Callable, Dict, List, Optional
+
+from src.repositories import MachineRepository
+from src.schemas.machine import MachineInfo, MachineListResponse
+
+
+class MachineRegistry:
+    """
+    /machine/list 결과를 메모리에 보관하는 장비 목록.
+    - 백그라운드에서 refresh_interval초마다 갱신하고 (start), 장비 ID/제조사별 색인으로 바로 조회
+    - 갱신 시 내용이 바뀐 장비만 MachineInfo를 다시 만들고, 목록 응답(MachineListResponse)은 바뀐 경우에만 새로 만듦
+    - 장비가 추가/제거/변경되면 구독자에게 알림 (subscribe)
+    """
+
+    def __init__(self, machine_repo: MachineRepository, refresh_interval: float = 10.0):
+        """
+        :param machine_repo: 장비 목록을 조회할 리포지토리
+        :param refresh_interval: 백그라운드 갱신 주기(초). 백그라운드 갱신을 쓰지 않을 때는 이보다 오래된 목록을 조회하면 갱신
+        """
+        self.machine_repo = machine_repo
+        self.refresh_interval = refresh_interval
+
+        self._raw: Dict[int, dict] = {}
+        self._machines: Dict[int, MachineInfo] = {}
+        self._by_vendor: Dict[str, Dict[int, MachineInfo]] = {}
+        self._response: Optional[MachineListResponse] = None
+        self._loaded_at = 0.0
+        self._refreshing: Optional[asyncio.Task] = None
+        self._task: Optional[asyncio.Task] = None
+        self._subscribers: List[Callable] = []
+
+    # ------------------------------------------------------------------ 조회
+
+    async def list(self) -> MachineListResponse:
+        """전체 장비 목록 (처음 조회하거나 오래된 경우에만 게이트웨이에서 갱신)"""
+        await self._ensure_fresh()
+        return self._response
+
+    async def get(self, machine_id: int) -> Optional[MachineInfo]:
+        """
+        장비 ID로 조회. 목록에 없으면 새로 추가된 장비일 수 있으므로 한 번 갱신 후 다시 찾는다.
+        :return: MachineInfo 또는 None
+        """
+        await self._ensure_fresh()
+        machine = self._machines.get(machine_id)
+        if machine is None:
+            await self.refresh()
+            machine = self._machines.get(machine_id)
+        return machine
+
+    async def by_vendor(self, vendor_code: str) -> List[MachineInfo]:
+        """제조사 코드(대소문자 무시)로 장비 목록 조회"""
+        await self._ensure_fresh()
+        return list(self._by_vendor.get(vendor_code.lower(), {}).values())
+
+    def ids(self) -> List[int]:
+        """현재 보관 중인 장비 ID 목록 (갱신하지 않음)"""
+        return list(self._machines)
+
+    # ------------------------------------------------------------------ 갱신
+
+    async def _ensure_fresh(self):
+        running = self._task is not None and not self._task.done()
+        if self._response is None or (not running and time.monotonic() - self._loaded_at > self.refresh_interval):
+            await self.refresh()
+
+    async def refresh(self):
+        """게이트웨이에서 장비 목록을 다시 조회 (동시에 여러 번 호출되면 한 번만 조회)"""
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.create_task(self._refresh())
+        await asyncio.shield(self._refreshing)
+
+    async def _refresh(self):
+        raw_list = await self.machine_repo.get_machine_list()
+        raw = {item["id"]: item for item in raw_list}
+
+        events = []
+        machines = {}
+        for machine_id, item in raw.items():
+            previous = self._raw.get(machine_id)
+            if previous == item:
+                machines[machine_id] = self._machines[machine_id]
+                continue
+            machines[machine_id] = MachineInfo(**item)
+            events.append(("added" if previous is None else "updated", machines[machine_id]))
+        events += [("removed", machine) for machine_id, machine in self._machines.items() if machine_id not in raw]
+
+        if events or self._response is None:
+            by_vendor = {}
+            for machine_id, machine in machines.items():
+                by_vendor.setdefault(machine.vendorCode.lower(), {})[machine_id] = machine
+            self._raw, self._machines, self._by_vendor = raw, machines, by_vendor
+            self._response = MachineListResponse(machines=list(machines.values()))
+        self._loaded_at = time.monotonic()
+
+        for event, machine in events:
+            self._notify(event, machine)
+
+    def start(self):
+        """백그라운드 갱신 시작 (이미 실행 중이면 무시)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return self._task
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                # 갱신에 실패하면 이전 목록을 그대로 사용
+                logging.error(f"❌ Machine list refresh failed: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # ------------------------------------------------------------------ 구독
+
+    def subscribe(self, callback: Callable):
+        """
+        장비 변경 알림 등록. callback(event, machine)
+        - event: "added" | "removed" | "updated", machine: MachineInfo
+        - 코루틴 함수면 태스크로 실행
+        이미 보관 중인 장비는 등록 즉시 "added"로 알린다.
+        """
+        self._subscribers.append(callback)
+        for machine in self._machines.values():
+            self._call(callback, "added", machine)
+
+    def unsubscribe(self, callback: Callable):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def _notify(self, event: str, machine: MachineInfo):
+        for callback in list(self._subscribers):
+            self._call(callback, event, machine)
+
+    @staticmethod
+    def _call(callback: Callable, event: str, machine: MachineInfo):
+        try:
+            result = callback(event, machine)
+            if inspect.isawaitable(result):
+                asyncio.ensure_future(result)
+        except Exception as e:
+            logging.error(f"❌ Machine registry subscriber failed ({event} {machine.id}): {e}", exc_info=True)
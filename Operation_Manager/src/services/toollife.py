@@ -0,0 +1,336 @@
+import asyncio
+import itertools
+import logging
+import time
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional
+
+from src.repositories import MachineRepository
+
+LIFE_ENDPOINT = "/machine/toolArea/registerTools/toolEdge/toolLife"
+
+
+def _is_error(value) -> bool:
+    return isinstance(value, dict) and bool(value.get("__error__"))
+
+
+def _scalar(value):
+    """TORUS 응답의 값 배열([17])에서 값을 꺼냄 (공구/날 수 계산용, 모의 서버처럼 값만 오면 그대로)"""
+    return value[0] if isinstance(value, list) and len(value) == 1 else value
+
+
+def _field(value):
+    """get_data 결과를 표의 값으로 (에러 객체는 'error', 그 외에는 응답 값 그대로)"""
+    return "error" if _is_error(value) else value
+
+
+class _MachineToolTable:
+    """장비 하나의 공구 수명 표와 갱신 상태"""
+
+    def __init__(self):
+        self.edges: Dict[int, int] = {}          # 공구(등록 순번) -> 날 수
+        self.rows: Dict[tuple, dict] = {}        # (공구, 날) -> 행
+        self.row_versions: Dict[tuple, int] = {}  # (공구, 날) -> 행이 마지막으로 바뀐 버전
+        self.version = 0
+        self.structure_version = 0  # 공구/날 구성이 마지막으로 바뀐 버전 (이전 버전 기준 요청은 전체 표를 돌려줌)
+        self.structure_at = 0.0     # 구조를 읽은 시각 (monotonic, 0이면 다시 읽어야 함)
+        self.life_at: Dict[int, float] = {}    # 공구 -> 수명 값을 읽은 시각
+        self.active_at: Dict[int, float] = {}  # 공구 -> 마지막으로 사용 중이었던 시각 (수명 값 변화/공구 교체 이벤트)
+        self.refreshing: Optional[asyncio.Task] = None
+        self.background: Optional[asyncio.Task] = None  # 사용하지 않는 공구의 수명 값 갱신
+
+
+class ToolLifeTable:
+    """
+    장비별 공구 수명 표(get_toolLife_info)를 메모리에 보관하고 바뀔 수 있는 값만 다시 읽는 캐시.
+    - 구조(공구 수, 공구별 날 수/수명 단위, 날별 최대 수명)는 structure_ttl초마다 다시 읽음 (조회에 실패한 값이 있으면 다음 조회 때)
+    - 수명 값(restToolLife, toolLifeCount)은 최근 사용한 공구(active_window초 안에 값이 바뀌었거나 mark_active로 알려진 공구)만
+      active_ttl초마다 다시 읽고, 나머지 공구는 idle_ttl초마다 백그라운드에서 나눠 읽음 (조회는 기다리지 않고 캐시 값을 돌려줌).
+      다시 읽을 최근 사용 공구가 없으면 게이트웨이를 기다리지 않고 캐시에서 바로 돌려줌
+    - 값이 바뀐 행마다 버전을 올려 get(machine_id, since=버전)으로 그 이후 바뀐 행만 돌려줌
+    - 같은 장비를 동시에 조회하면 갱신은 한 번만 실행
+    - 구조를 읽을 때 공구마다 날 수를 받는 즉시 그 공구의 수명 값을 요청하므로 느린 응답이 있어도 다른 공구를 막지 않음
+      (stream으로 공구별 행을 도착하는 대로 받을 수 있음)
+    """
+
+    def __init__(self, machine_repo: MachineRepository, structure_ttl: float = 600.0, active_ttl: float = 1.0,
+                 idle_ttl: float = 60.0, active_window: float = 300.0):
+        """
+        :param machine_repo: 공구 정보를 조회할 리포지토리
+        :param structure_ttl: 공구 구성(공구/날 수, 수명 단위, 최대 수명)을 다시 읽는 주기(초)
+        :param active_ttl / idle_ttl: 최근 사용한 공구 / 나머지 공구의 수명 값을 다시 읽는 주기(초)
+        :param active_window: 수명 값이 바뀐 뒤 이 시간(초) 동안은 최근 사용한 공구로 간주
+        """
+        self.machine_repo = machine_repo
+        self.structure_ttl = structure_ttl
+        self.active_ttl = active_ttl
+        self.idle_ttl = max(active_ttl, idle_ttl)
+        self.active_window = active_window
+        self._tables: Dict[int, _MachineToolTable] = {}
+        self._stats = {"calls": 0, "structure_loads": 0, "life_loads": 0, "tools_refreshed": 0, "cached": 0}
+
+    # ------------------------------------------------------------------ 조회
+
+    async def get(self, machine_id: int, since: int = None):
+        """
+        공구 수명 표 조회 (필요한 값만 게이트웨이에서 갱신).
+        :param since: 이전 응답의 version. 주면 그 이후 바뀐 행만 돌려줌 (공구 구성이 바뀌었으면 전체 표, full=True)
+        :return: {"version": int, "full": bool, "rows": [행, ...]}
+            공구 수를 읽지 못하면 에러 객체, 공구가 없거나 공구 수가 잘못된 값이면 안내 문자열
+        """
+        self._stats["calls"] += 1
+        table = self._tables.setdefault(machine_id, _MachineToolTable())
+        if table.refreshing is None or table.refreshing.done():
+            table.refreshing = asyncio.create_task(self._refresh(machine_id, table))
+        # 한 호출자가 취소되어도 같은 갱신을 기다리는 다른 호출자에게는 영향이 없도록 shield
+        problem = await asyncio.shield(table.refreshing)
+        if problem is not None:
+            return problem
+
+        if since is None or since < table.structure_version:
+            keys = list(table.rows)
+            full = True
+        else:
+            keys = [key for key in table.rows if table.row_versions[key] > since]
+            full = False
+        return {"version": table.version, "full": full, "rows": [dict(table.rows[key]) for key in keys]}
+
+    async def stream(self, machine_id: int) -> AsyncIterator:
+        """
+        공구 수명 표를 공구 단위(그 공구의 행 목록)로 흘려보냄.
+        공구 구성을 다시 읽어야 하면 공구별 조회가 끝나는 대로 yield (완료 순서라 등록 순번 순이 아님),
+        캐시가 유효하면 get()처럼 필요한 값만 갱신한 뒤 등록 순번 순으로 yield.
+        공구 수를 읽지 못하면 에러 객체/안내 문자열 하나만 yield
+        """
+        table = self._tables.setdefault(machine_id, _MachineToolTable())
+        if (table.refreshing is None or table.refreshing.done()) and self._structure_due(table):
+            self._stats["calls"] += 1
+            queue: asyncio.Queue = asyncio.Queue()
+            table.refreshing = asyncio.create_task(self._refresh(machine_id, table, on_tool=queue.put_nowait))
+            table.refreshing.add_done_callback(lambda _: queue.put_nowait(None))
+            while (rows := await queue.get()) is not None:
+                yield rows
+            problem = table.refreshing.result()
+            if problem is not None:
+                yield problem
+            return
+
+        result = await self.get(machine_id)
+        if not (isinstance(result, dict) and "rows" in result):
+            yield result
+            return
+        for _, rows in itertools.groupby(result["rows"], key=lambda row: row["registerTools"]):
+            yield list(rows)
+
+    def mark_active(self, machine_id: int, tool: int):
+        """
+        공구 사용을 알림. 표에 있는 공구면 다음 조회부터 active_ttl로 갱신
+        :param tool: 등록 순번(registerTools). 활성 공구 번호(T 코드)와는 다름
+        """
+        table = self._tables.get(machine_id)
+        if table is not None and tool in table.edges:
+            table.active_at[tool] = time.monotonic()
+
+    def invalidate(self, machine_id: int = None):
+        """다음 조회 때 공구 구성부터 다시 읽도록 표를 무효화 (machine_id가 없으면 전체 장비)"""
+        tables = self._tables.values() if machine_id is None else filter(None, [self._tables.get(machine_id)])
+        for table in tables:
+            table.structure_at = 0.0
+
+    async def close(self):
+        """진행 중인 갱신 태스크 취소"""
+        for table in self._tables.values():
+            for task in (table.refreshing, table.background):
+                if task is not None:
+                    task.cancel()
+
+    def stats(self) -> dict:
+        return {**self._stats, "machines": len(self._tables),
+                "rows": sum(len(table.rows) for table in self._tables.values())}
+
+    # ------------------------------------------------------------------ 갱신
+
+    def _is_active(self, table: _MachineToolTable, tool: int, now: float) -> bool:
+        return now - table.active_at.get(tool, float("-inf")) <= self.active_window
+
+    def _structure_due(self, table: _MachineToolTable) -> bool:
+        return not table.structure_at or time.monotonic() - table.structure_at > self.structure_ttl
+
+    async def _refresh(self, machine_id: int, table: _MachineToolTable,
+                       on_tool: Callable[[List[dict]], None] = None):
+        """표를 최신으로 맞춤. 문제가 있으면 get이 돌려줄 에러 객체/안내 문자열, 없으면 None"""
+        now = time.monotonic()
+        if self._structure_due(table):
+            return await self._load_structure(machine_id, table, on_tool)
+
+        active, idle = [], []
+        for tool in table.edges:
+            age = now - table.life_at.get(tool, 0.0)
+            if self._is_active(table, tool, now):
+                if age > self.active_ttl:
+                    active.append(tool)
+            elif age > self.idle_ttl:
+                idle.append(tool)
+        # 사용하지 않는 공구는 기다리지 않고 백그라운드에서 갱신 (이번 응답은 캐시 값)
+        if idle and (table.background is None or table.background.done()):
+            table.background = asyncio.create_task(self._load_life(machine_id, table, idle))
+            table.background.add_done_callback(lambda task: self._background_done(machine_id, task))
+        if not active:
+            self._stats["cached"] += 1
+            return None
+        await self._load_life(machine_id, table, active)
+        return None
+
+    @staticmethod
+    def _background_done(machine_id: int, task: asyncio.Task):
+        """백그라운드 수명 값 갱신 종료. 아무도 기다리지 않는 태스크이므로 오류는 여기서 기록"""
+        if not task.cancelled() and task.exception() is not None:
+            logging.error(f"❌ Tool life background refresh failed (machine {machine_id}): {task.exception()}",
+                          exc_info=task.exception())
+
+    async def _load_tool(self, machine_param: dict, tool: int):
+        """
+        공구 하나의 구조와 수명 값 조회. 날 수를 받는 즉시 그 공구의 날별 값을 요청 (다른 공구를 기다리지 않음)
+        :return: (공구, 날 수를 제대로 읽었는지, 수명 단위, [(날, 최대 수명, 남은 수명, 사용 횟수), ...])
+        """
+        repo = self.machine_repo
+        params = {**machine_param, "registerTools": tool}
+        n, unit = await asyncio.gather(
+            repo.get_data("/machine/toolArea/registerTools/numberOfEdges", params),
+            repo.get_data("/machine/toolArea/registerTools/toolLifeUnit", {**params, "toolLifeUnit": 1}),
+        )
+        n = _scalar(n)
+        edges = range(1, (n if isinstance(n, int) else 1) + 1)
+        values = await asyncio.gather(*(
+            repo.get_data(f"{LIFE_ENDPOINT}/{field}", self._edge_params(machine_param, (tool, edge), field))
+            for edge in edges for field in ("maxToolLife", "restToolLife", "toolLifeCount")
+        ))
+        return tool, isinstance(n, int), _field(unit), [(edge, *values[3 * i:3 * i + 3]) for i, edge in enumerate(edges)]
+
+    async def _load_structure(self, machine_id: int, table: _MachineToolTable,
+                              on_tool: Callable[[List[dict]], None] = None):
+        """
+        공구 수를 읽은 뒤 공구마다 구조(날 수, 수명 단위, 날별 최대 수명)와 수명 값을 읽어 표를 다시 만듦.
+        공구별 조회는 서로 기다리지 않으며(느린 공구 하나가 다른 공구의 조회를 붙잡지 않음),
+        on_tool을 주면 공구 하나가 끝날 때마다 그 공구의 행 목록으로 호출 (완료 순서)
+        """
+        self._stats["structure_loads"] += 1
+        machine_param = {"machine": machine_id, "toolArea": 1}
+        count = await self.machine_repo.get_data("/machine/toolArea/numberOfRegisteredTools", machine_param)
+
+        # 1) 에러 응답이면 바로 리턴
+        if _is_error(count):
+            return count
+        # 2) 정상 값 정제: 리스트 형태인 경우 [17] → 17
+        if isinstance(count, list):
+            if count and isinstance(count[0], int):
+                count = count[0]
+            else:
+                return "유효한 공구 개수를 확인할 수 없습니다."
+        # 3) int가 아니면 잘못된 값
+        if not isinstance(count, int):
+            return "유효한 공구 개수를 확인할 수 없습니다."
+        # 4) 정상 값인데 0 이하
+        if count <= 0:
+            return "등록된 공구가 없습니다."
+
+        loaded = await self._load_tools(machine_param, count, on_tool)
+        return self._apply_structure(table, loaded)
+
+    async def _load_tools(self, machine_param: dict, count: int, on_tool: Callable[[List[dict]], None] = None):
+        """
+        모든 공구의 조회를 동시에 시작하고 끝나는 순서대로 결과를 모음.
+        :return: {공구: (날 수를 제대로 읽었는지, 수명 단위, [(날, 최대 수명, 남은 수명, 사용 횟수), ...])}
+        """
+        tasks = [asyncio.create_task(self._load_tool(machine_param, tool)) for tool in range(1, count + 1)]
+        loaded = {}
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                tool, edges_ok, unit, edges = await next_done
+                loaded[tool] = (edges_ok, unit, edges)
+                if on_tool is not None:
+                    on_tool([{"registerTools": tool, "toolEdges": edge, "restToolLife": _field(rest),
+                              "maxToolLife": _field(max_life), "toolLifeCount": _field(life_count),
+                              "toolLifeUnit": unit} for edge, max_life, rest, life_count in edges])
+        finally:
+            for task in tasks:
+                task.cancel()
+        return loaded
+
+    def _apply_structure(self, table: _MachineToolTable, loaded: dict):
+        """_load_tools 결과로 표를 다시 만듦. 문제가 있으면 안내 문자열, 없으면 None"""
+        keys = [(tool, edge[0]) for tool in sorted(loaded) for edge in loaded[tool][2]]
+        if not keys:
+            return "등록된 공구의 날 정보가 없습니다."
+        values = [edge[1:] for tool in sorted(loaded) for edge in loaded[tool][2]]
+        complete = all(edges_ok and unit != "error" and not any(_is_error(edge[1]) for edge in edges)
+                       for edges_ok, unit, edges in loaded.values())
+
+        # 표 재구성 (공구/날 구성이 바뀌었으면 구조 버전을 올림)
+        edges = {tool: len(loaded[tool][2]) for tool in sorted(loaded)}
+        if list(table.rows) != keys:
+            table.version += 1
+            table.structure_version = table.version
+            table.rows = {key: table.rows.get(key) or self._new_row(key) for key in keys}
+            table.row_versions = {key: table.row_versions.get(key, table.version) for key in keys}
+            table.life_at = {tool: at for tool, at in table.life_at.items() if tool in edges}
+            table.active_at = {tool: at for tool, at in table.active_at.items() if tool in edges}
+        table.edges = edges
+        for key, (max_life, _, _) in zip(keys, values):
+            self._update_row(table, key, {"toolLifeUnit": loaded[key[0]][1], "maxToolLife": _field(max_life)})
+        now = time.monotonic()
+        self._apply_life(table, keys, [(rest, life_count) for _, rest, life_count in values], now)
+        # 사용하지 않는 공구들이 한꺼번에 다시 읽을 때가 되지 않도록 idle_ttl 구간에 나눠 배치
+        for i, tool in enumerate(edges):
+            table.life_at[tool] = now - self.idle_ttl * i / len(edges)
+        table.structure_at = now if complete else 0.0
+        return None
+
+    @staticmethod
+    def _edge_params(machine_param: dict, key: tuple, field: str) -> dict:
+        tool, edge = key
+        return {**machine_param, "registerTools": tool, "toolEdge": edge, field: 1}
+
+    async def _load_life(self, machine_id: int, table: _MachineToolTable, tools: Iterable[int]):
+        """공구들의 수명 값(restToolLife, toolLifeCount)을 동시에 조회해 표에 반영"""
+        keys = [(tool, edge) for tool in tools for edge in range(1, table.edges[tool] + 1)]
+        machine_param = {"machine": machine_id, "toolArea": 1}
+        self._stats["life_loads"] += 1
+        results = await asyncio.gather(*(
+            self.machine_repo.get_data(f"{LIFE_ENDPOINT}/{field}", self._edge_params(machine_param, key, field))
+            for key in keys for field in ("restToolLife", "toolLifeCount")
+        ))
+        self._apply_life(table, keys, list(zip(results[0::2], results[1::2])), time.monotonic())
+
+    def _apply_life(self, table: _MachineToolTable, keys: List[tuple], lives: List[tuple], now: float):
+        """
+        수명 값 (restToolLife, toolLifeCount) 조회 결과를 표에 반영. 이전 값에서 바뀐 공구는 최근 사용한 공구로 표시.
+        조회하는 동안 구조를 다시 읽어 없어진 행은 건너뜀
+        """
+        tools = set()
+        for key, (rest, count) in zip(keys, lives):
+            if key not in table.rows:
+                continue
+            tools.add(key[0])
+            first = table.rows[key]["restToolLife"] is None
+            fields = {"restToolLife": _field(rest), "toolLifeCount": _field(count)}
+            if self._update_row(table, key, fields) and not first and "error" not in fields.values():
+                table.active_at[key[0]] = now
+        for tool in tools:
+            table.life_at[tool] = now
+        self._stats["tools_refreshed"] += len(tools)
+
+    @staticmethod
+    def _new_row(key: tuple) -> dict:
+        return {"registerTools": key[0], "toolEdges": key[1], "restToolLife": None, "maxToolLife": None,
+                "toolLifeCount": None, "toolLifeUnit": None}
+
+    @staticmethod
+    def _update_row(table: _MachineToolTable, key: tuple, fields: dict) -> bool:
+        """행의 값을 바꾸고, 바뀐 값이 있으면 버전을 올려 True"""
+        row = table.rows[key]
+        if all(row[name] == value for name, value in fields.items()):
+            return False
+        row.update(fields)
+        table.version += 1
+        table.row_versions[key] = table.version
+        return True
@@ -0,0 +1,188 @@
+import asyncio
+import heapq
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+
+class _MachineSchedule:
+    """장비 하나의 조회 일정과 지연 통계"""
+
+    def __init__(self, machine_id: int, due: float, interval: float):
+        self.machine_id = machine_id
+        self.due = due            # 다음 조회 예정 시각 (monotonic)
+        self.interval = interval  # 현재 조회 간격(초)
+        self.busy = False         # 마지막 조회에서 가공 중이었는지
+        self.task: Optional[asyncio.Task] = None
+        self.polls = 0
+        self.errors = 0
+        self.last_lag = 0.0       # 예정 시각보다 늦게 조회를 시작한 시간(초)
+        self.max_lag = 0.0
+        self.avg_lag = 0.0        # 지수 이동 평균
+        self.last_duration = 0.0  # 마지막 조회 소요 시간(초)
+        self.last_poll: Optional[float] = None  # 마지막 조회 완료 시각 (time.time)
+
+    def snapshot(self, now: float) -> dict:
+        return {
+            "busy": self.busy,
+            "interval": round(self.interval, 3),
+            "next_in": round(max(0.0, self.due - now), 3) if self.task is None else 0.0,
+            "polling": self.task is not None,
+            "polls": self.polls,
+            "errors": self.errors,
+            "last_lag_ms": round(self.last_lag * 1000, 1),
+            "avg_lag_ms": round(self.avg_lag * 1000, 1),
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "last_duration_ms": round(self.last_duration * 1000, 1),
+            "last_poll": self.last_poll,
+        }
+
+
+class FleetTracker:
+    """
+    전체 장비의 가공 상태 조회를 하나의 루프에서 예약/실행하는 스케줄러.
+    - 장비마다 태스크와 타이머를 두지 않고, 조회 예정 시각이 된 장비만 최대 concurrency대씩 동시에 조회
+    - 가공 중(poll이 True 반환)이면 busy_interval, 대기 중이면 idle_interval부터 두 배씩 max_idle_interval까지 간격을 늘림
+      (대기 중 간격은 장비끼리 조회 시점이 겹치지 않도록 ±10% 임의로 분산)
+    - 장비가 제거되면 진행 중인 조회를 취소하고 일정에서 뺌
+    - 장비별 지연(예정 시각보다 늦게 조회를 시작한 시간)을 stats()로 제공
+    """
+
+    def __init__(self, poll: Callable[[int], Awaitable[bool]], busy_interval: float = 1.0,
+                 idle_interval: float = 3.0, max_idle_interval: float = 15.0, concurrency: int = 16):
+        """
+        :param poll: 장비 하나를 조회하는 코루틴 함수 poll(machine_id) -> 가공 중이면 True
+        :param busy_interval: 가공 중인 장비의 조회 간격(초)
+        :param idle_interval / max_idle_interval: 대기 중인 장비의 조회 간격(초)의 시작값/최대값
+        :param concurrency: 동시에 조회할 최대 장비 수
+        """
+        self.poll = poll
+        self.busy_interval = busy_interval
+        self.idle_interval = idle_interval
+        self.max_idle_interval = max(idle_interval, max_idle_interval)
+        self.concurrency = max(1, concurrency)
+
+        self._machines: Dict[int, _MachineSchedule] = {}
+        self._queue: List[tuple] = []  # (예정 시각, 장비 ID) 힙. 제거/재예약된 항목은 꺼낼 때 무시
+        self._running = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------ 장비 관리
+
+    def add(self, machine_id: int):
+        """
+        장비 추적 시작. 이미 추적 중이면 무시.
+        여러 장비가 한꺼번에 추가되어도 조회가 몰리지 않도록 첫 조회를 idle_interval 안에서 임의로 분산
+        """
+        if machine_id in self._machines:
+            return
+        due = time.monotonic() + random.uniform(0, self.idle_interval)
+        self._machines[machine_id] = _MachineSchedule(machine_id, due, self.idle_interval)
+        heapq.heappush(self._queue, (due, machine_id))
+        self._wakeup.set()
+
+    def remove(self, machine_id: int):
+        """장비 추적 중단 (진행 중인 조회는 취소)"""
+        schedule = self._machines.pop(machine_id, None)
+        if schedule is not None and schedule.task is not None:
+            schedule.task.cancel()
+
+    def ids(self) -> List[int]:
+        return list(self._machines)
+
+    # ------------------------------------------------------------------ 실행
+
+    def start(self):
+        """스케줄러 루프 시작 (이미 실행 중이면 무시)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return self._task
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for schedule in self._machines.values():
+            if schedule.task is not None:
+                schedule.task.cancel()
+
+    async def _run(self):
+        while True:
+            now = time.monotonic()
+            # 예정 시각이 된 장비를 동시 조회 한도까지 시작
+            while self._queue and self._queue[0][0] <= now and self._running < self.concurrency:
+                due, machine_id = heapq.heappop(self._queue)
+                schedule = self._machines.get(machine_id)
+                if schedule is None or schedule.due != due or schedule.task is not None:
+                    continue  # 제거됐거나 다시 예약된 항목
+                self._launch(schedule, now)
+
+            self._wakeup.clear()
+            timeout = None
+            if self._queue and self._running < self.concurrency:
+                timeout = max(0.0, self._queue[0][0] - time.monotonic())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _launch(self, schedule: _MachineSchedule, now: float):
+        lag = now - schedule.due
+        schedule.last_lag = lag
+        schedule.max_lag = max(schedule.max_lag, lag)
+        schedule.avg_lag = lag if schedule.polls == 0 else schedule.avg_lag * 0.8 + lag * 0.2
+        self._running += 1
+        schedule.task = asyncio.create_task(self._poll_one(schedule, now))
+
+    async def _poll_one(self, schedule: _MachineSchedule, started: float):
+        busy = False
+        try:
+            busy = bool(await self.poll(schedule.machine_id))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            schedule.errors += 1
+            logging.error(f"❌ Error tracking machine {schedule.machine_id}: {e}", exc_info=True)
+        finally:
+            self._running -= 1
+            schedule.task = None
+            self._wakeup.set()
+
+        now = time.monotonic()
+        schedule.polls += 1
+        schedule.last_duration = now - started
+        schedule.last_poll = time.time()
+        if busy:
+            schedule.interval = self.busy_interval
+        elif schedule.busy:
+            schedule.interval = self.idle_interval
+        else:
+            schedule.interval = min(self.max_idle_interval, max(self.idle_interval, schedule.interval * 2))
+            # 대기 중인 장비들의 조회 시점이 같은 주기로 맞물리지 않도록 ±10% 분산
+            schedule.interval *= random.uniform(0.9, 1.1)
+        schedule.busy = busy
+        if self._machines.get(schedule.machine_id) is schedule:
+            # 조회를 시작한 시각 기준으로 다음 조회를 예약 (조회가 간격보다 오래 걸리면 바로 다시 조회)
+            schedule.due = max(started + schedule.interval, now)
+            heapq.heappush(self._queue, (schedule.due, schedule.machine_id))
+
+    # ------------------------------------------------------------------ 상태
+
+    def stats(self) -> dict:
+        """스케줄러 상태와 장비별 조회 간격/지연 통계"""
+        now = time.monotonic()
+        machines = {machine_id: s.snapshot(now) for machine_id, s in self._machines.items()}
+        lags = [s.last_lag for s in self._machines.values() if s.polls]
+        return {
+            "machines": len(machines),
+            "busy": sum(1 for s in self._machines.values() if s.busy),
+            "polling": self._running,
+            "max_lag_ms": round(max(lags) * 1000, 1) if lags else 0.0,
+            "by_machine": machines,
+        }
@@ -0,0 +1,84 @@
+# src/utils/breaker.py
+import random
+import time
+
+
+class CircuitOpenError(Exception):
+    """회로가 열린(통신 불가로 판단된) 장비로 요청하려 할 때 발생"""
+
+    def __init__(self, machine, retry_after: float, reason: str):
+        super().__init__(f"machine {machine} unavailable (circuit open, retry in {retry_after:.1f}s): {reason}")
+        self.machine = machine
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class CircuitBreaker:
+    """
+    장비 하나의 회로 차단기.
+    - closed: 정상. 연속 실패가 failure_threshold번이면 open
+    - open: 요청을 보내지 않고 바로 실패. 다시 연결되었는지는 리포지토리의 백그라운드 점검(probe)이 확인해 close
+    점검 간격은 probe_interval부터 실패할 때마다 두 배씩 max_probe_interval까지 늘리고, 여러 장비가 동시에 점검하지 않도록 ±20% 흔듦
+    """
+
+    def __init__(self, failure_threshold: int = 5, probe_interval: float = 1.0, max_probe_interval: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self.max_probe_interval = max_probe_interval
+
+        self.state = "closed"
+        self.failures = 0
+        self.reason = ""
+        self.next_probe_at = 0.0
+        self._interval = probe_interval
+        self.stats = {"opens": 0, "rejected": 0, "probes": 0}
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == "open"
+
+    def reject(self, machine) -> CircuitOpenError:
+        self.stats["rejected"] += 1
+        return CircuitOpenError(machine, max(0.0, self.next_probe_at - time.monotonic()), self.reason)
+
+    def record_success(self):
+        self.failures = 0
+
+    def record_failure(self, reason: str) -> bool:
+        """실패 기록. 이번 실패로 회로가 열렸으면 True"""
+        self.failures += 1
+        if self.state == "closed" and self.failures >= self.failure_threshold:
+            self.trip(f"{self.failures} consecutive failures, last: {reason}")
+            return True
+        return False
+
+    def trip(self, reason: str):
+        """즉시 회로를 연다 (ncLinkState == false 등)"""
+        if self.state != "open":
+            self.state = "open"
+            self.stats["opens"] += 1
+            self._interval = self.probe_interval
+            self.next_probe_at = time.monotonic() + self._interval
+        self.reason = reason
+
+    def next_probe_delay(self) -> float:
+        """다음 점검까지 대기 시간(초). 호출할 때마다 간격을 두 배로 (최대 max_probe_interval)"""
+        delay = self._interval * random.uniform(0.8, 1.2)
+        self.next_probe_at = time.monotonic() + delay
+        self._interval = min(self._interval * 2, self.max_probe_interval)
+        self.stats["probes"] += 1
+        return delay
+
+    def close(self):
+        self.state = "closed"
+        self.failures = 0
+        self.reason = ""
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "reason": self.reason,
+            "retry_after": round(max(0.0, self.next_probe_at - time.monotonic()), 2) if self.is_open else 0.0,
+            **self.stats,
+        }
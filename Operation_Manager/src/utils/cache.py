@@ -0,0 +1,231 @@
+# src/utils/cache.py
+import json
+import time
+from collections import OrderedDict
+
+import yaml
+
+# 값이 바뀌는 빈도에 따른 캐시 등급과 유지 시간(초). 0이면 캐시하지 않음
+TTL_CLASSES = {
+    "static": 600.0,  # 장비 구성: 모델/제조사, 채널·축 수, 축 이름, 리미트 등
+    "slow": 5.0,      # 공구 테이블, 오프셋, 메모리 사용량 등 작업자 조작이나 공구 교체 시에만 바뀌는 값
+    "state": 0.5,     # 운전 모드, 알람, 현재 프로그램/공구 등 상태 값
+    "live": 0.0,      # 위치, 부하, 속도, 가공 시간 등 계속 바뀌는 신호
+}
+
+# api_category.yaml 카테고리별 기본 등급
+CATEGORY_CLASSES = {
+    "장비 기본 정보": "static",
+    "채널 상태 정보": "state",
+    "축 상태 및 제어": "live",
+    "스핀들 상태 및 제어": "live",
+    "이송 속도 및 오버라이드": "live",
+    "가공 상태 및 집계": "live",
+    "활성화된 공구 정보": "state",
+    "NC 프로그램 실행 정보": "state",
+    "좌표계 및 오프셋": "slow",
+    "알람 및 에러": "state",
+    "사용자 변수": "live",
+    "CNC 내부 PLC 메모리 데이터": "live",
+    "장비 공구 영역 및 공구 정보": "slow",
+    "센서 데이터 수집": "state",  # 수집 상태(statusOfStream)와 설정 가능한 수집 조건은 수집 중에 바뀜
+}
+
+# 카테고리 기본 등급과 다른 필드 (카테고리 이름, 엔드포인트 마지막 경로) -> 등급
+FIELD_CLASSES = {
+    **{("장비 기본 정보", f): "state" for f in ("ncLinkState", "currentAccessLevel")},
+    **{("장비 기본 정보", f): "live" for f in ("machinePowerOnTime", "currentCncTime")},
+    **{("장비 기본 정보", f): "slow" for f in ("usedCapacity", "freeCapacity")},
+    **{("채널 상태 정보", f): "static" for f in (
+        "channelEnabled", "toolAreaNumber", "numberOfAxes", "numberOfSpindles", "numberOfWorkOffsets")},
+    **{("축 상태 및 제어", f): "static" for f in (
+        "axisName", "relativeAxisName", "axisLimitPlus", "axisLimitMinus", "workAreaLimitPlus",
+        "workAreaLimitMinus", "axisEnabled", "machineOrigin")},
+    **{("축 상태 및 제어", f): "state" for f in (
+        "workAreaLimitPlusEnabled", "workAreaLimitMinusEnabled", "interlockEnabled",
+        "constantSurfaceSpeedControlEnabled")},
+    **{("스핀들 상태 및 제어", f): "static" for f in ("spindleLimit", "spindleEnabled", "speedUnit")},
+    ("이송 속도 및 오버라이드", "speedUnit"): "static",
+    ("가공 상태 및 집계", "targetWorkCounter"): "slow",
+    **{("NC 프로그램 실행 정보", f): "live" for f in (
+        "sequenceNumber", "currentBlockCounter", "lastBlock", "currentBlock", "nextBlock", "blockCounter")},
+    **{("장비 공구 영역 및 공구 정보", f): "static" for f in (
+        "toolAreaEnabled", "numberOfMagazines", "magazineEnabled", "magazineName", "numberOfRealLocations",
+        "magazinePhysicalNumber")},
+    **{("장비 공구 영역 및 공구 정보", f): "state" for f in ("restToolLife", "toolLifeCount", "toolLifeAlarm")},
+    ("센서 데이터 수집", "numberOfStream"): "static",
+    ("센서 데이터 수집", "bufferEnabled"): "slow",
+    ("센서 데이터 수집", "value"): "live",
+}
+
+
+def build_cache_classes(category_yaml_path: str, uri_params_path: str) -> dict:
+    """
+    uri_params.json의 모든 엔드포인트를 api_category.yaml의 카테고리 경로("/machine/channel/{leaf_node}" 등)에 맞춰
+    캐시 등급을 정한다. 여러 경로에 맞으면 가장 긴(구체적인) 경로의 카테고리를 따른다.
+    :return: {엔드포인트: 등급}
+    """
+    with open(category_yaml_path, "r", encoding="utf-8") as f:
+        categories = yaml.safe_load(f)
+    with open(uri_params_path, "r", encoding="utf-8") as f:
+        endpoints = json.load(f)
+
+    prefixes = sorted(
+        ((pattern.replace("{leaf_node}", ""), category)
+         for category, info in categories.items() for pattern in info.get("endpoint", [])),
+        key=lambda item: len(item[0]), reverse=True,
+    )
+    classes = {}
+    for endpoint in endpoints:
+        for prefix, category in prefixes:
+            leaf = endpoint[len(prefix):]
+            if endpoint.startswith(prefix) and leaf and "/" not in leaf:
+                classes[endpoint] = FIELD_CLASSES.get((category, leaf), CATEGORY_CLASSES.get(category, "live"))
+                break
+    return classes
+
+
+class TTLCache:
+    """
+    유지 시간(TTL)이 있는 LRU 캐시.
+    - 가득 차면 가장 오래 사용하지 않은 항목부터 제거
+    - 등급별 조회/적중 수를 세어 적중률을 보고
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # 키 -> (만료 시각, 값)
+        self._stats = {}
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, ttl_class: str):
+        """(적중 여부, 값). 만료된 항목은 제거하고 미적중으로 처리"""
+        stats = self._stats.setdefault(ttl_class, {"hits": 0, "misses": 0})
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                stats["hits"] += 1
+                return True, entry[1]
+            del self._entries[key]
+        stats["misses"] += 1
+        return False, None
+
+    def set(self, key, value, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        hits = sum(s["hits"] for s in self._stats.values())
+        lookups = hits + sum(s["misses"] for s in self._stats.values())
+        return {
+            "entries": len(self._entries),
+            "hits": hits,
+            "misses": lookups - hits,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "by_class": {
+                name: {**s, "hit_ratio": round(s["hits"] / (s["hits"] + s["misses"]), 4)}
+                for name, s in self._stats.items() if s["hits"] + s["misses"]
+            },
+        }
+
+
+class NcPathCache:
+    """
+    장비별 NC 메모리 원격 경로 상태 캐시 (업로드 시 게이트웨이 왕복을 줄이기 위함).
+    - 루트 경로와 존재가 확인된 폴더는 dir_ttl초 동안 유지
+    - 폴더별 파일 목록은 index_ttl초 동안 유지하고, 이 클라이언트가 올리거나 지운 파일은 바로 반영
+    다른 곳(작업자, 다른 클라이언트)에서 바뀐 내용은 유지 시간이 지나야 반영되므로 index_ttl은 짧게 둔다.
+    """
+
+    def __init__(self, dir_ttl: float = 60.0, index_ttl: float = 10.0):
+        self.dir_ttl = dir_ttl
+        self.index_ttl = index_ttl
+        self._roots = {}  # 장비 -> (만료 시각, 루트 경로)
+        self._dirs = {}   # (장비, 폴더) -> 만료 시각
+        self._files = {}  # (장비, 폴더) -> (만료 시각, 파일명 set)
+        self._stats = {"hits": 0, "misses": 0}
+
+    def _count(self, hit: bool) -> bool:
+        self._stats["hits" if hit else "misses"] += 1
+        return hit
+
+    def root(self, machine) -> str:
+        """캐시된 루트 경로 (없거나 만료되면 None)"""
+        entry = self._roots.get(str(machine))
+        if self._count(entry is not None and entry[0] > time.monotonic()):
+            return entry[1]
+        return None
+
+    def set_root(self, machine, path: str):
+        if self.dir_ttl > 0:
+            self._roots[str(machine)] = (time.monotonic() + self.dir_ttl, path)
+
+    def has_dir(self, machine, path: str) -> bool:
+        """존재가 확인된 폴더인지 (만료되면 False)"""
+        expires = self._dirs.get((str(machine), path))
+        return self._count(expires is not None and expires > time.monotonic())
+
+    def add_dir(self, machine, path: str, empty: bool = False):
+        """
+        폴더 존재를 기록.
+        :param empty: 방금 만든 폴더면 True (비어 있는 파일 목록도 함께 기록해 목록 조회를 생략)
+        """
+        if self.dir_ttl > 0:
+            self._dirs[(str(machine), path)] = time.monotonic() + self.dir_ttl
+        if empty:
+            self.set_files(machine, path, ())
+
+    def files(self, machine, path: str):
+        """캐시된 폴더의 파일명 set (없거나 만료되면 None)"""
+        entry = self._files.get((str(machine), path))
+        if self._count(entry is not None and entry[0] > time.monotonic()):
+            return entry[1]
+        return None
+
+    def set_files(self, machine, path: str, files):
+        if self.index_ttl > 0:
+            self._files[(str(machine), path)] = (time.monotonic() + self.index_ttl, set(files))
+
+    def add_file(self, machine, path: str, filename: str):
+        """올린 파일을 목록에 반영 (목록이 캐시된 경우에만)"""
+        entry = self._files.get((str(machine), path))
+        if entry is not None:
+            entry[1].add(filename)
+
+    def remove_file(self, machine, path: str, filename: str):
+        entry = self._files.get((str(machine), path))
+        if entry is not None:
+            entry[1].discard(filename)
+
+    def invalidate(self, machine, path: str = None):
+        """폴더(path) 또는 장비 전체의 캐시를 버림 (요청이 실패해 원격 상태를 알 수 없을 때)"""
+        machine = str(machine)
+        if path is None:
+            self._roots.pop(machine, None)
+            for cache in (self._dirs, self._files):
+                for key in [key for key in cache if key[0] == machine]:
+                    del cache[key]
+        else:
+            self._dirs.pop((machine, path), None)
+            self._files.pop((machine, path), None)
+
+    def stats(self) -> dict:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_ratio": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            "roots": len(self._roots),
+            "dirs": len(self._dirs),
+            "indexes": len(self._files),
+        }
@@ -0,0 +1,115 @@
+# src/utils/limiter.py
+import asyncio
+import time
+from collections import deque
+
+
+class AdaptiveLimiter:
+    """
+    AIMD(Additive Increase, Multiplicative Decrease) 방식의 동시 요청 수 제한기.
+    - 요청이 제한(window)까지 차 있는 상태에서 정상 응답이 오면 window를 요청 하나당 1/window씩 늘림 (window만큼 성공하면 +1)
+    - 오류/타임아웃이면 window를 backoff배로, 지연이 기준(관측된 최소 지연 x latency_tolerance)을 넘으면 latency_backoff배로 줄임
+    - 한 번의 과부하로 여러 요청이 동시에 실패해도 지연 시간 한 번 동안은 한 번만 줄임
+    결과적으로 window는 대상(게이트웨이)이 지연 증가 없이 처리할 수 있는 동시 요청 수 근처에서 유지된다.
+    """
+
+    def __init__(self, initial: int = 8, min_limit: int = 1, max_limit: int = 64,
+                 backoff: float = 0.5, latency_backoff: float = 0.9,
+                 latency_tolerance: float = 2.0, latency_floor: float = 0.01):
+        """
+        :param initial: 시작 window
+        :param min_limit / max_limit: window 범위
+        :param backoff: 오류 발생 시 window 감소 배율
+        :param latency_backoff: 지연 증가 시 window 감소 배율
+        :param latency_tolerance: 최소 지연 대비 몇 배를 넘으면 과부하로 볼지
+        :param latency_floor: 이보다 짧은 지연(초)은 과부하로 보지 않음 (로컬 네트워크의 미세한 흔들림 무시)
+        """
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_backoff = latency_backoff
+        self.latency_tolerance = latency_tolerance
+        self.latency_floor = latency_floor
+
+        self.in_flight = 0
+        self.min_latency = None
+        self._waiters = deque()
+        self._last_decrease = 0.0
+        self.stats = {"requests": 0, "errors": 0, "increases": 0, "decreases": 0, "queued": 0}
+
+    @property
+    def window(self) -> int:
+        return max(self.min_limit, int(self.limit))
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "min_latency_ms": round(self.min_latency * 1000, 2) if self.min_latency is not None else None,
+            **self.stats,
+        }
+
+    async def acquire(self):
+        """window에 여유가 생길 때까지 대기 (먼저 기다린 요청부터 순서대로)"""
+        if self.in_flight < self.window and not self._waiters:
+            self.in_flight += 1
+            return
+        self.stats["queued"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 자리를 넘겨받은 직후 취소됨 -> 다음 대기자에게 넘김
+                self.in_flight -= 1
+                self._wake()
+            else:
+                self._waiters.remove(future)
+            raise
+
+    def release(self, latency: float = None, ok: bool = None):
+        """
+        요청 종료. ok가 None이면(취소 등) window를 조정하지 않고 자리만 반납한다.
+        :param latency: 요청 소요 시간(초)
+        :param ok: 정상 응답 여부 (False: 연결 오류/타임아웃/5xx)
+        """
+        saturated = self.in_flight >= self.window
+        self.in_flight -= 1
+        if ok is not None:
+            self._adjust(latency, ok, saturated)
+        self._wake()
+
+    def _adjust(self, latency: float, ok: bool, saturated: bool):
+        now = time.monotonic()
+        self.stats["requests"] += 1
+        if ok:
+            # 기준 지연은 관측된 최소값. 네트워크 상태가 바뀌는 경우를 위해 조금씩 올라가게 함
+            if self.min_latency is None or latency < self.min_latency:
+                self.min_latency = latency
+            else:
+                self.min_latency *= 1.001
+        else:
+            self.stats["errors"] += 1
+
+        congested = not ok or latency > max(self.min_latency * self.latency_tolerance, self.latency_floor)
+        if congested:
+            # 같은 과부하 구간에서 들어온 여러 신호로 연속해서 줄이지 않도록 지연 시간 한 번에 한 번만 감소
+            if now - self._last_decrease >= max(latency, self.min_latency or 0.0):
+                factor = self.latency_backoff if ok else self.backoff
+                self.limit = max(float(self.min_limit), self.limit * factor)
+                self._last_decrease = now
+                self.stats["decreases"] += 1
+        elif saturated and self.limit < self.max_limit:
+            # window를 다 쓰고 있을 때만 늘림 (요청이 적어 window가 남는 동안에는 근거 없이 커지지 않도록)
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+            self.stats["increases"] += 1
+
+    def _wake(self):
+        while self._waiters and self.in_flight < self.window:
+            future = self._waiters.popleft()
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
@@ -0,0 +1,141 @@
+import time
+import numpy as np
+
+from fleet import FleetState
+from shared import SharedStore
+
+# 알람 발생/해제 평균 간격(초). 정상 상태에서 약 5%의 시간 동안 알람이 켜져 있음
+ALARM_MEAN_INTERVAL = 95.0
+ALARM_MEAN_DURATION = 5.0
+
+
+class Snapshot:
+    """
+    한 틱 시점의 전체 장비 상태. 틱마다 새 객체로 교체되며, 만들어진 뒤에는 수정하지 않는다.
+    (요청 처리 중 다른 틱으로 바뀌어도 이미 참조한 스냅샷의 값끼리는 항상 일관됨)
+    """
+    __slots__ = (
+        "tick", "time",
+        "machine_position", "work_position", "axis_load", "axis_feed", "axis_power",
+        "spindle_speed", "spindle_load", "spindle_temperature", "spindle_power",
+        "machining_time", "work_counter", "program_step", "alarm_active",
+        "tool_rest_life", "tool_count",
+        "memory_used", "memory_free",
+        "plc_bit", "plc_word", "plc_dword", "stream_value",
+    )
+
+
+class SimulationEngine:
+    """
+    틱 단위로 전체 장비 상태를 한 번에 계산하는 시뮬레이션 엔진.
+    - step(): FleetState의 파라미터로 모든 장비의 값을 NumPy 벡터 연산으로 계산해 새 Snapshot을 만든다
+    - 핸들러는 현재 Snapshot에서 인덱스로 값을 읽기만 하므로 요청당 작업은 조회 한 번
+    - 같은 틱의 값은 같은 스냅샷에서 나오므로 연관된 신호(부하/전력, 사용/남은 용량)가 서로 맞는다
+    """
+
+    def __init__(self, fleet: FleetState, start_time: float, seed=None, shared_name: str = None):
+        self.fleet = fleet
+        self.start_time = start_time
+        self.rng = np.random.default_rng(seed)
+        self.tick = 0
+        self._last_time = None
+        self._alarm = np.zeros((fleet.n_machines, fleet.n_channels), dtype=bool)
+        self.store = None
+        self.snapshot = self.step()
+        if shared_name:
+            # 공유 모드: 장비 파라미터/시작 시각은 세그먼트의 값을 따르고, 리더만 step()에서 계산
+            self.store = SharedStore(shared_name, fleet, self.snapshot, start_time)
+            self.start_time = self.store.start_time
+            self.snapshot = self.store.read()
+
+    def step(self, now: float = None) -> Snapshot:
+        """한 틱 진행: 모든 장비의 현재 값을 계산해 스냅샷 교체 (공유 모드의 팔로워는 리더의 스냅샷을 읽기만 함)"""
+        if self.store is not None and not self.store.is_leader:
+            current = self.store.read()
+            if not self.store.lead():
+                self.snapshot = current
+                return current
+            # 리더를 이어받음: 틱 번호와 알람 상태를 이어서 진행
+            self.tick = current.tick
+            self._alarm = current.alarm_active.copy()
+
+        f = self.fleet
+        rng = self.rng
+        now = time.time() if now is None else now
+        elapsed = now - self.start_time
+        dt = 0.0 if self._last_time is None else max(now - self._last_time, 0.0)
+        self._last_time = now
+
+        axis_shape = f.axis_phase.shape
+        spindle_shape = f.spindle_target.shape
+        channel_shape = f.machining_offset.shape
+        n_machines = f.n_machines
+
+        s = Snapshot()
+        self.tick += 1
+        s.tick = self.tick
+        s.time = now
+
+        # 축: 약 10초 주기로 왕복하는 위치, 부하와 그에 비례하는 전력
+        angle = elapsed * 0.6 + f.axis_phase
+        s.machine_position = f.axis_center + np.sin(angle) * f.axis_amplitude
+        work_amplitude = f.axis_amplitude * 0.9
+        s.work_position = work_amplitude + np.sin(angle + 1.0) * work_amplitude
+        s.axis_load = f.axis_load + rng.uniform(-5.0, 5.0, axis_shape)
+        s.axis_feed = f.axis_feed + rng.uniform(-10.0, 10.0, axis_shape)
+        s.axis_power = 1200.0 * s.axis_load / 25.0 + rng.uniform(-50.0, 50.0, axis_shape)
+
+        # 스핀들: 목표 회전수 근처의 실제 회전수, 부하와 그에 비례하는 전력
+        s.spindle_speed = f.spindle_target + rng.uniform(-5.0, 5.0, spindle_shape)
+        s.spindle_load = f.spindle_load + rng.uniform(-3.0, 3.0, spindle_shape)
+        s.spindle_temperature = f.spindle_temperature + rng.uniform(-0.5, 0.5, spindle_shape)
+        s.spindle_power = 5000.0 * s.spindle_load / 40.0 + rng.uniform(-50.0, 50.0, spindle_shape)
+
+        # 채널: 가공 시간, 가공 수량, 프로그램 진행(5초마다 다음 블록)
+        s.machining_time = f.machining_offset + elapsed
+        s.work_counter = f.counter_base + (elapsed / f.counter_period).astype(np.int32)
+        s.program_step = (f.program_offset + int(elapsed / 5)) % f.program_length
+
+        # 알람: 틱마다 독립적으로 뽑지 않고 발생 후 일정 시간 유지되도록 상태로 관리
+        raised = rng.random(channel_shape) < dt / ALARM_MEAN_INTERVAL
+        cleared = rng.random(channel_shape) < dt / ALARM_MEAN_DURATION
+        self._alarm = np.where(self._alarm, ~cleared, raised)
+        s.alarm_active = self._alarm
+
+        # 공구: 시간이 지날수록 줄어드는 수명(다 닳으면 새 공구로 교체된 척), 늘어나는 사용 횟수
+        worn = f.tool_wear_offset + elapsed * f.tool_wear_rate
+        s.tool_rest_life = f.tool_max_life - np.mod(worn, f.tool_max_life)
+        s.tool_count = f.tool_count_base + int(elapsed / 10)
+
+        # NC 메모리: 사용량과 남은 용량은 같은 값에서 계산되어 합이 항상 전체 용량
+        s.memory_used = np.round(f.memory_used + rng.uniform(-1000.0, 5000.0, n_machines))
+        s.memory_free = f.memory_total - s.memory_used
+
+        # PLC / 고속 버퍼 (센서 On/Off, 상태 코드, 카운터, 진동 센서 값)
+        s.plc_bit = rng.random(n_machines) < 0.2
+        s.plc_word = rng.integers(0, 101, n_machines)
+        s.plc_dword = rng.integers(1000, 50001, n_machines)
+        s.stream_value = self.stream_signal(slice(None), now)
+
+        if self.store is not None:
+            self.store.publish(s)
+        self.snapshot = s
+        return s
+
+    def close(self):
+        """공유 메모리 연결 해제 (공유 모드가 아니면 아무 일도 하지 않음)"""
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    def stream_signal(self, machine, times):
+        """
+        진동 센서 신호: 기본 주파수 + 3배 고조파 + 노이즈 (0.0 ~ 1.0).
+        machine이 장비 인덱스이고 times가 시각 배열이면 그 시각들의 샘플 배열을 반환 (스트리밍용)
+        """
+        f = self.fleet
+        t = np.asarray(times, dtype=np.float64) - self.start_time
+        angle = 2 * np.pi * f.stream_frequency[machine] * t + f.stream_phase[machine]
+        value = 0.5 + 0.25 * np.sin(angle) + 0.1 * np.sin(3 * angle)
+        value = value + self.rng.normal(0.0, 0.05, np.shape(value))
+        return np.clip(value, 0.0, 1.0)
@@ -0,0 +1,140 @@
+import asyncio
+import json
+import math
+import os
+import random
+from typing import Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field, field_validator
+
+# TORUS 에러 코드표 (Operation_Manager와 같은 파일 사용, 없으면 코드 검증 생략)
+ERROR_STATUS_PATH = os.getenv(
+    "MOCK_ERROR_STATUS_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "Operation_Manager", "src", "torus_manual", "error_status.json"),
+)
+
+
+def load_error_status(file_path: str) -> Dict[int, str]:
+    """error_status.json -> {코드: 설명}"""
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            return {int(code): info.get("설명", "") for code, info in json.load(f).items()}
+    except (OSError, ValueError) as e:
+        print(f"⚠️ error_status.json not loaded, error codes will not be validated: {e}")
+        return {}
+
+
+ERROR_STATUS = load_error_status(ERROR_STATUS_PATH)
+# 에러 코드를 지정하지 않은 프로파일의 기본값: NC 통신 실패, RPC 타임아웃
+DEFAULT_ERROR_CODES = [565575680, 558891055]
+
+
+class LatencySpec(BaseModel):
+    """
+    응답 지연 분포.
+    - fixed: ms 고정
+    - normal: 평균 mean_ms, 표준편차 stddev_ms (음수는 0으로)
+    - longtail: 중앙값 median_ms, 로그정규 sigma (클수록 꼬리가 김)
+    """
+    type: Literal["none", "fixed", "normal", "longtail"] = "none"
+    ms: float = Field(0.0, ge=0)
+    mean_ms: float = Field(0.0, ge=0)
+    stddev_ms: float = Field(0.0, ge=0)
+    median_ms: float = Field(0.0, ge=0)
+    sigma: float = Field(1.0, ge=0)
+
+    def sample(self) -> float:
+        """지연 시간(초) 샘플"""
+        if self.type == "fixed":
+            delay_ms = self.ms
+        elif self.type == "normal":
+            delay_ms = max(0.0, random.gauss(self.mean_ms, self.stddev_ms))
+        elif self.type == "longtail" and self.median_ms > 0:
+            delay_ms = random.lognormvariate(math.log(self.median_ms), self.sigma)
+        else:
+            delay_ms = 0.0
+        return delay_ms / 1000
+
+
+class FaultProfile(BaseModel):
+    """
+    하나의 장애 프로파일.
+    - drop_rate: 응답하지 않고 drop_hang_s초 동안 붙잡아 두는 비율 (클라이언트 타임아웃 유도)
+    - error_rate: TORUS 에러 응답({"status": 코드, "message": 설명})을 돌려주는 비율
+    """
+    latency: LatencySpec = LatencySpec()
+    drop_rate: float = Field(0.0, ge=0, le=1)
+    drop_hang_s: float = Field(30.0, ge=0)
+    error_rate: float = Field(0.0, ge=0, le=1)
+    error_codes: List[int] = Field(default_factory=lambda: list(DEFAULT_ERROR_CODES), min_length=1)
+
+    @field_validator("error_codes")
+    @classmethod
+    def check_error_codes(cls, codes):
+        if ERROR_STATUS:
+            unknown = [code for code in codes if code not in ERROR_STATUS]
+            if unknown:
+                raise ValueError(f"error_status.json에 없는 에러 코드: {unknown}")
+        return codes
+
+    def sample_error(self) -> Optional[dict]:
+        """error_rate 확률로 TORUS 에러 응답 본문 생성"""
+        if self.error_rate and random.random() < self.error_rate:
+            code = random.choice(self.error_codes)
+            return {"status": code, "message": ERROR_STATUS.get(code, "Injected fault")}
+        return None
+
+    def sample_drop(self) -> bool:
+        return bool(self.drop_rate) and random.random() < self.drop_rate
+
+
+class FaultConfig(BaseModel):
+    """
+    런타임 장애 설정. 적용 우선순위: 장비별(machines) > 엔드포인트별(endpoints) > 기본(default)
+    """
+    default: Optional[FaultProfile] = None
+    endpoints: Dict[str, FaultProfile] = {}
+    machines: Dict[int, FaultProfile] = {}
+
+    def profile_for(self, endpoint: str, machine) -> Optional[FaultProfile]:
+        if self.machines and machine is not None:
+            try:
+                profile = self.machines.get(int(machine))
+            except (TypeError, ValueError):
+                profile = None
+            if profile is not None:
+                return profile
+        return self.endpoints.get(endpoint, self.default)
+
+
+# 바로 적용해 볼 수 있는 미리 정의된 프로파일
+PRESETS = {
+    "none": {},
+    "slow": {"default": {"latency": {"type": "fixed", "ms": 50}}},
+    "jittery": {"default": {"latency": {"type": "normal", "mean_ms": 20, "stddev_ms": 10}}},
+    "longtail": {"default": {"latency": {"type": "longtail", "median_ms": 5, "sigma": 1.2}}},
+    "flaky": {"default": {
+        "latency": {"type": "longtail", "median_ms": 10, "sigma": 1.0},
+        "error_rate": 0.05,
+        "drop_rate": 0.01,
+        "drop_hang_s": 10,
+    }},
+    "offline": {"default": {"drop_rate": 1.0, "drop_hang_s": 30}},
+}
+
+
+async def inject(profile: Optional[FaultProfile]) -> Optional[dict]:
+    """
+    프로파일에 따라 비동기로 지연/드롭을 적용하고, 에러를 주입할 경우 에러 응답 본문을 반환.
+    (asyncio.sleep만 사용하므로 이벤트 루프를 막지 않음)
+    드롭이면 {"dropped": True}를 반환한다.
+    """
+    if profile is None:
+        return None
+    if profile.sample_drop():
+        await asyncio.sleep(profile.drop_hang_s)
+        return {"dropped": True}
+    delay = profile.latency.sample()
+    if delay > 0:
+        await asyncio.sleep(delay)
+    return profile.sample_error()
@@ -0,0 +1,166 @@
+import os
+import numpy as np
+
+# 시뮬레이션할 장비 수 (미지정 시 mock_data.json의 /machine/list 항목 수를 사용)
+FLEET_SIZE_ENV = "MOCK_FLEET_SIZE"
+FLEET_SEED_ENV = "MOCK_FLEET_SEED"
+
+
+def _index(params, name: str, size: int) -> int:
+    """1부터 시작하는 파라미터 값을 배열 인덱스로 변환 (범위를 벗어나면 IndexError)"""
+    index = int(params[name]) - 1
+    if not 0 <= index < size:
+        raise IndexError(f"{name}={params[name]} 범위 초과 (1~{size})")
+    return index
+
+
+def _count(mock_db: dict, endpoint: str, default: int) -> int:
+    """mock_data.json의 numberOf* 값을 배열 크기로 사용"""
+    try:
+        return max(1, int(mock_db[endpoint]["value"]))
+    except (KeyError, TypeError, ValueError):
+        return default
+
+
+def _number(mock_db: dict, endpoint: str, default: float) -> float:
+    """mock_data.json의 수치 값 (없거나 숫자가 아니면 기본값)"""
+    try:
+        return float(mock_db[endpoint]["value"])
+    except (KeyError, TypeError, ValueError):
+        return default
+
+
+class FleetState:
+    """
+    장비(machine) x 채널(channel) x 축/스핀들/공구 단위의 시뮬레이션 상태.
+    - 모든 상태는 장비 수에 비례하는 작은 NumPy 배열로 보관 (장비당 수백 바이트)
+    - 요청 처리 시에는 인덱스 조회 + 스칼라 연산만 하므로 장비 수와 무관하게 비용이 일정
+    """
+
+    def __init__(self, n_machines: int, n_channels: int = 2, n_axes: int = 4,
+                 n_spindles: int = 1, n_tools: int = 20, program_length: int = 1,
+                 memory_total: float = 2097152.0, seed=None):
+        self.n_machines = n_machines
+        self.n_channels = n_channels
+        self.n_axes = n_axes
+        self.n_spindles = n_spindles
+        self.n_tools = n_tools
+        self.program_length = program_length
+        self.memory_total = memory_total
+
+        rng = np.random.default_rng(seed)
+        axis_shape = (n_machines, n_channels, n_axes)
+        spindle_shape = (n_machines, n_channels, n_spindles)
+        channel_shape = (n_machines, n_channels)
+        tool_shape = (n_machines, n_tools)
+
+        def uniform(low, high, shape):
+            return rng.uniform(low, high, shape).astype(np.float32)
+
+        # 축: 위상/중심/진폭이 서로 다른 사인 운동, 부하/이송속도 기준값
+        self.axis_phase = uniform(0.0, 2 * np.pi, axis_shape)
+        self.axis_center = uniform(120.0, 180.0, axis_shape)
+        self.axis_amplitude = uniform(25.0, 75.0, axis_shape)
+        self.axis_load = uniform(15.0, 35.0, axis_shape)
+        self.axis_feed = uniform(1200.0, 1800.0, axis_shape)
+
+        # 스핀들: 목표 회전수(100 단위), 부하, 온도 기준값
+        self.spindle_target = (rng.integers(10, 61, spindle_shape) * 100).astype(np.float32)
+        self.spindle_load = uniform(28.0, 52.0, spindle_shape)
+        self.spindle_temperature = uniform(34.0, 42.0, spindle_shape)
+
+        # 채널: 가공 시간/수량 카운터 오프셋, 프로그램 진행 위치, 활성 공구
+        self.machining_offset = uniform(0.0, 3600.0, channel_shape)
+        self.counter_base = rng.integers(0, 500, channel_shape).astype(np.int32)
+        self.counter_period = uniform(5.0, 20.0, channel_shape)
+        self.program_offset = rng.integers(0, program_length, channel_shape).astype(np.int16)
+        self.active_tool = rng.integers(0, n_tools, channel_shape).astype(np.int16)
+
+        # 공구: 최대 수명, 마모 속도, 초기 마모량, 사용 횟수
+        self.tool_max_life = (rng.integers(5, 21, tool_shape) * 100).astype(np.float32)
+        self.tool_wear_rate = uniform(0.1, 1.0, tool_shape)
+        self.tool_wear_offset = uniform(0.0, 1.0, tool_shape) * self.tool_max_life
+        self.tool_count_base = rng.integers(0, 300, tool_shape).astype(np.int32)
+
+        # 장비: NC 메모리 사용량 기준값
+        self.memory_used = uniform(20000.0, 400000.0, (n_machines,))
+        # 장비: 진동 센서(고속 버퍼) 기본 주파수(Hz)와 위상
+        self.stream_frequency = uniform(20.0, 200.0, (n_machines,))
+        self.stream_phase = uniform(0.0, 2 * np.pi, (n_machines,))
+
+    @classmethod
+    def from_mock_db(cls, mock_db: dict, program_length: int = 1, n_machines: int = None):
+        """
+        mock_data.json의 장비 목록/채널·축·스핀들·공구 개수로 배열 크기를 정한다.
+        장비 수는 인자 > 환경 변수 MOCK_FLEET_SIZE > /machine/list 항목 수 순으로 결정.
+        """
+        if n_machines is None:
+            template = mock_db.get("/machine/list", {}).get("value", {}).get("machines", [])
+            n_machines = int(os.getenv(FLEET_SIZE_ENV, len(template) or 1))
+        seed = os.getenv(FLEET_SEED_ENV)
+        return cls(
+            n_machines=n_machines,
+            n_channels=_count(mock_db, "/machine/numberOfChannels", 2),
+            n_axes=_count(mock_db, "/machine/channel/numberOfAxes", 4),
+            n_spindles=_count(mock_db, "/machine/channel/numberOfSpindles", 1),
+            n_tools=_count(mock_db, "/machine/toolArea/numberOfRegisteredTools", 20),
+            program_length=program_length,
+            memory_total=_number(mock_db, "/machine/ncMemory/totalCapacity", 2097152.0),
+            seed=int(seed) if seed is not None else None,
+        )
+
+    @property
+    def shape(self) -> tuple:
+        """(장비, 채널, 축, 스핀들, 공구) 개수 및 프로그램 길이/메모리 용량"""
+        return (self.n_machines, self.n_channels, self.n_axes, self.n_spindles, self.n_tools,
+                self.program_length, self.memory_total)
+
+    @property
+    def nbytes(self) -> int:
+        """상태 배열 전체 메모리 사용량 (바이트)"""
+        return sum(v.nbytes for v in vars(self).values() if isinstance(v, np.ndarray))
+
+    def count(self, name: str):
+        """파라미터별 인덱스 개수 (와일드카드 '*' 확장용, 시뮬레이션하지 않는 파라미터는 None)"""
+        return {
+            "machine": self.n_machines,
+            "channel": self.n_channels,
+            "axis": self.n_axes,
+            "spindle": self.n_spindles,
+            "registerTools": self.n_tools,
+        }.get(name)
+
+    # ---- 요청 파라미터 -> 배열 인덱스 ----
+    def machine(self, params) -> int:
+        return _index(params, "machine", self.n_machines)
+
+    def channel(self, params):
+        return self.machine(params), _index(params, "channel", self.n_channels)
+
+    def axis(self, params):
+        return (*self.channel(params), _index(params, "axis", self.n_axes))
+
+    def spindle(self, params):
+        return (*self.channel(params), _index(params, "spindle", self.n_spindles))
+
+    def tool(self, params, name: str = "registerTools"):
+        return self.machine(params), _index(params, name, self.n_tools)
+
+    def machine_list(self, template: list) -> list:
+        """/machine/list 항목을 템플릿으로 장비 수만큼 장비 정보를 생성"""
+        if not template:
+            template = [{"id": 1, "name": "Machine", "ip_address": "10.10.10.1",
+                         "vendorCode": "Siemens", "connectCode": "OpcUa", "toolSystem": 1.0}]
+        if self.n_machines <= len(template):
+            return template[:self.n_machines]
+
+        machines = []
+        for i in range(self.n_machines):
+            base = template[i % len(template)]
+            machines.append({
+                **base,
+                "id": i + 1,
+                "name": f"{base['name']}-{i + 1}",
+                "ip_address": f"10.10.{10 + i // 250}.{i % 250 + 1}",
+            })
+        return machines
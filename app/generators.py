@@ -1,10 +1,16 @@
+import asyncio
+import os
 import time
-import math
-import random
 from datetime import datetime
 
-# 서버 시작 시간 기억 (가공 시간 계산용)
+from engine import SimulationEngine
+from fleet import FleetState
+from shared import SHARED_STATE_ENV
+
+# 서버 시작 시간 기억 (가공 시간 계산용, 공유 모드에서는 처음 시작한 워커의 시간을 사용)
 START_TIME = time.time()
+# 공유 메모리 세그먼트 이름 (지정 시 uvicorn 워커끼리 시뮬레이션 상태 공유)
+SHARED_STATE_NAME = os.getenv(SHARED_STATE_ENV)
 MOCK_PROGRAM_DATA = [
     {"seq": 100, "block": "N100 G00 X0. Y0.", "active": "O1234 (TEST)"},
     {"seq": 110, "block": "N110 G01 Z-10. F1000", "active": "O1234 (TEST)"},
@@ -16,147 +22,211 @@ MOCK_PROGRAM_DATA = [
     {"seq": 170, "block": "N170 M05", "active": "O1234 (TEST)"},
     {"seq": 180, "block": "N180 M30", "active": "O1234 (TEST)"}
 ]
+# 장비별 시뮬레이션 상태 (init_fleet에서 mock_data.json 기준으로 생성)
+FLEET = FleetState(n_machines=1, program_length=len(MOCK_PROGRAM_DATA))
+# 틱마다 FLEET 전체의 현재 값을 계산하는 엔진 (핸들러는 ENGINE.snapshot에서 값을 읽기만 함)
+ENGINE = SimulationEngine(FLEET, START_TIME)
+
+
+def build_fleet(mock_db: dict, n_machines: int = None) -> FleetState:
+    """
+    mock_data.json을 기준으로 장비 시뮬레이션 상태를 만들고,
+    /machine/list 항목을 시뮬레이션 장비 수만큼 확장한다. (전역 FLEET은 바꾸지 않음)
+    장비/채널/축 구성이 현재 상태와 같으면 기존 상태를 그대로 재사용해 값이 끊기지 않게 한다.
+    """
+    fleet = FleetState.from_mock_db(mock_db, len(MOCK_PROGRAM_DATA), n_machines)
+    if fleet.shape == FLEET.shape:
+        fleet = FLEET
+    machine_list = mock_db.get("/machine/list")
+    if machine_list is not None:
+        template = machine_list.get("value", {}).get("machines", [])
+        machine_list["value"] = {"machines": fleet.machine_list(template)}
+    return fleet
+
+
+def set_fleet(fleet: FleetState):
+    """동적 핸들러가 참조하는 시뮬레이션 상태 교체 (구성이 바뀐 경우 엔진도 새로 생성)"""
+    global FLEET, ENGINE
+    if fleet is not ENGINE.fleet or (SHARED_STATE_NAME and ENGINE.store is None):
+        ENGINE.close()
+        ENGINE = SimulationEngine(fleet, START_TIME, shared_name=SHARED_STATE_NAME)
+    FLEET = fleet
+
+
+def param_count(name: str):
+    """현재 시뮬레이션 구성에서 파라미터의 인덱스 개수 (와일드카드 확장용)"""
+    return FLEET.count(name)
 
 
-def get_time_based_position():
-    """시간에 따라 -50 ~ +50 사이를 부드럽게 왕복하는 좌표값"""
-    t = time.time()
-    # 10초 주기로 왕복 (150을 기준으로 ±50)
-    return round(150.0 + math.sin(t * 0.6) * 50, 3)
+def stop_engine():
+    """서버 종료 시 엔진 정리 (공유 메모리 연결 해제)"""
+    ENGINE.close()
 
-def get_work_position():
+
+async def run_engine(interval: float):
+    """interval초마다 한 틱씩 시뮬레이션 진행 (lifespan에서 백그라운드 태스크로 실행)"""
+    while True:
+        ENGINE.step()
+        await asyncio.sleep(interval)
+
+
+def init_fleet(mock_db: dict, n_machines: int = None) -> FleetState:
+    """build_fleet으로 만든 시뮬레이션 상태를 바로 적용"""
+    fleet = build_fleet(mock_db, n_machines)
+    set_fleet(fleet)
+    return fleet
+
+
+def get_time_based_position(params):
+    """시간에 따라 축마다 다른 중심/진폭/위상으로 부드럽게 왕복하는 좌표값"""
+    return round(float(ENGINE.snapshot.machine_position[FLEET.axis(params)]), 3)
+
+def get_work_position(params):
     """기계 좌표와 약간 다르게 움직이는 가공 좌표"""
-    t = time.time()
-    return round(45.0 + math.sin(t * 0.6 + 1.0) * 45, 3)
+    return round(float(ENGINE.snapshot.work_position[FLEET.axis(params)]), 3)
 
-def get_fluctuating_load(base=25.0, variation=2.0):
+def get_axis_load(params):
     """기준 부하값에서 약간씩 떨리는 값"""
-    return round(base + random.uniform(-variation, variation), 1)
+    return round(float(ENGINE.snapshot.axis_load[FLEET.axis(params)]), 1)
+
+def get_axis_feed(params):
+    return round(float(ENGINE.snapshot.axis_feed[FLEET.axis(params)]), 1) # 이송속도 미세 변동
 
-def get_spindle_rpm(target=2000.0):
+def get_spindle_rpm(params):
     """목표 회전수 근처에서 미세하게 변하는 실제 RPM"""
-    # 1995 ~ 2005 사이 변동
-    return round(target + random.uniform(-5.0, 5.0), 1)
+    return round(float(ENGINE.snapshot.spindle_speed[FLEET.spindle(params)]), 1)
 
-def get_machining_time():
-    """서버 실행 후 경과 시간을 초 단위로 반환"""
-    return round(time.time() - START_TIME, 1)
+def get_spindle_load(params):
+    return round(float(ENGINE.snapshot.spindle_load[FLEET.spindle(params)]), 1)
 
-def get_current_iso_time():
-    """현재 시간을 ISO 8601 포맷으로 반환"""
-    return datetime.now().isoformat()
+def get_spindle_temperature(params):
+    return round(float(ENGINE.snapshot.spindle_temperature[FLEET.spindle(params)]), 1)
 
-def get_increasing_counter():
+def get_machining_time(params):
+    """채널별 누적 가공 시간을 초 단위로 반환"""
+    return round(float(ENGINE.snapshot.machining_time[FLEET.channel(params)]), 1)
+
+def get_current_iso_time(params):
+    """현재 시간(스냅샷 시각)을 ISO 8601 포맷으로 반환"""
+    FLEET.machine(params)
+    return datetime.fromtimestamp(ENGINE.snapshot.time).isoformat()
+
+def get_increasing_counter(params):
     """시간에 따라 계속 증가하는 카운터 (가공 수량 시뮬레이션)"""
-    # 10초에 1개씩 증가한다고 가정
-    elapsed = time.time() - START_TIME
-    return 50 + int(elapsed / 10)
+    return int(ENGINE.snapshot.work_counter[FLEET.channel(params)])
 
 # =====================================================================
 
-def get_current_program_step():
+def get_current_program_step(params):
     """시간에 따라 프로그램 리스트를 순환하며 현재 단계의 데이터를 반환"""
-    # 5초마다 다음 블록으로 넘어감
-    idx = int((time.time() - START_TIME) / 5) % len(MOCK_PROGRAM_DATA)
-    return MOCK_PROGRAM_DATA[idx]
+    # 5초마다 다음 블록으로 넘어감 (채널마다 시작 블록이 다름)
+    return MOCK_PROGRAM_DATA[int(ENGINE.snapshot.program_step[FLEET.channel(params)])]
 
 # 각 필드별 래퍼 함수 (핸들러 매핑용)
-def get_current_block():
-    return get_current_program_step()["block"]
+def get_current_block(params):
+    return get_current_program_step(params)["block"]
 
-def get_sequence_number():
-    return get_current_program_step()["seq"]
+def get_sequence_number(params):
+    return get_current_program_step(params)["seq"]
 
-def get_active_part_program():
-    step = get_current_program_step()
+def get_active_part_program(params):
+    step = get_current_program_step(params)
     # 예: "O1234 (TEST); N110 G01 Z-10. F1000;" 형태로 조합
     return f"{step['active']}; {step['block']};"
 
-def get_power_consumption(base_power=1200.0):
-    """부하에 비례하여 전력 소모량 계산 (노이즈 추가)"""
-    # 부하가 변하면 전력도 같이 변하는 것처럼 연출
-    noise = random.uniform(-50.0, 50.0)
-    return round(base_power + noise, 1)
+def get_axis_power(params):
+    """축 부하에 비례하는 전력 소모량 (같은 틱의 부하값 기준)"""
+    return round(float(ENGINE.snapshot.axis_power[FLEET.axis(params)]), 1)
 
-def get_plc_bit():
+def get_spindle_power(params):
+    """스핀들 부하에 비례하는 전력 소모량 (같은 틱의 부하값 기준)"""
+    return round(float(ENGINE.snapshot.spindle_power[FLEET.spindle(params)]), 1)
+
+def get_plc_bit(params):
     """PLC 비트 신호 (센서 On/Off 시뮬레이션)"""
     # 20% 확률로 True, 80% 확률로 False (간헐적 신호)
-    return random.random() < 0.2
+    return bool(ENGINE.snapshot.plc_bit[FLEET.machine(params)])
 
-def get_plc_word():
+def get_plc_word(params):
     """PLC 워드 데이터 (16비트 정수, 상태 코드 등)"""
     # 0 ~ 100 사이의 임의의 상태 값
-    return random.randint(0, 100)
+    return int(ENGINE.snapshot.plc_word[FLEET.machine(params)])
 
-def get_plc_dword():
+def get_plc_dword(params):
     """PLC 더블워드 데이터 (32비트 정수, 카운터 등)"""
-    return random.randint(1000, 50000)
+    return int(ENGINE.snapshot.plc_dword[FLEET.machine(params)])
 
-def get_buffer_stream_value():
+def get_buffer_stream_value(params):
     """고속 샘플링 데이터 (진동 센서 값 시뮬레이션)"""
     # 0.0 ~ 1.0 사이의 값 (노이즈가 섞인 신호)
-    return round(random.random(), 4)
+    return round(float(ENGINE.snapshot.stream_value[FLEET.machine(params)]), 4)
+
+def sample_buffer_stream(params, times):
+    """진동 센서 값을 주어진 시각 배열마다 샘플링 (틱보다 빠른 스트리밍용)"""
+    return ENGINE.stream_signal(FLEET.machine(params), times)
 
 
-def get_decreasing_tool_life(max_life=1000.0):
+def get_decreasing_tool_life(machine: int, tool: int):
     """시간이 지날수록 줄어드는 공구 수명 (예지보전 테스트용)"""
-    elapsed = time.time() - START_TIME
-    # 1초에 0.5씩 수명이 깎인다고 가정
-    rest_life = max_life - (elapsed * 0.5)
-    # 0보다 작아지면 다시 새 공구(1000)로 교체된 척 리셋
-    if rest_life < 0:
-        rest_life = max_life - (rest_life % max_life)
-    return round(rest_life, 1)
-
-def get_increasing_tool_count():
+    return round(float(ENGINE.snapshot.tool_rest_life[machine, tool]), 1)
+
+def get_increasing_tool_count(machine: int, tool: int):
     """시간이 지날수록 늘어나는 공구 사용 횟수"""
-    elapsed = time.time() - START_TIME
-    # 10초에 1회 가공 완료 가정
-    return 100 + int(elapsed / 10)
-
-def get_memory_capacity():
-    """조금씩 변동하는 메모리 용량"""
-    total = 2097152.0
-    # 기본 사용량 51200에서 ±1000 정도 변동
-    used = 51200.0 + random.uniform(-1000, 5000)
-    free = total - used
-    return (round(used, 0), round(free, 0))
-
-# 메모리 사용량/남은용량은 서로 짝이 맞아야 하므로 별도 처리용
-def get_used_capacity():
-    return get_memory_capacity()[0]
-
-def get_free_capacity():
-    return get_memory_capacity()[1]
-
-def get_random_alarm_status():
-    """가끔씩 알람이 발생하는 상황 시뮬레이션"""
-    # 5% 확률로 알람 발생, 95% 확률로 정상
-    if random.random() < 0.05:
+    return int(ENGINE.snapshot.tool_count[machine, tool])
+
+def get_active_tool_life(params):
+    machine, channel = FLEET.channel(params)
+    return get_decreasing_tool_life(machine, int(FLEET.active_tool[machine, channel]))
+
+def get_active_tool_count(params):
+    machine, channel = FLEET.channel(params)
+    return get_increasing_tool_count(machine, int(FLEET.active_tool[machine, channel]))
+
+def get_registered_tool_max_life(params):
+    machine, tool = FLEET.tool(params)
+    return float(FLEET.tool_max_life[machine, tool])
+
+def get_registered_tool_life(params):
+    return get_decreasing_tool_life(*FLEET.tool(params))
+
+def get_registered_tool_count(params):
+    return get_increasing_tool_count(*FLEET.tool(params))
+
+# 메모리 사용량/남은용량은 같은 스냅샷에서 계산되므로 합이 항상 totalCapacity
+def get_used_capacity(params):
+    return float(ENGINE.snapshot.memory_used[FLEET.machine(params)])
+
+def get_free_capacity(params):
+    return float(ENGINE.snapshot.memory_free[FLEET.machine(params)])
+
+def get_alarm_status(params):
+    """가끔씩 알람이 발생하는 상황 시뮬레이션 (발생 후 몇 초간 유지)"""
+    if ENGINE.snapshot.alarm_active[FLEET.channel(params)]:
         return {"text": "SPINDLE OVERHEAT", "number": 2001}
     else:
         return {"text": "NO ALARM", "number": 0}
 
-def get_alarm_text():
-    return get_random_alarm_status()["text"]
+def get_alarm_text(params):
+    return get_alarm_status(params)["text"]
 
-def get_alarm_number():
-    return get_random_alarm_status()["number"]
+def get_alarm_number(params):
+    return get_alarm_status(params)["number"]
 
 # ==========================================
 # 1단계: 필수 모니터링 엔드포인트 매핑
+# 모든 핸들러는 요청 query param(machine, channel, axis, ...)을 받아 해당 장비의 값을 반환
 # ==========================================
 DYNAMIC_HANDLERS = {
     # 1. 축(Axis) 위치 및 부하
     "/machine/channel/axis/machinePosition": get_time_based_position,
     "/machine/channel/axis/workPosition": get_work_position,
-    "/machine/channel/axis/axisLoad": lambda: get_fluctuating_load(25.0, 5.0),
-    "/machine/channel/axis/axisFeed": lambda: get_fluctuating_load(1500.0, 10.0), # 이송속도 미세 변동
+    "/machine/channel/axis/axisLoad": get_axis_load,
+    "/machine/channel/axis/axisFeed": get_axis_feed, # 이송속도 미세 변동
     
     # 2. 스핀들(Spindle)
-    "/machine/channel/spindle/rpm/actualSpeed": lambda: get_spindle_rpm(2000.0),
-    "/machine/channel/spindle/spindleLoad": lambda: get_fluctuating_load(40.0, 3.0),
-    "/machine/channel/spindle/spindleTemperature": lambda: get_fluctuating_load(38.0, 0.5),
+    "/machine/channel/spindle/rpm/actualSpeed": get_spindle_rpm,
+    "/machine/channel/spindle/spindleLoad": get_spindle_load,
+    "/machine/channel/spindle/spindleTemperature": get_spindle_temperature,
 
     # 3. 시간 및 카운터
     "/machine/currentCncTime": get_current_iso_time,
@@ -170,8 +240,8 @@ DYNAMIC_HANDLERS = {
     "/machine/channel/currentProgram/activePartProgram": get_active_part_program,
     
     # 전력 소비량 (축, 스핀들 각각)
-    "/machine/channel/axis/axisPower/actualPowerConsumption": lambda: get_power_consumption(1200.0),
-    "/machine/channel/spindle/spindlePower/actualPowerConsumption": lambda: get_power_consumption(5000.0),
+    "/machine/channel/axis/axisPower/actualPowerConsumption": get_axis_power,
+    "/machine/channel/spindle/spindlePower/actualPowerConsumption": get_spindle_power,
     # [3단계: PLC 및 버퍼 (NEW)]
     "/machine/pic/memory/bitBlock": get_plc_bit,
     "/machine/pic/memory/rbitBlock": get_plc_bit,  # 읽기 전용 비트도 동일하게 처리
@@ -181,8 +251,11 @@ DYNAMIC_HANDLERS = {
 
 
     # [4단계: 공구 수명 (Health)]
-    "/machine/channel/activeTool/toolEdge/toolLife/restToolLife": lambda: get_decreasing_tool_life(1000.0),
-    "/machine/channel/activeTool/toolEdge/toolLife/toolLifeCount": get_increasing_tool_count,
+    "/machine/channel/activeTool/toolEdge/toolLife/restToolLife": get_active_tool_life,
+    "/machine/channel/activeTool/toolEdge/toolLife/toolLifeCount": get_active_tool_count,
+    "/machine/toolArea/registerTools/toolEdge/toolLife/maxToolLife": get_registered_tool_max_life,
+    "/machine/toolArea/registerTools/toolEdge/toolLife/restToolLife": get_registered_tool_life,
+    "/machine/toolArea/registerTools/toolEdge/toolLife/toolLifeCount": get_registered_tool_count,
 
     # [4단계: NC 메모리 (Resource)]
     "/machine/ncMemory/usedCapacity": get_used_capacity,
@@ -192,4 +265,10 @@ DYNAMIC_HANDLERS = {
     "/machine/channel/alarm/alarmText": get_alarm_text,
     "/machine/channel/alarm/alarmNumber": get_alarm_number, # JSON에서 값이 문자열인지 숫자인지 확인 필요 (여기선 문자열로 변환)
 
+}
+
+# /stream 구독 시 샘플마다 값을 따로 계산하는 고속 신호 (params, 시각 배열) -> 샘플 배열
+# 여기에 없는 동적 엔드포인트는 틱 단위 값을 프레임마다 한 번 전송 (sample-and-hold)
+STREAM_SAMPLERS = {
+    "/machine/buffer/stream/value": sample_buffer_stream,
 }
\ No newline at end of file
@@ -1,61 +1,512 @@
+import asyncio
 import json
 import os
+import time
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from typing import Callable, NamedTuple, Optional
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, Response
+from pydantic import ValidationError
 
-from generators import DYNAMIC_HANDLERS
+from faults import ERROR_STATUS, PRESETS, FaultConfig, inject
+from generators import DYNAMIC_HANDLERS, STREAM_SAMPLERS, build_fleet, param_count, run_engine, set_fleet, stop_engine
+from ncfiles import NC_NOT_FOUND, NcFileSystem, parse_upload
+from stream import StreamRequest, StreamSubscription, held_signal, sampled_signal, static_signal
 # 전역 변수로 데이터 로드
 MOCK_DB = {}
+# MOCK_DB를 컴파일한 라우트 테이블 (endpoint -> Route)
+ROUTES = {}
+
+MOCK_DATA_PATH = os.getenv("MOCK_DATA_PATH", os.path.join(os.path.dirname(__file__), "mock_data.json"))
+# mock_data.json 변경 감지 주기(초). 0이면 핫 리로드 비활성화
+RELOAD_INTERVAL = float(os.getenv("MOCK_RELOAD_INTERVAL", "1.0"))
+# 시뮬레이션 틱 주기(초). 동적 값은 틱마다 한 번 전체 장비에 대해 계산됨
+TICK_INTERVAL = float(os.getenv("MOCK_TICK_INTERVAL", "0.01"))
+RELOAD_STATS = {"reloads": 0, "failures": 0, "last_reload_ms": None, "last_error": None}
+# 런타임 장애 주입 설정 (/admin/faults로 변경, None이면 주입 없음)
+FAULTS: Optional[FaultConfig] = None
+# NC 메모리 파일 API(/file/machine/ncpath/*)의 장비별 파일 시스템 (메모리에만 보관)
+NC_FILES = NcFileSystem()
+
+
+class Route(NamedTuple):
+    """
+    컴파일된 엔드포인트 정보.
+    - params: 요구 파라미터 이름 집합 (frozenset, 요청마다 set을 새로 만들지 않도록 고정)
+    - body: 정적 엔드포인트의 미리 직렬화된 응답 바이트 (동적이면 None)
+    - handler: 동적 엔드포인트의 값 생성 함수 (정적이면 None)
+    """
+    params: frozenset
+    body: Optional[bytes]
+    handler: Optional[Callable]
+
+
+def encode_json(value) -> bytes:
+    """JSONResponse.render와 동일한 형식으로 값을 직렬화"""
+    return json.dumps(
+        value, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+# /batch 항목별 에러 응답 (TORUS error_status 코드 사용)
+BATCH_ERROR_ADDRESS = encode_json({"status": 538992680, "message": "MgrCommunication Address 또는 Filter 오류"})
+BATCH_ERROR_FILTER = encode_json({"status": 565837824, "message": "입력한 filter값 중 일부 혹은 전체가 잘못 되었음"})
+BATCH_ERROR_PARSING = encode_json({"status": 538992649, "message": "MgrCommunication Address parsing 오류"})
+
+# 와일드카드/범위 파라미터 한 번에 확장할 수 있는 최대 값 개수
+MAX_EXPANDED_VALUES = 10000
+
+
+def compile_routes(mock_db: dict) -> dict:
+    """
+    MOCK_DB를 라우트 테이블로 컴파일.
+    정적 값은 이 시점에 한 번만 직렬화해 두고, DYNAMIC_HANDLERS에 있는 엔드포인트는 동적으로 표시한다.
+    """
+    routes = {}
+    for endpoint, spec in mock_db.items():
+        params = frozenset(spec.get("params", []))
+        handler = DYNAMIC_HANDLERS.get(endpoint)
+        if handler is not None:
+            routes[endpoint] = Route(params, None, handler)
+        else:
+            routes[endpoint] = Route(params, encode_json(spec["value"]), None)
+    return routes
+
+def validate_mock_db(mock_db) -> None:
+    """mock_data.json 구조 검증 ({endpoint: {"params": [str, ...], "value": ...}})"""
+    if not isinstance(mock_db, dict):
+        raise ValueError("최상위 구조는 객체여야 합니다")
+    for endpoint, spec in mock_db.items():
+        if not endpoint.startswith("/"):
+            raise ValueError(f"{endpoint}: 엔드포인트는 '/'로 시작해야 합니다")
+        if not isinstance(spec, dict) or "value" not in spec:
+            raise ValueError(f"{endpoint}: 'value' 항목이 없습니다")
+        params = spec.get("params", [])
+        if not isinstance(params, list) or not all(isinstance(p, str) for p in params):
+            raise ValueError(f"{endpoint}: 'params'는 문자열 리스트여야 합니다")
+
+
+def load_mock_table(file_path: str):
+    """
+    mock_data.json을 읽어 검증하고 시뮬레이션 상태와 라우트 테이블까지 만든다.
+    전역 상태를 건드리지 않으므로 워커 스레드에서 실행해도 안전하다.
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        mock_db = json.load(f)
+    validate_mock_db(mock_db)
+    fleet = build_fleet(mock_db)
+    return mock_db, fleet, compile_routes(mock_db)
+
+
+def install_mock_table(mock_db: dict, fleet, routes: dict):
+    """
+    새 테이블을 한 번에 교체. await 없이 이벤트 루프 스레드에서 실행되므로
+    처리 중인 요청은 이전 테이블 또는 새 테이블 중 하나만 보게 된다.
+    """
+    global MOCK_DB, ROUTES
+    set_fleet(fleet)
+    MOCK_DB = mock_db
+    ROUTES = routes
+
+
+async def reload_mock_db() -> bool:
+    """mock_data.json을 백그라운드 스레드에서 다시 읽어 교체 (실패 시 기존 테이블 유지)"""
+    started = time.perf_counter()
+    try:
+        table = await asyncio.to_thread(load_mock_table, MOCK_DATA_PATH)
+    except Exception as e:
+        RELOAD_STATS["failures"] += 1
+        RELOAD_STATS["last_error"] = str(e)
+        print(f"❌ Reload of mock_data.json failed, keeping previous table: {e}")
+        return False
+
+    install_mock_table(*table)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    RELOAD_STATS["reloads"] += 1
+    RELOAD_STATS["last_reload_ms"] = round(elapsed_ms, 2)
+    RELOAD_STATS["last_error"] = None
+    print(f"🔄 Reloaded {len(MOCK_DB)} endpoints from mock_data.json in {elapsed_ms:.1f} ms")
+    return True
+
+
+def _file_signature(file_path: str):
+    """파일 변경 감지용 (mtime, size, inode). 파일이 없으면 None"""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+async def watch_mock_db(interval: float, last_signature=None):
+    """
+    mock_data.json을 주기적으로 확인하여 변경되면 다시 로드 (bind mount 편집 대응)
+    :param last_signature: 마지막으로 로드한 시점의 파일 서명 (로드 직후 변경도 놓치지 않도록)
+    """
+    while True:
+        await asyncio.sleep(interval)
+        signature = _file_signature(MOCK_DATA_PATH)
+        if signature is not None and signature != last_signature:
+            last_signature = signature
+            await reload_mock_db()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # 서버 시작 시 JSON 파일 로드
-    global MOCK_DB
-    file_path = os.path.join(os.path.dirname(__file__), "mock_data.json")
+    signature = _file_signature(MOCK_DATA_PATH)
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            MOCK_DB = json.load(f)
+        mock_db, fleet, routes = load_mock_table(MOCK_DATA_PATH)
+        install_mock_table(mock_db, fleet, routes)
         print(f"✅ Loaded {len(MOCK_DB)} endpoints from mock_data.json")
+        print(f"✅ Simulating {fleet.n_machines} machines ({fleet.nbytes / 1024:.1f} KiB state)")
     except Exception as e:
         print(f"❌ Error loading mock_data.json: {e}")
+
+    watcher = asyncio.create_task(watch_mock_db(RELOAD_INTERVAL, signature)) if RELOAD_INTERVAL > 0 else None
+    ticker = asyncio.create_task(run_engine(TICK_INTERVAL))
     yield
+    ticker.cancel()
+    stop_engine()
+    if watcher is not None:
+        watcher.cancel()
 
 app = FastAPI(lifespan=lifespan)
 
+def expand_params(params):
+    """
+    와일드카드('*': 전체 인덱스)/범위('1-5') 파라미터를 [(이름, 인덱스 range), ...]로 변환.
+    확장할 파라미터가 없으면 None, 확장할 수 없으면(인덱스 개수를 아는 파라미터의 범위가 1~개수를 벗어나는 경우 포함) ValueError.
+    """
+    expanded = None
+    total = 1
+    for name, value in params.items():
+        if not isinstance(value, str):
+            continue
+        if value == "*":
+            count = param_count(name)
+            if count is None:
+                raise ValueError(f"{name}: 와일드카드를 지원하지 않는 파라미터")
+            indexes = range(1, count + 1)
+        elif "-" in value:
+            start, _, stop = value.partition("-")
+            if not (start.isdigit() and stop.isdigit()):
+                continue
+            indexes = range(int(start), int(stop) + 1)
+            if not indexes:
+                raise ValueError(f"{name}={value}: 잘못된 범위")
+            count = param_count(name)
+            if count is not None and (indexes.start < 1 or indexes.stop - 1 > count):
+                # 와일드카드와 같이 시뮬레이션 구성의 인덱스 개수를 넘는 범위는 거부
+                raise ValueError(f"{name}={value}: 범위가 1-{count}을(를) 벗어남")
+        else:
+            continue
+        total *= len(indexes)
+        if total > MAX_EXPANDED_VALUES:
+            raise ValueError(f"확장된 값이 너무 많습니다 (최대 {MAX_EXPANDED_VALUES}개)")
+        expanded = expanded or []
+        expanded.append((name, indexes))
+    return expanded
+
+
+def render_expanded(route: Route, params: dict, expanded: list) -> bytes:
+    """
+    확장된 파라미터 조합마다 값을 구해 JSON 배열 바이트로 만든다.
+    파라미터가 여러 개면 앞쪽 파라미터부터 중첩 배열이 된다 (예: machine=*&axis=* -> [장비][축]).
+    """
+    (name, indexes), rest = expanded[0], expanded[1:]
+    values = []
+    for index in indexes:
+        item_params = {**params, name: str(index)}
+        if rest:
+            values.append(render_expanded(route, item_params, rest))
+        elif route.handler is None:
+            values.append(route.body)
+        else:
+            values.append(encode_json(route.handler(item_params)))
+    return b"[" + b",".join(values) + b"]"
+
+
+def fault_response(fault: dict) -> Response:
+    """주입된 장애를 응답으로 변환 (드롭은 504, 에러는 TORUS 에러 형식)"""
+    if fault.get("dropped"):
+        return Response(status_code=504)
+    return JSONResponse(content=fault)
+
+
+def resolve_batch_item(item) -> bytes:
+    """
+    /batch 요청의 항목 하나를 TORUS 응답 형식({"status":0,"value":...})의 JSON 바이트로 변환.
+    항목별로 실패해도 예외 대신 에러 코드가 담긴 응답을 돌려준다.
+    """
+    if not isinstance(item, dict) or not isinstance(item.get("endpoint"), str):
+        return BATCH_ERROR_PARSING
+    params = item.get("params") or {}
+    if not isinstance(params, dict):
+        return BATCH_ERROR_PARSING
+
+    route = ROUTES.get(item["endpoint"])
+    if route is None:
+        return BATCH_ERROR_ADDRESS
+    if route.params != params.keys():
+        return BATCH_ERROR_FILTER
+
+    try:
+        expanded = expand_params(params)
+        if expanded is not None:
+            body = render_expanded(route, params, expanded)
+        elif route.handler is None:
+            body = route.body
+        else:
+            body = encode_json(route.handler(params))
+    except (ValueError, IndexError):
+        return BATCH_ERROR_FILTER
+    return b'{"status":0,"value":' + body + b'}'
+
+
+@app.post("/batch")
+async def handle_batch(request: Request):
+    """
+    여러 엔드포인트를 한 번에 조회하는 배치 핸들러.
+    요청: [{"endpoint": "/machine/cncModel", "params": {"machine": 1}}, ...]
+    응답: {"status": 0, "value": [{"status": 0, "value": ...}, {"status": <에러코드>, "message": ...}, ...]}
+    """
+    try:
+        items = await request.json()
+    except ValueError:
+        items = None
+    if not isinstance(items, list):
+        return JSONResponse(
+            status_code=400,
+            content="잘못된 배치 요청입니다."
+        )
+
+    # 장애 주입: 항목별 지연은 동시에 기다리므로 배치 전체 지연은 가장 느린 항목 기준
+    faults = [None] * len(items)
+    if FAULTS is not None:
+        faults = await asyncio.gather(*(
+            inject(FAULTS.profile_for(item.get("endpoint"), (item.get("params") or {}).get("machine")))
+            if isinstance(item, dict) and isinstance(item.get("params") or {}, dict) else asyncio.sleep(0)
+            for item in items
+        ))
+        if any(fault and fault.get("dropped") for fault in faults):
+            return Response(status_code=504)
+
+    # 정적 값은 미리 직렬화된 바이트를 그대로 이어붙임
+    body = b'{"status":0,"value":[' + b",".join(
+        encode_json(fault) if fault else resolve_batch_item(item)
+        for item, fault in zip(items, faults)
+    ) + b']}'
+    return Response(content=body, media_type="application/json")
+
+
+def resolve_stream_item(item):
+    """/stream 구독 항목 하나를 신호 함수로 변환. 실패하면 (None, 에러 응답 바이트)"""
+    route = ROUTES.get(item.endpoint)
+    if route is None:
+        return None, BATCH_ERROR_ADDRESS
+    if route.params != item.params.keys():
+        return None, BATCH_ERROR_FILTER
+    if route.handler is None:
+        return static_signal(json.loads(route.body)), None
+    try:
+        # 범위를 벗어난 인덱스는 구독 시점에 미리 걸러냄
+        route.handler(item.params)
+    except (ValueError, IndexError):
+        return None, BATCH_ERROR_FILTER
+    sampler = STREAM_SAMPLERS.get(item.endpoint)
+    if sampler is not None:
+        return sampled_signal(sampler, item.params), None
+    return held_signal(route.handler, item.params), None
+
+
+def subscribe_stream(text: str):
+    """구독 요청 메시지 -> (StreamSubscription 또는 None, 응답 바이트)"""
+    try:
+        request = StreamRequest.model_validate_json(text)
+    except ValidationError as e:
+        return None, encode_json({"status": 538992649, "message": "MgrCommunication Address parsing 오류",
+                                  "detail": e.errors(include_url=False, include_context=False)})
+    signals = []
+    for index, item in enumerate(request.subscribe):
+        signal, error = resolve_stream_item(item)
+        if signal is None:
+            return None, error[:-1] + b',"index":' + str(index).encode() + b'}'
+        signals.append(signal)
+    subscription = StreamSubscription(signals, request.rate, request.frame_ms, time.time())
+    return subscription, encode_json({"status": 0, "rate": request.rate, "frame_ms": request.frame_ms,
+                                      "signals": len(signals)})
+
+
+@app.websocket("/stream")
+async def handle_stream(websocket: WebSocket):
+    """
+    고속 신호 구독 (WebSocket). HTTP 요청마다 값 하나를 받는 대신, 구독한 값들을 frame_ms마다 묶어서 전송.
+    요청: {"subscribe": [{"endpoint": "/machine/buffer/stream/value", "params": {"machine": 1}}, ...],
+           "rate": 2000, "frame_ms": 20}
+    응답: {"status": 0, ...} 확인 후 프레임 {"seq", "t0", "dt", "n", "skipped", "values": [...]} 반복.
+    연결 중에 새 구독 요청을 보내면 구독이 교체되고, 잘못된 요청이면 에러 응답 후 기존 구독을 유지한다.
+    """
+    await websocket.accept()
+    subscription = None
+    receiver = asyncio.create_task(websocket.receive_text())
+    try:
+        while True:
+            timeout = subscription.frame_interval if subscription is not None else None
+            done, _ = await asyncio.wait({receiver}, timeout=timeout)
+            if receiver in done:
+                new_subscription, reply = subscribe_stream(receiver.result())
+                subscription = new_subscription or subscription
+                await websocket.send_text(reply.decode("utf-8"))
+                receiver = asyncio.create_task(websocket.receive_text())
+            if subscription is not None:
+                frame = subscription.next_frame(time.time())
+                if frame is not None:
+                    await websocket.send_text(frame.decode("utf-8"))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+
+
+@app.post("/admin/reload")
+async def handle_reload():
+    """mock_data.json 즉시 재로드 (감시 주기를 기다리지 않음)"""
+    await reload_mock_db()
+    return RELOAD_STATS
+
+
+@app.get("/admin/faults")
+async def get_faults():
+    """현재 장애 주입 설정 조회"""
+    return FAULTS.model_dump() if FAULTS is not None else {}
+
+
+@app.put("/admin/faults")
+async def put_faults(config: Optional[FaultConfig] = None, preset: Optional[str] = None):
+    """
+    장애 주입 설정 교체. 본문으로 FaultConfig를 보내거나 ?preset=이름 으로 미리 정의된 설정을 적용.
+    예) {"default": {"latency": {"type": "longtail", "median_ms": 5}}, "machines": {"3": {"error_rate": 0.5}}}
+    """
+    global FAULTS
+    if preset is not None:
+        if preset not in PRESETS:
+            return JSONResponse(status_code=400, content=f"알 수 없는 프리셋입니다: {preset} (사용 가능: {sorted(PRESETS)})")
+        config = FaultConfig(**PRESETS[preset])
+    FAULTS = config if config is not None and config.model_dump(exclude_defaults=True) else None
+    return FAULTS.model_dump() if FAULTS is not None else {}
+
+
+@app.delete("/admin/faults")
+async def delete_faults():
+    """장애 주입 해제"""
+    global FAULTS
+    FAULTS = None
+    return {}
+
+
+async def nc_fault(request: Request, machine) -> Optional[Response]:
+    """NC 파일 API에도 /admin/faults 장애 주입 적용"""
+    if FAULTS is None:
+        return None
+    fault = await inject(FAULTS.profile_for(request.url.path, machine))
+    return fault_response(fault) if fault is not None else None
+
+
+def nc_status(status: int) -> JSONResponse:
+    if status == 0:
+        return JSONResponse(content={"status": 0})
+    return JSONResponse(content={"status": status, "message": ERROR_STATUS.get(status, "")})
+
+
+@app.get("/file/machine/ncpath/exists")
+async def nc_exists(request: Request, machine: int, ncpath: str):
+    """NC 경로(폴더는 '/'로 끝남)가 있는지 -> {"status":0,"value":[bool]}"""
+    return await nc_fault(request, machine) or {"status": 0, "value": [NC_FILES.exists(machine, ncpath)]}
+
+
+@app.post("/file/machine/ncpath/mkdir")
+async def nc_mkdir(request: Request):
+    """폴더 생성. 본문 {"machine": 1, "ncpath": "//CNC_MEM/USER/OM"}"""
+    payload = await request.json()
+    return await nc_fault(request, payload.get("machine")) or nc_status(
+        NC_FILES.mkdir(payload.get("machine"), payload.get("ncpath", ""))
+    )
+
+
+@app.get("/file/machine/ncpath/list")
+async def nc_list(request: Request, machine: int, ncpath: str):
+    """폴더의 파일명 목록 -> {"status":0,"files":[...]}"""
+    fault = await nc_fault(request, machine)
+    if fault is not None:
+        return fault
+    files = NC_FILES.list(machine, ncpath)
+    return nc_status(NC_NOT_FOUND) if files is None else {"status": 0, "files": files}
+
+
+@app.delete("/file/machine/ncpath/delete")
+async def nc_delete(request: Request, machine: int, ncpath: str):
+    """파일 또는 빈 폴더 삭제"""
+    return await nc_fault(request, machine) or nc_status(NC_FILES.delete(machine, ncpath))
+
+
+@app.put("/file/machine/ncpath")
+async def nc_put(request: Request, machine: int, ncpath: str):
+    """multipart/form-data의 file 부분을 ncpath 폴더에 저장 (같은 이름의 파일이 있으면 실패)"""
+    fault = await nc_fault(request, machine)
+    if fault is not None:
+        return fault
+    filename, size = parse_upload(request.headers.get("content-type", ""), await request.body())
+    if filename is None:
+        return JSONResponse(status_code=400, content="multipart 파일 본문이 없습니다")
+    return nc_status(NC_FILES.put(machine, ncpath, filename, size))
+
+
 @app.get("{full_path:path}")
 async def handle_request(full_path: str, request: Request):
     """
     모든 GET 요청을 받아서 처리하는 핸들러
     """
-    # 1. 엔드포인트 주소 파싱
-    endpoint = "" + full_path
-    
-    # 2. 엔드포인트 존재 여부 확인
-    if endpoint not in MOCK_DB:
+    # 0. 장애 주입 (설정된 경우에만, 지연은 asyncio.sleep으로 처리)
+    if FAULTS is not None:
+        fault = await inject(FAULTS.profile_for(full_path, request.query_params.get("machine")))
+        if fault is not None:
+            return fault_response(fault)
+
+    # 1. 엔드포인트 존재 여부 확인 (컴파일된 라우트 테이블 조회)
+    route = ROUTES.get(full_path)
+    if route is None:
         return JSONResponse(
             status_code=404,
             content="존재하지 않는 엔드포인트입니다" 
         )
 
-    # 3. 파라미터 검증 로직
-    spec = MOCK_DB[endpoint]
-    required_params = set(spec.get("params", []))
-    received_params = set(request.query_params.keys())
-
+    # 2. 파라미터 검증 로직
     # 파라미터 집합이 정확히 일치해야 함 (누락도 안되고, 쓸데없는 게 있어도 안됨)
-    if required_params != received_params:
+    # query_params.keys()는 set처럼 비교되므로 요청마다 set을 만들 필요가 없음
+    if route.params != request.query_params.keys():
         return JSONResponse(
             status_code=400,
             content="잘못된 파라미터 접근입니다." # 
         )
 
-    response_value = spec["value"] # 기본값은 JSON 값
+    try:
+        # 3. 와일드카드/범위 파라미터 (axis=*, axis=1-5) -> TORUS 배열 응답 {"status":0,"value":[...]}
+        expanded = expand_params(request.query_params)
+        if expanded is not None:
+            body = render_expanded(route, dict(request.query_params), expanded)
+            return Response(content=b'{"status":0,"value":' + body + b'}', media_type="application/json")
+
+        # 4. 정적 엔드포인트 -> 미리 직렬화된 바이트를 그대로 반환 (재직렬화 생략)
+        if route.handler is None:
+            return Response(content=route.body, media_type="application/json")
 
-    if endpoint in DYNAMIC_HANDLERS:
-        # 동적 처리가 필요한 엔드포인트라면 함수 실행 결과를 사용
-        # (필요하다면 request의 query param을 함수에 전달할 수도 있음)
-        response_value = DYNAMIC_HANDLERS[endpoint]()
-    
-    # 4. 검증 통과 -> 값 반환
-    return response_value
\ No newline at end of file
+        # 5. 동적 처리가 필요한 엔드포인트라면 함수 실행 결과를 사용
+        # query param(machine, channel, axis, ...)으로 해당 장비의 시뮬레이션 값을 조회
+        return route.handler(request.query_params)
+    except (ValueError, IndexError):
+        # 숫자가 아니거나 시뮬레이션 범위(장비/채널/축 수)를 벗어난 파라미터
+        return JSONResponse(
+            status_code=400,
+            content="잘못된 파라미터 접근입니다."
+        )
@@ -0,0 +1,108 @@
+"""
+NC 메모리 파일 API 모의 구현 (/file/machine/ncpath/*).
+장비별로 폴더 경로 -> {파일명: 크기}를 메모리에 보관하며, 파일 내용은 저장하지 않는다.
+"""
+from typing import Dict, Optional, Tuple
+
+# mock_data.json의 /machine/ncMemory/rootPath 값과 같은 루트 (장비마다 처음부터 존재)
+NC_ROOT = "//CNC_MEM/USER/"
+
+# TORUS 에러 코드 (error_status.json)
+NC_NOT_FOUND = 565972992       # NC의 해당 경로에 해당 객체가 없는 경우
+NC_ALREADY_EXISTS = 565977088  # NC의 해당 경로에 이미 같은 이름의 객체가 있는 경우
+
+
+def _folder(path: str) -> str:
+    """폴더 경로를 '/'로 끝나는 형태로 맞춤"""
+    return path if path.endswith("/") else path + "/"
+
+
+def _split(path: str) -> Tuple[str, str]:
+    """파일 경로 -> (폴더 경로, 파일명)"""
+    folder, _, name = path.rpartition("/")
+    return folder + "/", name
+
+
+class NcFileSystem:
+    """장비별 NC 메모리 (폴더 생성/조회/삭제, 파일 업로드)"""
+
+    def __init__(self, root: str = NC_ROOT):
+        self.root = root
+        self._machines: Dict[str, Dict[str, Dict[str, int]]] = {}
+
+    def _folders(self, machine) -> Dict[str, Dict[str, int]]:
+        return self._machines.setdefault(str(machine), {self.root: {}})
+
+    def exists(self, machine, path: str) -> bool:
+        folders = self._folders(machine)
+        if path.endswith("/"):
+            return path in folders
+        folder, name = _split(path)
+        return path + "/" in folders or name in folders.get(folder, {})
+
+    def mkdir(self, machine, path: str) -> int:
+        """폴더 생성 (상위 폴더가 있어야 함). 반환값은 TORUS status"""
+        folders = self._folders(machine)
+        path = _folder(path)
+        if path in folders:
+            return NC_ALREADY_EXISTS
+        if _split(path[:-1])[0] not in folders:
+            return NC_NOT_FOUND
+        folders[path] = {}
+        return 0
+
+    def list(self, machine, path: str) -> Optional[list]:
+        """폴더의 파일명 목록 (폴더가 없으면 None)"""
+        files = self._folders(machine).get(_folder(path))
+        return None if files is None else sorted(files)
+
+    def delete(self, machine, path: str) -> int:
+        """파일 또는 빈 폴더 삭제"""
+        folders = self._folders(machine)
+        if path.endswith("/") or path + "/" in folders:
+            path = _folder(path)
+            if path not in folders or folders[path]:
+                return NC_NOT_FOUND
+            del folders[path]
+            return 0
+        folder, name = _split(path)
+        if folders.get(folder, {}).pop(name, None) is None:
+            return NC_NOT_FOUND
+        return 0
+
+    def put(self, machine, path: str, filename: str, size: int) -> int:
+        """파일 저장 (같은 이름의 파일이 있으면 실패하므로 먼저 삭제해야 함)"""
+        files = self._folders(machine).get(_folder(path))
+        if files is None:
+            return NC_NOT_FOUND
+        if filename in files:
+            return NC_ALREADY_EXISTS
+        files[filename] = size
+        return 0
+
+    def reset(self):
+        self._machines.clear()
+
+
+def parse_upload(content_type: str, body: bytes) -> Tuple[Optional[str], int]:
+    """
+    multipart/form-data 본문에서 첫 파일 부분의 (파일명, 크기)를 구함 (python-multipart 없이).
+    형식이 맞지 않으면 (None, 0)
+    """
+    _, _, boundary = content_type.partition("boundary=")
+    if not boundary:
+        return None, 0
+    delimiter = b"--" + boundary.strip('"').encode()
+    start = body.find(delimiter)
+    header_end = body.find(b"\r\n\r\n", start)
+    if start < 0 or header_end < 0:
+        return None, 0
+    headers = body[start + len(delimiter):header_end].decode("utf-8", errors="replace")
+    _, found, rest = headers.partition('filename="')
+    if not found:
+        return None, 0
+    filename = rest.partition('"')[0].replace("%22", '"')
+    end = body.find(b"\r\n" + delimiter, header_end + 4)
+    if end < 0:
+        return None, 0
+    return filename, end - (header_end + 4)
@@ -0,0 +1,165 @@
+import fcntl
+import mmap
+import os
+import tempfile
+import zlib
+from contextlib import contextmanager
+
+import numpy as np
+
+# 공유 메모리 세그먼트 이름. 지정하면 여러 워커 프로세스(uvicorn --workers)가 하나의 시뮬레이션 상태를 공유
+SHARED_STATE_ENV = "MOCK_SHARED_STATE"
+# 세그먼트 파일 위치 (리눅스는 메모리 기반 파일시스템인 /dev/shm)
+SHARED_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+# 헤더(float64): 시뮬레이션 시작 시각, 현재 슬롯, 슬롯별 (tick, time)
+_START, _SLOT, _SLOT_TICKS = 0, 1, 2
+_HEADER_SIZE = 6
+# 세그먼트 파일의 잠금 바이트: 리더, 초기화/해제 구간, 연결 중인 프로세스(공유 잠금)
+_LEADER_BYTE, _MUTEX_BYTE, _ATTACH_BYTE = 0, 1, 2
+_ALIGN = 16
+
+
+class SharedStore:
+    """
+    장비 파라미터(FleetState 배열)와 틱 스냅샷을 담는 공유 메모리 세그먼트.
+    - 처음 연결한 프로세스가 자신의 장비 파라미터와 시작 시각을 기록하고, 이후 프로세스는 그 값을 그대로 사용
+    - 세그먼트는 SHARED_DIR의 파일을 mmap한 것으로, 파일 잠금(fcntl.lockf)으로 리더 선출과 초기화를 조율
+    - 리더(세그먼트 파일의 리더 바이트 잠금을 가진 프로세스) 하나만 틱을 계산해 스냅샷을 기록하고 나머지는 읽기만 함
+    - 프로세스가 죽으면 OS가 잠금을 풀어 주므로 다른 워커가 다음 틱에 리더를 이어받고,
+      비정상 종료로 남은 세그먼트는 다음 실행에서 연결 중인 프로세스가 없는 것으로 판단해 새로 초기화함
+    - 스냅샷은 슬롯 2개에 번갈아 기록(더블 버퍼링)하고, 읽는 쪽은 현재 슬롯을 복사한 뒤 그동안 슬롯의 틱이
+      바뀌지 않았는지 확인(seqlock)하므로 돌려받은 스냅샷은 리더가 슬롯을 다시 써도 바뀌지 않음
+    """
+
+    def __init__(self, name: str, fleet, template, start_time: float):
+        fleet_arrays = {k: v for k, v in sorted(vars(fleet).items()) if isinstance(v, np.ndarray)}
+        snapshot_arrays = {k: np.asarray(getattr(template, k)) for k in template.__slots__
+                           if k not in ("tick", "time")}
+
+        # 세그먼트 배치: 헤더 | 장비 파라미터 | 스냅샷 슬롯 0 | 스냅샷 슬롯 1
+        offset = _HEADER_SIZE * 8
+        layout = []
+        for region, arrays in (("fleet", fleet_arrays), ("slot0", snapshot_arrays), ("slot1", snapshot_arrays)):
+            for key, array in arrays.items():
+                layout.append((region, key, array.shape, array.dtype.str, offset))
+                offset += -(-array.nbytes // _ALIGN) * _ALIGN
+        # 구성이 다르면(핫 리로드로 장비 수가 바뀌는 등) 다른 세그먼트를 사용
+        self.name = f"{name}_{zlib.crc32(repr(layout).encode()):08x}"
+        self.is_leader = False
+        self._keys = tuple(snapshot_arrays)
+        self._snapshot_type = type(template)
+
+        self.path = os.path.join(SHARED_DIR, self.name)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        with self._mutex():
+            if os.fstat(self._fd).st_size != offset:
+                os.ftruncate(self._fd, offset)
+            self._mmap = mmap.mmap(self._fd, offset)
+
+            buf = self._mmap
+            self._header = np.ndarray((_HEADER_SIZE,), np.float64, buf)
+            views = {(region, key): np.ndarray(shape, np.dtype(dtype), buf, offset)
+                     for region, key, shape, dtype, offset in layout}
+            self._slots = []
+            for region in ("slot0", "slot1"):
+                slot = type(template)()
+                for key in self._keys:
+                    setattr(slot, key, views[region, key])
+                self._slots.append(slot)
+
+            if self._alone():
+                # 처음 연결한 프로세스 (또는 이전 실행이 남긴 세그먼트): 장비 파라미터/시작 시각 기록
+                for key, array in fleet_arrays.items():
+                    views["fleet", key][...] = array
+                self._header[_START] = start_time
+                self._header[_SLOT] = 1
+                self.publish(template)
+            fcntl.lockf(self._fd, fcntl.LOCK_SH, 1, _ATTACH_BYTE)
+
+        # 모든 프로세스가 공유 메모리의 장비 파라미터를 보도록 교체
+        for key in fleet_arrays:
+            setattr(fleet, key, views["fleet", key])
+
+    @contextmanager
+    def _mutex(self):
+        """세그먼트 생성/초기화/해제 구간 잠금 (세그먼트 파일의 1번 바이트)"""
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, _MUTEX_BYTE)
+        try:
+            yield
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, _MUTEX_BYTE)
+
+    def _alone(self) -> bool:
+        """다른 프로세스가 연결 중이 아니면 True (연결 중인 프로세스는 연결 바이트에 공유 잠금을 잡고 있음)"""
+        try:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, _ATTACH_BYTE)
+        except OSError:
+            return False
+        fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, _ATTACH_BYTE)
+        return True
+
+    @property
+    def start_time(self) -> float:
+        return float(self._header[_START])
+
+    def lead(self) -> bool:
+        """리더 잠금 획득 시도 (이미 리더면 True, 다른 프로세스가 리더면 False)"""
+        if not self.is_leader:
+            try:
+                fcntl.lockf(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, _LEADER_BYTE)
+                self.is_leader = True
+            except OSError:
+                pass
+        return self.is_leader
+
+    def publish(self, snapshot):
+        """비어 있는 슬롯에 스냅샷을 기록한 뒤 현재 슬롯으로 전환 (기록하는 동안 슬롯의 틱은 -1)"""
+        slot = 1 - int(self._header[_SLOT])
+        target = self._slots[slot]
+        self._header[_SLOT_TICKS + 2 * slot] = -1
+        for key in self._keys:
+            getattr(target, key)[...] = getattr(snapshot, key)
+        self._header[_SLOT_TICKS + 2 * slot] = snapshot.tick
+        self._header[_SLOT_TICKS + 2 * slot + 1] = snapshot.time
+        self._header[_SLOT] = slot
+
+    def read(self):
+        """
+        현재 슬롯의 스냅샷 복사본. 복사하는 동안 리더가 같은 슬롯을 다시 쓰기 시작했으면(틱이 바뀜) 다시 읽는다.
+        리더가 슬롯을 쓰는 중이면(틱 < 0) CPU를 양보한 뒤 다시 확인한다.
+        (팔로워가 틱마다 한 번 호출하므로 복사 비용은 리더의 틱 계산과 같은 수준)
+        """
+        while True:
+            slot = int(self._header[_SLOT])
+            tick = self._header[_SLOT_TICKS + 2 * slot]
+            if tick < 0:
+                # 같은 코어에서 리더가 쓰기를 끝낼 수 있도록 양보
+                os.sched_yield()
+                continue
+            source = self._slots[slot]
+            snapshot = self._snapshot_type()
+            for key in self._keys:
+                setattr(snapshot, key, getattr(source, key).copy())
+            snapshot.time = float(self._header[_SLOT_TICKS + 2 * slot + 1])
+            if self._header[_SLOT_TICKS + 2 * slot] == tick:
+                snapshot.tick = int(tick)
+                return snapshot
+            os.sched_yield()
+
+    def close(self):
+        """연결 해제. 마지막 프로세스가 세그먼트를 삭제"""
+        with self._mutex():
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, _ATTACH_BYTE)
+            if self._alone():
+                os.unlink(self.path)
+        # 공유 메모리를 가리키는 뷰를 모두 버려야 매핑을 닫을 수 있음
+        self._header = None
+        self._slots = []
+        try:
+            self._mmap.close()
+        except BufferError:
+            # 장비 파라미터 뷰가 아직 참조 중이면 매핑은 프로세스 종료 시 해제됨
+            pass
+        os.close(self._fd)  # 리더 잠금도 함께 해제됨
+        self.is_leader = False
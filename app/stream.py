@@ -0,0 +1,91 @@
+import json
+from typing import Callable, Dict, List, Union
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+# 구독 가능한 최대 샘플링 주기(Hz)와 프레임 하나에 담는 최대 샘플 수
+MAX_STREAM_RATE = 20000.0
+MAX_FRAME_SAMPLES = 10000
+
+
+class StreamItem(BaseModel):
+    endpoint: str
+    params: Dict[str, Union[int, str]] = {}
+
+
+class StreamRequest(BaseModel):
+    """
+    /stream 구독 요청. 새 요청을 보내면 기존 구독을 대체한다.
+    - rate: 초당 샘플 수 (최대 MAX_STREAM_RATE)
+    - frame_ms: 프레임 전송 주기 (샘플은 프레임 단위로 묶어서 전송)
+    """
+    subscribe: List[StreamItem] = Field(min_length=1)
+    rate: float = Field(1000.0, gt=0, le=MAX_STREAM_RATE)
+    frame_ms: float = Field(20.0, ge=5, le=1000)
+
+
+class StreamSubscription:
+    """
+    하나의 WebSocket 연결의 구독 상태.
+    샘플 시각은 시작 시각 + k / rate로 정해지며, 프레임을 보낼 때마다 그 사이에 지난 샘플을 한 번에 만든다.
+    (프레임 전송이 늦어져도 샘플 시각이 밀리지 않고, 밀린 샘플은 다음 프레임에 담김)
+    """
+
+    def __init__(self, signals: List[Callable], rate: float, frame_ms: float, start: float):
+        self.signals = signals
+        self.rate = rate
+        self.frame_interval = frame_ms / 1000
+        self.start = start
+        self.sent = 0
+        self.seq = 0
+        self.skipped = 0
+
+    def next_frame(self, now: float):
+        """
+        now까지의 샘플을 담은 프레임(JSON 바이트). 보낼 샘플이 없으면 None.
+        프레임: {"seq": 번호, "t0": 첫 샘플 시각, "dt": 샘플 간격, "n": 샘플 수, "skipped": 누적 누락 샘플 수,
+                 "values": [구독 순서별 샘플 배열 또는 틱 단위 값]}
+        """
+        due = int((now - self.start) * self.rate) + 1
+        n = due - self.sent
+        if n <= 0:
+            return None
+        if n > MAX_FRAME_SAMPLES:
+            # 클라이언트가 못 따라오면 오래된 샘플은 버리고 최신 구간만 전송
+            self.skipped += n - MAX_FRAME_SAMPLES
+            self.sent = due - MAX_FRAME_SAMPLES
+            n = MAX_FRAME_SAMPLES
+
+        times = self.start + np.arange(self.sent, due) / self.rate
+        frame = {
+            "seq": self.seq,
+            "t0": round(float(times[0]), 6),
+            "dt": 1 / self.rate,
+            "n": n,
+            "skipped": self.skipped,
+            "values": [signal(times) for signal in self.signals],
+        }
+        self.sent = due
+        self.seq += 1
+        return json.dumps(frame, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def sampled_signal(sampler: Callable, params) -> Callable:
+    """샘플 시각마다 값을 계산하는 고속 신호 (소수점 4자리로 줄여 프레임 크기 축소)"""
+    def signal(times):
+        return np.round(sampler(params, times), 4).tolist()
+    return signal
+
+
+def held_signal(handler: Callable, params) -> Callable:
+    """틱 단위로 바뀌는 신호: 프레임마다 현재 값 하나만 전송"""
+    def signal(times):
+        return handler(params)
+    return signal
+
+
+def static_signal(value) -> Callable:
+    def signal(times):
+        return value
+    return signal
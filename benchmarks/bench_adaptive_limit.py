@@ -0,0 +1,143 @@
+"""
+과부하 게이트웨이에 대한 get_async_data 동시 요청 제한 방식 비교 벤치마크.
+
+모의 게이트웨이는 --gateway-workers개의 작업자가 요청당 --service-time초씩 처리하고,
+장비 하나는 한 번에 --machine-workers개까지만 처리한다 (CNC 통신 채널). 나머지 요청은 대기열에서 기다리며,
+클라이언트가 타임아웃으로 연결을 끊어도 이미 받은 요청은 끝까지 처리한다 (실제 게이트웨이처럼 헛일을 함).
+
+- unbounded: 제한 고정, 최대 동시 요청 수 = --requests (한 번의 get_async_data가 모두 동시에 전송, 이전 gather 동작)
+- static: 제한 고정, 게이트웨이 전체 --max-connections / 장비별 --machine-concurrency
+- adaptive: 같은 최대값 안에서 지연/오류에 따라 AIMD로 window 조정
+
+--duration초 동안 get_async_data(--requests개)를 반복 호출하고, 초당 성공 응답 수(goodput),
+오류율, 요청별 p50/p99 지연, 측정 종료 시 window를 보고한다.
+
+사용 예)
+    python benchmarks/bench_adaptive_limit.py --duration 5 --requests 200
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import time
+
+from common import percentile, start_server
+
+MACHINES = 10
+os.environ.setdefault("HISTORY_LOG_ENABLED", "0")
+
+from src.repositories.machine import MachineRepository
+from src.services.machine import MachineService
+
+ENDPOINT = "/machine/channel/axis/machinePosition"
+
+
+class OverloadedGateway:
+    """작업자 수가 정해진 게이트웨이 모델 (ASGI). 처리 중인 요청 수는 pending으로 확인"""
+
+    def __init__(self, workers: int, machine_workers: int, service_time: float):
+        self.workers = asyncio.Semaphore(workers)
+        self.machine_workers = {}
+        self.machine_capacity = machine_workers
+        self.service_time = service_time
+        self.pending = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        self.pending += 1
+        try:
+            query = dict(part.split("=", 1) for part in scope["query_string"].decode().split("&") if part)
+            machine = query.get("machine", "")
+            link = self.machine_workers.setdefault(machine, asyncio.Semaphore(self.machine_capacity))
+            async with link, self.workers:
+                await asyncio.sleep(self.service_time)
+            body = json.dumps({"status": 0, "value": [1.0]}).encode()
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": [(b"content-type", b"application/json")]})
+            await send({"type": "http.response.body", "body": body})
+        finally:
+            self.pending -= 1
+
+
+def build_requests(count: int):
+    combos = itertools.cycle(itertools.product(range(1, MACHINES + 1), (1, 2), (1, 2, 3, 4)))
+    params = [{"machine": m, "channel": c, "axis": a} for m, c, a in itertools.islice(combos, count)]
+    return [ENDPOINT] * count, params
+
+
+async def run(repo: MachineRepository, endpoints, params, duration: float):
+    service = MachineService(repo)
+    latencies = []
+    ok = errors = 0
+    get_data = repo.get_data
+
+    async def timed_get_data(endpoint, params=None):
+        started = time.perf_counter()
+        result = await get_data(endpoint, params)
+        latencies.append(time.perf_counter() - started)
+        return result
+
+    repo.get_data = timed_get_data
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    while time.perf_counter() < deadline:
+        for value in await service.get_async_data(endpoints, params):
+            if isinstance(value, dict) and value.get("__error__"):
+                errors += 1
+            else:
+                ok += 1
+    elapsed = time.perf_counter() - started
+    stats = repo.limiter_stats()
+    await service.aclose()
+    return ok / elapsed, errors / max(ok + errors, 1), latencies, stats
+
+
+async def drain(gateway: OverloadedGateway):
+    """이전 실행에서 남은 요청을 게이트웨이가 모두 처리할 때까지 대기"""
+    while gateway.pending:
+        await asyncio.sleep(0.05)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=5.0, help="방식별 측정 시간(초)")
+    parser.add_argument("--requests", type=int, default=200, help="get_async_data 한 번에 조회할 값 수")
+    parser.add_argument("--gateway-workers", type=int, default=4)
+    parser.add_argument("--machine-workers", type=int, default=1)
+    parser.add_argument("--service-time", type=float, default=0.02, help="게이트웨이의 요청당 처리 시간(초)")
+    parser.add_argument("--timeout", type=float, default=0.5, help="클라이언트 요청 타임아웃(초)")
+    parser.add_argument("--max-connections", type=int, default=20)
+    parser.add_argument("--machine-concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    gateway = OverloadedGateway(args.gateway_workers, args.machine_workers, args.service_time)
+    server = start_server(gateway)
+    endpoints, params = build_requests(args.requests)
+    capacity = args.gateway_workers / args.service_time
+    print(f"gateway capacity={capacity:,.0f} req/s timeout={args.timeout * 1000:.0f} ms")
+
+    modes = (
+        ("unbounded", dict(max_connections=args.requests, machine_concurrency=args.requests, adaptive=False)),
+        ("static", dict(max_connections=args.max_connections, machine_concurrency=args.machine_concurrency,
+                        adaptive=False)),
+        ("adaptive", dict(max_connections=args.max_connections, machine_concurrency=args.machine_concurrency,
+                          adaptive=True)),
+    )
+    try:
+        for label, options in modes:
+            await drain(gateway)
+            repo = MachineRepository(server.base_url, timeout=args.timeout, **options)
+            goodput, error_rate, latencies, stats = await run(repo, endpoints, params, args.duration)
+            machine_limits = [m["limit"] for m in stats["machines"].values()]
+            print(f"{label:>9}: goodput={goodput:,.0f}/s errors={error_rate:.1%} "
+                  f"p50={percentile(latencies, 50) * 1000:.0f} ms p99={percentile(latencies, 99) * 1000:.0f} ms "
+                  f"window(global)={stats['global']['limit']:.1f} "
+                  f"window(machine avg)={sum(machine_limits) / max(len(machine_limits), 1):.1f}")
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
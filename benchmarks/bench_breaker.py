@@ -0,0 +1,87 @@
+"""
+장비 하나가 응답하지 않을 때 회로 차단기 유무에 따른 get_data 지연 비교 벤치마크.
+
+모의 서버의 장애 주입(/admin/faults)으로 --offline 장비를 응답하지 않게 만든 뒤,
+--callers개의 호출자가 모든 장비의 상태 값을 반복 조회한다 (추적기 + 에이전트 도구 호출).
+정상 장비와 장애 장비 각각의 p50/p99 지연과 게이트웨이 요청 수를 보고하고,
+마지막으로 장애를 해제해 백그라운드 점검이 회로를 닫기까지 걸린 시간을 잰다.
+
+사용 예)
+    python benchmarks/bench_breaker.py --duration 5 --timeout 1
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+
+from common import CountingApp, percentile, start_server
+
+MACHINES = 5
+os.environ.setdefault("HISTORY_LOG_ENABLED", "0")
+os.environ.setdefault("MOCK_FLEET_SIZE", str(MACHINES))
+
+from main import app as mock_app
+from src.repositories.machine import MachineRepository
+
+ENDPOINT = "/machine/channel/axis/machinePosition"
+
+
+async def run(repo: MachineRepository, duration: float, callers: int, offline: int):
+    latencies = {"healthy": [], "offline": []}
+    deadline = time.perf_counter() + duration
+
+    async def caller(index: int):
+        axis = index % 3 + 1
+        while time.perf_counter() < deadline:
+            for machine in range(1, MACHINES + 1):
+                started = time.perf_counter()
+                await repo.get_data(ENDPOINT, {"machine": machine, "channel": 1, "axis": axis})
+                group = "offline" if machine == offline else "healthy"
+                latencies[group].append(time.perf_counter() - started)
+
+    await asyncio.gather(*(caller(i) for i in range(callers)))
+    return latencies
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=5.0, help="방식별 측정 시간(초)")
+    parser.add_argument("--callers", type=int, default=8)
+    parser.add_argument("--offline", type=int, default=3, help="응답하지 않게 만들 장비 번호")
+    parser.add_argument("--timeout", type=float, default=1.0, help="클라이언트 요청 타임아웃(초)")
+    args = parser.parse_args()
+
+    counter = CountingApp(mock_app)
+    server = start_server(counter)
+    admin = httpx.AsyncClient(base_url=server.base_url)
+    offline_fault = {"machines": {str(args.offline): {"drop_rate": 1.0, "drop_hang_s": 30}}}
+    try:
+        for label, threshold in (("no breaker", 0), ("breaker", 5)):
+            (await admin.put("/admin/faults", json=offline_fault)).raise_for_status()
+            repo = MachineRepository(server.base_url, timeout=args.timeout, breaker_threshold=threshold,
+                                     probe_interval=0.2, max_probe_interval=1.0)
+            before = counter.requests
+            latencies = await run(repo, args.duration, args.callers, args.offline)
+            requests = counter.requests - before
+            print(f"{label:>10}: gateway_requests={requests} "
+                  + " ".join(f"{group}: n={len(values)} p50={percentile(values, 50) * 1000:.0f} ms "
+                             f"p99={percentile(values, 99) * 1000:.0f} ms"
+                             for group, values in latencies.items()))
+
+            if threshold:
+                (await admin.delete("/admin/faults")).raise_for_status()
+                started = time.perf_counter()
+                while repo.breaker_stats()[str(args.offline)]["state"] == "open":
+                    await asyncio.sleep(0.01)
+                print(f"{'':>10}  recovered {time.perf_counter() - started:.2f} s after the fault was cleared")
+            await repo.aclose()
+    finally:
+        await admin.delete("/admin/faults")
+        await admin.aclose()
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
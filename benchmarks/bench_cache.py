@@ -0,0 +1,94 @@
+"""
+get_data 읽기 캐시 유무에 따른 게이트웨이 요청 수/소요 시간 비교 벤치마크.
+
+에이전트의 전형적인 조회(장비 구성 확인 후 축 위치/부하, 운전 상태를 읽음)를 임의의 장비에 대해
+--queries번 반복하고, 조회당 중앙값 소요 시간, 게이트웨이 요청 수, 캐시 등급별 적중률을 보고한다.
+
+사용 예)
+    python benchmarks/bench_cache.py --queries 300 --interval 0.01
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+
+from common import CountingApp, OPERATION_MANAGER_DIR, start_server
+
+MACHINES = 10
+os.environ.setdefault("HISTORY_LOG_ENABLED", "0")
+os.environ.setdefault("MOCK_FLEET_SIZE", str(MACHINES))
+
+from main import app as mock_app
+from src.repositories.machine import MachineRepository
+from src.utils.cache import build_cache_classes
+
+MANUAL_DIR = os.path.join(OPERATION_MANAGER_DIR, "src", "torus_manual")
+AXES = (1, 2, 3)
+
+
+def build_query(machine: int):
+    """에이전트 한 번의 조회: (엔드포인트, 파라미터) 목록"""
+    channel = {"machine": machine, "channel": 1}
+    reads = [
+        ("/machine/cncModel", {"machine": machine}),
+        ("/machine/numberOfChannels", {"machine": machine}),
+        ("/machine/channel/numberOfAxes", channel),
+        ("/machine/channel/currentProgram/programMode", channel),
+        ("/machine/channel/operateMode", channel),
+    ]
+    for axis in AXES:
+        params = {**channel, "axis": axis}
+        reads += [
+            ("/machine/channel/axis/axisName", params),
+            ("/machine/channel/axis/machinePosition", params),
+            ("/machine/channel/axis/axisLoad", params),
+        ]
+    return reads
+
+
+async def run(repo: MachineRepository, queries: int, interval: float, seed: int):
+    rng = random.Random(seed)
+    durations = []
+    for _ in range(queries):
+        reads = build_query(rng.randint(1, MACHINES))
+        started = time.perf_counter()
+        await asyncio.gather(*(repo.get_data(endpoint, params) for endpoint, params in reads))
+        durations.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+    return statistics.median(durations)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--interval", type=float, default=0.01, help="조회 사이 간격(초)")
+    parser.add_argument("--rtt", type=float, default=0.002, help="요청당 추가 지연(초)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    classes = build_cache_classes(os.path.join(MANUAL_DIR, "api_category.yaml"),
+                                  os.path.join(MANUAL_DIR, "uri_params.json"))
+    counter = CountingApp(mock_app, args.rtt)
+    server = start_server(counter)
+    try:
+        for label, cache_classes in (("off", None), ("on", classes)):
+            repo = MachineRepository(server.base_url, cache_classes=cache_classes)
+            before = counter.requests
+            median = await run(repo, args.queries, args.interval, args.seed)
+            requests = (counter.requests - before) / args.queries
+            await repo.aclose()
+            print(f"cache={label:>3}: median={median * 1000:.1f} ms gateway_requests/query={requests:.1f}")
+            stats = repo.cache_stats()
+            if stats:
+                print(f"           hit_ratio={stats['hit_ratio']:.2f} bypass={stats['bypass']} "
+                      f"entries={stats['entries']}")
+                for name, s in stats["by_class"].items():
+                    print(f"           {name:>6}: hits={s['hits']} misses={s['misses']} hit_ratio={s['hit_ratio']:.2f}")
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
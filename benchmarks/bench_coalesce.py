@@ -0,0 +1,71 @@
+"""
+get_data 요청 병합(singleflight) 유무에 따른 게이트웨이 요청 수/소요 시간 비교 벤치마크.
+
+--callers개의 호출자(MCP 도구 호출, 추적기 등)가 매 라운드 동시에 같은 장비들의 상태 값을 조회하는 상황을 재현하고,
+라운드당 중앙값 소요 시간, 게이트웨이가 받은 요청 수, 병합 통계를 보고한다.
+
+사용 예)
+    python benchmarks/bench_coalesce.py --callers 16 --rounds 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from common import CountingApp, start_server
+
+MACHINES = 10
+os.environ.setdefault("HISTORY_LOG_ENABLED", "0")
+os.environ.setdefault("MOCK_FLEET_SIZE", str(MACHINES))
+
+from main import app as mock_app
+from src.repositories.machine import MachineRepository
+
+ENDPOINTS = (
+    "/machine/channel/currentProgram/programMode",
+    "/machine/channel/activeTool/toolNumber",
+    "/machine/channel/operateMode",
+)
+
+
+async def run(repo: MachineRepository, callers: int, rounds: int):
+    durations = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            repo.get_data(endpoint, {"machine": machine, "channel": 1})
+            for _ in range(callers)
+            for machine in range(1, MACHINES + 1)
+            for endpoint in ENDPOINTS
+        ))
+        durations.append(time.perf_counter() - started)
+    return statistics.median(durations)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--callers", type=int, default=16, help="동시에 같은 값을 조회하는 호출자 수")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--rtt", type=float, default=0.002, help="요청당 추가 지연(초)")
+    args = parser.parse_args()
+
+    counter = CountingApp(mock_app, args.rtt)
+    server = start_server(counter)
+    try:
+        for label, coalesce in (("off", False), ("on", True)):
+            repo = MachineRepository(server.base_url, coalesce=coalesce)
+            before = counter.requests
+            median = await run(repo, args.callers, args.rounds)
+            requests = (counter.requests - before) / args.rounds
+            await repo.aclose()
+            stats = repo.coalesce_stats() if coalesce else {}
+            print(f"coalesce={label:>3}: median={median * 1000:.1f} ms gateway_requests/round={requests:.0f} "
+                  f"hits={stats.get('hits', 0)} merged={stats.get('merged', 0)} "
+                  f"hit_ratio={stats.get('hit_ratio', 0.0):.2f}")
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,185 @@
+"""
+장비 상태 변경 구독: 소비자별 개별 폴링 vs 이벤트 버스(MachineService.events) 비교 벤치마크.
+
+- polling: 이전 방식. 소비자마다 --interval초마다 전체 장비의 programMode/공구 번호/알람 번호를 직접 조회하고 변경을 감지
+- event-bus: 추적 스케줄러 하나가 같은 간격으로 조회해 가공 시작/종료, 공구 교체, 알람 발생/해제 이벤트를 발행하고
+  소비자는 구독만 함 (알람은 --alarm-debounce회 연속 관측되어야 인정)
+
+--machines대의 장비가 --cycle초 주기로 가공(공구 교체 포함)과 대기, 알람 발생/해제를 반복하고,
+알람 번호는 --flicker 확률로 한 번씩 잘못 읽힌다. 소비자 수(--consumers)별로 초당 게이트웨이 요청 수(신호별),
+소비자 하나가 받은 변경 수와 그중 알람 변경 수(잘못 읽힌 값으로 인한 오알림 포함), 이벤트 전달 지연(샘플 시각 -> 수신) p50/p99를 보고한다.
+
+사용 예)
+    python benchmarks/bench_event_bus.py --machines 10 --consumers 1 4 16 --duration 6
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from collections import Counter
+from datetime import datetime
+from urllib.parse import parse_qs
+
+from common import JobTracker, LogCollector, percentile, start_server
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--machines", type=int, default=10, help="시뮬레이션 장비 수")
+parser.add_argument("--consumers", type=int, nargs="+", default=[1, 4, 16], help="상태 변경을 받는 소비자 수")
+parser.add_argument("--duration", type=float, default=6.0, help="측정 시간(초)")
+parser.add_argument("--interval", type=float, default=0.5, help="조회 간격(초)")
+parser.add_argument("--cycle", type=float, default=6.0, help="장비 하나의 가공+대기 주기(초)")
+parser.add_argument("--flicker", type=float, default=0.02, help="알람 번호가 한 번 잘못 읽힐 확률")
+parser.add_argument("--alarm-debounce", type=int, default=2)
+parser.add_argument("--rtt", type=float, default=0.005, help="게이트웨이 요청 왕복 지연(초)")
+args = parser.parse_args()
+
+os.environ.setdefault("HISTORY_LOG_ENABLED", "0")
+
+from src.repositories.machine import MachineRepository
+from src.services.machine import MachineService
+
+SIGNALS = {
+    "/machine/channel/currentProgram/programMode": "mode",
+    "/machine/channel/currentProgram/currentFile/programNameWithPath": "program",
+    "/machine/channel/activeTool/toolNumber": "tool",
+    "/machine/channel/alarm/alarmNumber": "alarm",
+    "/machine/channel/alarm/alarmText": "alarm_text",
+}
+
+
+class FleetGateway:
+    """
+    장비마다 주기의 앞 60%는 가공(공구는 주기의 10%마다 교체), 나머지는 대기.
+    알람은 주기의 65~95% 구간에 발생 (ASGI)
+    """
+
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+        self.started = time.time()
+        self.requests = Counter()
+        self.rng = random.Random(1)
+
+    def value(self, signal: str, machine: int, now: float):
+        phase = ((now - self.started) / args.cycle + machine / args.machines) % 1.0
+        if signal == "mode":
+            return 3 if phase < 0.6 else 1
+        if signal == "program":
+            return f"//CNC_MEM/USER/OM/bench/O{1000 + machine}.nc"
+        if signal == "tool":
+            return 1 + int(phase / 0.1) if phase < 0.6 else 0
+        if signal == "alarm":
+            if self.rng.random() < args.flicker:
+                return "9999"
+            return "2001" if 0.65 <= phase < 0.95 else "0"
+        return "SPINDLE OVERHEAT"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        signal = SIGNALS[scope["path"]]
+        self.requests[signal] += 1
+        await asyncio.sleep(self.rtt / 2)
+        machine = int(parse_qs(scope["query_string"].decode())["machine"][0])
+        value = self.value(signal, machine, time.time())
+        await asyncio.sleep(self.rtt / 2)
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": json.dumps({"status": 0, "value": [value]}).encode()})
+
+
+class Consumer:
+    """받은 상태 변경 수(종류별)와 전달 지연을 기록"""
+
+    def __init__(self):
+        self.changes = Counter()
+        self.latencies = []
+
+    def receive(self, kind: str, at: datetime):
+        self.changes[kind] += 1
+        self.latencies.append(time.time() - at.timestamp())
+
+
+async def run_polling(repo: MachineRepository, consumers: list):
+    """소비자마다(각자의 리포지토리로, 서로 요청을 병합하지 않음) 장비 상태를 직접 조회하고 이전 값과 비교"""
+
+    async def poll(repo: MachineRepository, consumer: Consumer, machine_id: int, last: dict):
+        params = {"machine": machine_id, "channel": 1, "alarm": 1}
+        started = time.time()
+        mode, tool, alarm = await asyncio.gather(
+            repo.get_machine_status(machine_id),
+            repo.get_active_tool_number(machine_id),
+            repo.get_data("/machine/channel/alarm/alarmNumber", params),
+        )
+        at = datetime.fromtimestamp((started + time.time()) / 2)
+        if mode == 3 and last.get("mode") != 3:
+            await repo.get_current_program_name(machine_id)
+        for kind, value in (("program", mode == 3), ("tool", tool), ("alarm", int(alarm[0]))):
+            if kind in last and last[kind] != value:
+                consumer.receive(kind, at)
+            last[kind] = value
+        last["mode"] = mode
+
+    async def consume(repo: MachineRepository, consumer: Consumer):
+        last = {machine_id: {} for machine_id in range(1, args.machines + 1)}
+        while True:
+            started = time.perf_counter()
+            await asyncio.gather(*(poll(repo, consumer, m, last[m]) for m in last))
+            await asyncio.sleep(max(0.0, args.interval - (time.perf_counter() - started)))
+
+    repos = [MachineRepository(repo.base_url) for _ in consumers]
+    tasks = [asyncio.create_task(consume(r, consumer)) for r, consumer in zip(repos, consumers)]
+    await asyncio.sleep(args.duration)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    for r in repos:
+        await r.aclose()
+
+
+async def run_event_bus(repo: MachineRepository, consumers: list):
+    """추적 스케줄러 하나가 조회하고 소비자는 이벤트를 구독"""
+    service = MachineService(repo, log_repo=LogCollector(), job_tracker=JobTracker(),
+                             tracker_options={"busy_interval": args.interval, "idle_interval": args.interval,
+                                              "max_idle_interval": args.interval, "concurrency": args.machines},
+                             event_options={"alarm_debounce": args.alarm_debounce})
+    kinds = {"program_started": "program", "program_finished": "program", "tool_changed": "tool",
+             "alarm_raised": "alarm", "alarm_cleared": "alarm"}
+    for consumer in consumers:
+        service.events.subscribe(lambda event, consumer=consumer: consumer.receive(kinds[event.type], event.at))
+    for machine_id in range(1, args.machines + 1):
+        service._tracking_states[machine_id] = service._new_tracking_state()
+        service.tracker.add(machine_id)
+    service.tracker.start()
+    await asyncio.sleep(args.duration)
+    await service.tracker.stop()
+    await service.events.drain()
+    await service.events.close()
+
+
+async def main():
+    gateway = FleetGateway(args.rtt)
+    server = start_server(gateway)
+    try:
+        for count in args.consumers:
+            for label, run in (("polling", run_polling), ("event-bus", run_event_bus)):
+                repo = MachineRepository(server.base_url)
+                consumers = [Consumer() for _ in range(count)]
+                gateway.requests.clear()
+                await run(repo, consumers)
+                await repo.aclose()
+                rps = {signal: n / args.duration for signal, n in gateway.requests.items()}
+                latencies = [latency for consumer in consumers for latency in consumer.latencies]
+                changes = consumers[0].changes
+                print(f"consumers={count:>2} {label:>9}: requests/s total={sum(rps.values()):.0f} "
+                      f"({' '.join(f'{signal}={value:.0f}' for signal, value in sorted(rps.items()))}) "
+                      f"changes/consumer={sum(changes.values())} (alarm={changes['alarm']}) "
+                      f"latency p50={percentile(latencies, 50) * 1000:.0f} ms "
+                      f"p99={percentile(latencies, 99) * 1000:.0f} ms")
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
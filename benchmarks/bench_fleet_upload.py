@@ -0,0 +1,87 @@
+"""
+같은 NC 파일을 여러 장비로 배포: 장비마다 upload_torus_file 반복 vs upload_torus_file_to_machines 비교 벤치마크.
+
+- per-machine: 장비마다 upload_torus_file을 차례로 호출 (파일을 장비 수만큼 다시 읽고 검증)
+- fleet cN: 파일을 한 번 읽고 검증한 뒤 최대 N대씩 동시에 전송
+
+모의 서버의 NC 파일 API에 요청마다 --rtt 지연을 주고, GridFS 대신 파일 열기/청크 읽기에 --db-rtt씩 걸리는 파일을 사용한다.
+--failing 장비는 장애 주입(/admin/faults)으로 모든 요청이 NC 통신 실패를 반환하게 만들어,
+한 장비의 실패가 나머지 장비의 업로드를 막지 않는지 확인한다.
+방식별 전체 소요 시간, 성공/실패 장비 수, 파일 열기/닫기 횟수와 읽은 바이트 수를 보고한다.
+
+사용 예)
+    python benchmarks/bench_fleet_upload.py --machines 12 --size 1024 --concurrency 1 4 8
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+
+from common import CountingApp, DelayedFileRepository, start_server
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--machines", type=int, default=12, help="시뮬레이션 장비 수 (모두에게 배포)")
+parser.add_argument("--size", type=int, default=1024, help="파일 크기(KiB)")
+parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8], help="fleet 방식의 동시 업로드 장비 수")
+parser.add_argument("--rtt", type=float, default=0.01, help="게이트웨이 요청당 추가 지연(초)")
+parser.add_argument("--db-rtt", type=float, default=0.002, help="GridFS 파일 열기/청크 읽기 지연(초)")
+parser.add_argument("--failing", type=int, default=3, help="모든 요청이 실패하도록 만들 장비 번호 (0이면 없음)")
+args = parser.parse_args()
+
+os.environ.setdefault("HISTORY_LOG_ENABLED", "0")
+os.environ["MOCK_FLEET_SIZE"] = str(args.machines)
+
+from main import app as mock_app
+from src.repositories.machine import MachineRepository
+from src.services.machine import MachineService
+from src.utils.exceptions import CustomException
+
+
+async def per_machine(service: MachineService, project: str, machine_ids):
+    succeeded = 0
+    for machine_id in machine_ids:
+        try:
+            await service.upload_torus_file(project, machine_id, "bench")
+            succeeded += 1
+        except CustomException:
+            pass
+    return succeeded
+
+
+async def main():
+    counter = CountingApp(mock_app, args.rtt)
+    server = start_server(counter)
+    admin = httpx.AsyncClient(base_url=server.base_url)
+    if args.failing:
+        fault = {"machines": {str(args.failing): {"error_rate": 1.0, "error_codes": [565575680]}}}
+        (await admin.put("/admin/faults", json=fault)).raise_for_status()
+    machine_ids = list(range(1, args.machines + 1))
+    modes = [("per-machine", None)] + [(f"fleet c{c}", c) for c in args.concurrency]
+    try:
+        for label, concurrency in modes:
+            file_repo = DelayedFileRepository(args.size * 1024, args.db_rtt)
+            service = MachineService(MachineRepository(server.base_url, retries=0), file_repo=file_repo)
+            await service.registry.refresh()
+            project = f"bench-{label.replace(' ', '-')}"
+            started = time.perf_counter()
+            if concurrency is None:
+                succeeded = await per_machine(service, project, machine_ids)
+            else:
+                result = await service.upload_torus_file_to_machines(project, machine_ids, "bench",
+                                                                     concurrency=concurrency)
+                succeeded = result.succeeded
+            elapsed = time.perf_counter() - started
+            print(f"{label:>11}: machines={args.machines} time={elapsed * 1000:,.0f} ms "
+                  f"succeeded={succeeded} failed={args.machines - succeeded} "
+                  f"file_opens={file_repo.opens} closes={file_repo.closes} read={file_repo.bytes_read / 2**20:.1f} MiB")
+            await service.aclose()
+    finally:
+        await admin.delete("/admin/faults")
+        await admin.aclose()
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,119 @@
+"""
+mock_data.json 핫 리로드 벤치마크.
+
+임시 복사본을 감시 대상으로 지정한 뒤, 일정한 요청 부하를 주면서
+- 리로드 없이 측정한 요청 지연
+- --period 초마다 파일을 다시 써서 리로드가 반복되는 동안의 요청 지연
+- 리로드 1회 소요 시간(파싱+검증+컴파일+교체)
+을 비교한다. 요청 실패(404/400/5xx)가 하나라도 있으면 반쪽짜리 테이블이 노출된 것이다.
+
+사용 예)
+    python benchmarks/bench_hot_reload.py --duration 5 --period 0.2
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path[:0] = [os.path.join(ROOT, "app"), os.path.dirname(os.path.abspath(__file__))]
+
+from bench_mock_rps import ASGIClient, MIXES
+from common import percentile
+
+
+async def _load(client: ASGIClient, urls, duration: float, concurrency: int):
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(offset):
+        nonlocal errors
+        i = offset
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            status = await client.get(urls[i % len(urls)])
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                errors += 1
+            i += 1
+            await asyncio.sleep(0)  # 실제 소켓 I/O처럼 이벤트 루프에 양보 (감시/리로드 태스크 실행)
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return latencies, errors
+
+
+async def _rewrite_forever(path: str, period: float):
+    """값 하나를 바꿔가며 파일을 계속 다시 쓴다 (리로드 유발)"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    version = 0
+    while True:
+        await asyncio.sleep(period)
+        version += 1
+        data["/machine/cncModel"]["value"] = f"840D sl rev{version}"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+
+
+def _report(label, latencies, errors):
+    print(f"{label:>14}: requests={len(latencies)} errors={errors} "
+          f"p50={percentile(latencies, 50) * 1000:.3f} ms p99={percentile(latencies, 99) * 1000:.3f} ms "
+          f"max={max(latencies) * 1000:.3f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--period", type=float, default=0.2, help="파일 재작성 주기(초)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    path = os.path.join(workdir, "mock_data.json")
+    shutil.copy(os.path.join(ROOT, "app", "mock_data.json"), path)
+    os.environ["MOCK_DATA_PATH"] = path
+    os.environ["MOCK_RELOAD_INTERVAL"] = str(min(args.period / 4, 0.05))
+
+    import main as mock_main
+
+    try:
+        async with mock_main.app.router.lifespan_context(mock_main.app):
+            client = ASGIClient(mock_main.app)
+            urls = MIXES["polling"]
+
+            latencies, errors = await _load(client, urls, args.duration, args.concurrency)
+            _report("steady", latencies, errors)
+
+            reload_ms = []
+            writer = asyncio.create_task(_rewrite_forever(path, args.period))
+            sampler_stop = asyncio.Event()
+
+            async def sample_reloads():
+                seen = mock_main.RELOAD_STATS["reloads"]
+                while not sampler_stop.is_set():
+                    await asyncio.sleep(0.005)
+                    if mock_main.RELOAD_STATS["reloads"] != seen:
+                        seen = mock_main.RELOAD_STATS["reloads"]
+                        reload_ms.append(mock_main.RELOAD_STATS["last_reload_ms"])
+
+            sampler = asyncio.create_task(sample_reloads())
+            latencies, errors = await _load(client, urls, args.duration, args.concurrency)
+            writer.cancel()
+            sampler_stop.set()
+            await sampler
+            _report("during reload", latencies, errors)
+            print(f"{'reloads':>14}: count={mock_main.RELOAD_STATS['reloads']} "
+                  f"failures={mock_main.RELOAD_STATS['failures']} "
+                  f"median={statistics.median(reload_ms):.2f} ms max={max(reload_ms):.2f} ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
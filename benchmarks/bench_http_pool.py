@@ -0,0 +1,82 @@
+"""
+MachineRepository 연결 풀 유무에 따른 get_async_data 소요 시간 비교 벤치마크.
+
+- pooled: 리포지토리 수명 동안 하나의 httpx 클라이언트(keep-alive 연결 재사용)
+- per-call: 호출마다 새 httpx 클라이언트(매번 TCP 연결 생성, 이전 동작)
+
+한 번의 get_async_data 호출로 --requests개의 축 위치를 동시에 조회하고,
+호출당 중앙값 소요 시간, 클라이언트 쪽 CPU 시간(서버 스레드 제외), 서버가 본 TCP 연결 수를 보고한다.
+
+사용 예)
+    python benchmarks/bench_http_pool.py --requests 400 --rounds 5
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import statistics
+import time
+
+from common import CountingApp, start_server
+
+MACHINES = 10
+os.environ.setdefault("HISTORY_LOG_ENABLED", "0")
+os.environ.setdefault("MOCK_FLEET_SIZE", str(MACHINES))
+
+from main import app as mock_app
+from src.repositories.machine import MachineRepository
+from src.services.machine import MachineService
+
+ENDPOINT = "/machine/channel/axis/machinePosition"
+
+
+def build_requests(count: int):
+    combos = itertools.cycle(itertools.product(range(1, MACHINES + 1), (1, 2), (1, 2, 3, 4)))
+    params = [{"machine": m, "channel": c, "axis": a} for m, c, a in itertools.islice(combos, count)]
+    return [ENDPOINT] * count, params
+
+
+async def measure(service: MachineService, counter: CountingApp, endpoints, params, rounds: int):
+    durations = []
+    connections = 0
+    cpu_started = time.thread_time()
+    for _ in range(rounds):
+        before = counter.connections
+        started = time.perf_counter()
+        results = await service.get_async_data(endpoints, params)
+        durations.append(time.perf_counter() - started)
+        connections += counter.connections - before
+    cpu = (time.thread_time() - cpu_started) / rounds
+    errors = sum(1 for value in results if isinstance(value, dict) and value.get("__error__"))
+    return statistics.median(durations), cpu, connections / rounds, errors
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400, help="get_async_data 한 번에 조회할 값 수")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--rtt", type=float, default=0.002, help="요청당 추가 지연(초)")
+    parser.add_argument("--connect-rtt", type=float, default=0.004,
+                        help="새 연결의 첫 요청에 더할 지연(초, TCP+TLS 연결 수립 비용)")
+    parser.add_argument("--max-connections", type=int, default=20)
+    args = parser.parse_args()
+
+    counter = CountingApp(mock_app, args.rtt, args.connect_rtt)
+    server = start_server(counter)
+    endpoints, params = build_requests(args.requests)
+
+    try:
+        for label, pooled in (("per-call", False), ("pooled", True)):
+            repo = MachineRepository(server.base_url, pooled=pooled, max_connections=args.max_connections)
+            service = MachineService(repo)
+            await service.get_async_data(endpoints[:1], params[:1])  # 워밍업
+            median, cpu, connections, errors = await measure(service, counter, endpoints, params, args.rounds)
+            await service.aclose()
+            print(f"{label:>8}: requests={args.requests} median={median * 1000:.1f} ms "
+                  f"client_cpu/call={cpu * 1000:.1f} ms tcp_connections/call={connections:.0f} errors={errors}")
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
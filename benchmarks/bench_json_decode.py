@@ -0,0 +1,103 @@
+"""
+get_data 응답 디코딩과 에러 객체 크기 비교 벤치마크.
+
+1. 응답당 CPU 시간: 모의 서버에서 받은 응답 본문(단일 값, 와일드카드 배열, TORUS 에러)을
+   표준 json(response.json())과 orjson(fast_json)으로 디코딩 + _unwrap_response 하는 데 걸린 CPU 시간
+2. MCP 도구로 돌려주는 결과 크기: 장애 주입으로 --error-rate 비율의 요청이 TORUS 에러를 반환할 때,
+   get_async_data 결과를 JSON으로 직렬화한 바이트 수 (이전 에러 객체: full_api_response 포함 vs 고정 형식 에러 객체)
+
+사용 예)
+    python benchmarks/bench_json_decode.py --machines 50 --repeat 2000 --error-rate 0.3
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import httpx
+
+from common import start_server
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--machines", type=int, default=50, help="시뮬레이션 장비 수 (와일드카드 응답 크기)")
+parser.add_argument("--repeat", type=int, default=2000, help="응답 종류별 디코딩 반복 횟수")
+parser.add_argument("--requests", type=int, default=100, help="get_async_data 한 번에 조회할 요청 수")
+parser.add_argument("--error-rate", type=float, default=0.3, help="TORUS 에러를 반환할 요청 비율")
+args = parser.parse_args()
+
+os.environ.setdefault("HISTORY_LOG_ENABLED", "0")
+os.environ["MOCK_FLEET_SIZE"] = str(args.machines)
+
+from main import app as mock_app
+from src.repositories.machine import MachineRepository
+
+ERROR_CODE = 565837824  # filter 오류 (재시도/회로 차단 대상이 아닌 코드)
+SAMPLES = {
+    "scalar": ("/machine/channel/activeTool/toolName", {"machine": 1, "channel": 1}),
+    "wildcard": ("/machine/channel/axis/machinePosition", {"machine": "*", "channel": 1, "axis": "*"}),
+}
+
+
+def legacy_error(record: dict) -> dict:
+    """이전 형식의 TORUS 에러 객체 (원본 응답 full_api_response 포함, retry_after 없음)"""
+    legacy = {key: value for key, value in record.items() if key != "retry_after"}
+    legacy["full_api_response"] = {"status": record["status"], "message": record["message"]}
+    return legacy
+
+
+def decode_cpu(repo: MachineRepository, endpoint: str, params: dict, body: bytes, repeat: int) -> float:
+    """응답 하나를 디코딩 + unwrap하는 데 걸린 평균 CPU 시간(초)"""
+    headers = {"content-type": "application/json"}
+    responses = [httpx.Response(200, content=body, headers=headers) for _ in range(repeat)]
+    started = time.process_time()
+    for response in responses:
+        repo._unwrap_response(endpoint, params, repo._decode(response))
+    return (time.process_time() - started) / repeat
+
+
+async def main():
+    server = start_server(mock_app)
+    client = httpx.AsyncClient(base_url=server.base_url)
+    repos = {"json": MachineRepository(server.base_url, fast_json=False),
+             "orjson": MachineRepository(server.base_url, fast_json=True)}
+    try:
+        # 1. 응답 종류별 디코딩 CPU 시간
+        bodies = {}
+        for label, (endpoint, params) in SAMPLES.items():
+            bodies[label] = (endpoint, params, (await client.get(endpoint, params=params)).content)
+        fault = {"default": {"error_rate": 1.0, "error_codes": [ERROR_CODE]}}
+        (await client.put("/admin/faults", json=fault)).raise_for_status()
+        endpoint, params = SAMPLES["scalar"]
+        bodies["error"] = (endpoint, params, (await client.get(endpoint, params=params)).content)
+        (await client.delete("/admin/faults")).raise_for_status()
+
+        for label, (endpoint, params, body) in bodies.items():
+            cpu = {name: decode_cpu(repo, endpoint, params, body, args.repeat) for name, repo in repos.items()}
+            print(f"{label:>8}: body={len(body):,} B  json={cpu['json'] * 1e6:.1f} us  "
+                  f"orjson={cpu['orjson'] * 1e6:.1f} us  ({cpu['json'] / cpu['orjson']:.1f}x)")
+
+        # 2. get_async_data 결과 크기 (에러 객체 형식별)
+        fault = {"default": {"error_rate": args.error_rate, "error_codes": [ERROR_CODE]}}
+        (await client.put("/admin/faults", json=fault)).raise_for_status()
+        repo = repos["orjson"]
+        endpoint, _ = SAMPLES["scalar"]
+        results = await asyncio.gather(*(
+            repo.get_data(endpoint, {"machine": i % args.machines + 1, "channel": 1}) for i in range(args.requests)
+        ))
+        errors = [result for result in results if isinstance(result, dict) and result.get("__error__")]
+        legacy = [legacy_error(result) if result in errors else result for result in results]
+        sizes = {name: len(json.dumps(value, ensure_ascii=False).encode()) for name, value in
+                 (("legacy", legacy), ("compact", results))}
+        print(f"get_async_data x{args.requests} ({len(errors)} errors): legacy={sizes['legacy']:,} B "
+              f"compact={sizes['compact']:,} B ({1 - sizes['compact'] / sizes['legacy']:.0%} smaller)")
+    finally:
+        await client.delete("/admin/faults")
+        await client.aclose()
+        for repo in repos.values():
+            await repo.aclose()
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
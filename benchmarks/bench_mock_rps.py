@@ -0,0 +1,119 @@
+"""
+모의 서버(app/main.py)의 GET 처리량(RPS)을 측정하는 간단한 벤치마크.
+
+- 기본: ASGI 앱을 직접 호출 (HTTP 클라이언트/네트워크 오버헤드 제외, 서버 처리 비용 위주)
+- --url 지정 시: 실행 중인 uvicorn 서버로 HTTP 요청
+
+사용 예)
+    python benchmarks/bench_mock_rps.py --requests 20000 --concurrency 32
+    python benchmarks/bench_mock_rps.py --url http://localhost:8000 --mix dynamic
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+
+# 폴링 부하를 흉내내는 요청 묶음 (정적 위주)
+STATIC_URLS = [
+    "/machine/cncModel?machine=1",
+    "/machine/numberOfChannels?machine=1",
+    "/machine/ncLinkState?machine=1",
+    "/machine/channel/currentProgram/programMode?machine=1&channel=1",
+    "/machine/channel/axis/axisName?machine=1&channel=1&axis=1",
+    "/machine/list",
+]
+DYNAMIC_URLS = [
+    "/machine/channel/axis/machinePosition?machine=1&channel=1&axis=1",
+    "/machine/channel/spindle/spindleLoad?machine=1&channel=1&spindle=1",
+    "/machine/channel/workStatus/workCounter/currentWorkCounter?machine=1&channel=1&workStatus=1",
+]
+MIXES = {
+    "static": STATIC_URLS,
+    "dynamic": DYNAMIC_URLS,
+    "polling": STATIC_URLS * 3 + DYNAMIC_URLS,
+}
+
+
+class ASGIClient:
+    """httpx 없이 ASGI 앱을 직접 호출하는 최소 클라이언트 (status_code만 돌려줌)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def get(self, url: str) -> int:
+        path, _, query = url.partition("?")
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+            "root_path": "", "query_string": query.encode(), "headers": [],
+            "client": ("127.0.0.1", 50000), "server": ("mock", 80),
+        }
+        status = 0
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        await self.app(scope, receive, send)
+        return status
+
+
+async def _run(get, urls, total: int, concurrency: int):
+    counter = iter(range(total))
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            if await get(urls[i % len(urls)]) != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return total / elapsed, errors
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="실행 중인 서버 주소 (미지정 시 인프로세스)")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--mix", choices=sorted(MIXES), default="polling")
+    parser.add_argument("--machines", type=int, default=1, help="요청을 분산할 장비 수 (machine=1..N)")
+    args = parser.parse_args()
+    urls = [
+        url.replace("machine=1", f"machine={m}")
+        for m in range(1, args.machines + 1)
+        for url in MIXES[args.mix]
+    ]
+
+    if args.url:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=args.url, limits=limits) as client:
+            async def get(url):
+                return (await client.get(url)).status_code
+            rps, errors = await _run(get, urls, args.requests, args.concurrency)
+    else:
+        sys.path.insert(0, APP_DIR)
+        from main import app
+        async with app.router.lifespan_context(app):
+            client = ASGIClient(app)
+            await _run(client.get, urls, 1000, args.concurrency)  # 워밍업
+            rps, errors = await _run(client.get, urls, args.requests, args.concurrency)
+
+    print(f"mix={args.mix} requests={args.requests} concurrency={args.concurrency} "
+          f"rps={rps:,.0f} errors={errors}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,143 @@
+"""
+NC 파일 업로드: 전체 파일 버퍼링 vs 청크 스트리밍의 클라이언트 최대 메모리 비교 벤치마크.
+
+- buffered: GridFS 파일 전체를 BytesIO로 읽고, 전체를 디코드해 O번호를 찾은 뒤 put_nc_file(bytes)로 전송 (이전 방식)
+- streaming: 첫 청크만 디코드해 O번호를 확인하고, 청크를 그대로 put_nc_file_stream 요청 본문으로 전송
+
+GridFS 대신 같은 크기(255 KiB)의 청크를 순서대로 만들어 내는 파일을 사용하고,
+업로드 엔드포인트는 multipart 본문을 스트리밍으로 받아 파일 부분의 크기와 SHA-256만 계산한다.
+파일 크기별로 tracemalloc 최대 메모리와 소요 시간, 수신 내용 일치 여부를 보고한다.
+
+사용 예)
+    python benchmarks/bench_nc_upload.py --sizes 16 64 256
+"""
+import argparse
+import asyncio
+import hashlib
+import io
+import re
+import time
+import tracemalloc
+
+from common import start_server
+
+from src.repositories.machine import MachineRepository
+
+CHUNK_SIZE = 255 * 1024
+LINE = b"N0010 G01 X123.456 Y-78.901 Z-1.000 F1200\n"
+
+
+class NcFile:
+    """GridFS 파일처럼 청크를 순서대로 반환하는 O1234 프로그램"""
+
+    def __init__(self, size: int):
+        self.length = size
+        self.filename = "O1234.nc"
+
+    async def chunks(self):
+        header = b"%\nO1234 (BENCH)\n"
+        body = LINE * (CHUNK_SIZE // len(LINE) + 1)
+        sent = 0
+        while sent < self.length:
+            chunk = (header + body)[:CHUNK_SIZE] if sent == 0 else body[:CHUNK_SIZE]
+            chunk = chunk[:self.length - sent]
+            sent += len(chunk)
+            yield chunk
+            await asyncio.sleep(0)
+
+    async def sha256(self) -> str:
+        digest = hashlib.sha256()
+        async for chunk in self.chunks():
+            digest.update(chunk)
+        return digest.hexdigest()
+
+
+class UploadSink:
+    """PUT /file/machine/ncpath: multipart 본문을 저장하지 않고 파일 부분의 크기/SHA-256만 계산 (ASGI)"""
+
+    def __init__(self):
+        self.last = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        headers = dict(scope["headers"])
+        boundary = headers[b"content-type"].split(b"boundary=")[1]
+        tail_length = len(b"\r\n--" + boundary + b"--\r\n")
+        digest = hashlib.sha256()
+        pending = b""
+        header_done = False
+        size = 0
+        more = True
+        while more:
+            message = await receive()
+            pending += message.get("body", b"")
+            more = message.get("more_body", False)
+            if not header_done:
+                end = pending.find(b"\r\n\r\n")
+                if end < 0:
+                    continue
+                pending = pending[end + 4:]
+                header_done = True
+            # 마지막 구분자가 될 수 있는 끝부분은 남겨 둠
+            if len(pending) > tail_length:
+                data, pending = pending[:-tail_length], pending[-tail_length:]
+                digest.update(data)
+                size += len(data)
+        self.last = (size, digest.hexdigest())
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": b'{"status": 0}'})
+
+
+async def upload_buffered(repo: MachineRepository, nc: NcFile):
+    buffer = io.BytesIO()
+    async for chunk in nc.chunks():
+        buffer.write(chunk)
+    buffer.seek(0)
+    data = buffer.read()
+    assert re.search(r"\bO(\d+)", data.decode(errors="ignore"))
+    await repo.put_nc_file(1, "//CNC_MEM/USER/", nc.filename, data)
+
+
+async def upload_streaming(repo: MachineRepository, nc: NcFile):
+    chunks = nc.chunks()
+    header = await anext(chunks, b"")
+    assert re.search(r"\bO(\d+)", header.decode(errors="ignore"))
+
+    async def body():
+        yield header
+        async for chunk in chunks:
+            yield chunk
+
+    await repo.put_nc_file_stream(1, "//CNC_MEM/USER/", nc.filename, body(), size=nc.length)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16, 64, 256], help="파일 크기(MiB)")
+    args = parser.parse_args()
+
+    sink = UploadSink()
+    server = start_server(sink)
+    repo = MachineRepository(server.base_url, timeout=60.0)
+    try:
+        for size_mb in args.sizes:
+            nc = NcFile(size_mb * 1024 * 1024)
+            expected = (nc.length, await nc.sha256())
+            for label, upload in (("buffered", upload_buffered), ("streaming", upload_streaming)):
+                tracemalloc.start()
+                started = time.perf_counter()
+                await upload(repo, nc)
+                elapsed = time.perf_counter() - started
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(f"{size_mb:>4} MiB {label:>9}: peak={peak / 2**20:,.1f} MiB time={elapsed:.2f} s "
+                      f"received_ok={sink.last == expected}")
+    finally:
+        await repo.aclose()
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+"""
+NC 파일 업로드(upload_torus_file) 전체 소요 시간: 순차 호출 vs 동시 진행 + 원격 경로 캐시 비교 벤치마크.
+
+- sequential: 이전 방식. 파일 열기 -> 루트 경로 -> OM 폴더 확인 -> 장비 정보 -> 프로젝트 폴더 확인 ->
+  파일 목록 조회(+삭제) -> 업로드를 하나씩 차례로 호출하고 경로 상태를 캐시하지 않음
+- pipelined: 파일 열기 / 장비 정보 / 폴더 준비를 동시에 진행 (캐시 없음, nc_ttl=0)
+- pipelined+cache: 동시 진행 + 루트 경로·폴더 존재·파일 목록 캐시 (MachineService.upload_torus_file 기본 동작)
+
+모의 서버의 NC 파일 API(/file/machine/ncpath/*)에 요청마다 --rtt 지연을 주고,
+GridFS 대신 파일 열기/첫 청크 읽기에 --db-rtt씩 걸리는 파일을 사용한다.
+방식마다 같은 프로젝트 폴더에 같은 파일을 --uploads번 올려 (두 번째부터는 기존 파일 삭제 후 업로드)
+첫 업로드와 이후 업로드의 p50 소요 시간, 업로드당 게이트웨이 요청 수를 보고한다.
+
+사용 예)
+    python benchmarks/bench_nc_upload_pipeline.py --uploads 20 --rtt 0.01
+"""
+import argparse
+import asyncio
+import os
+import re
+import time
+
+from common import CountingApp, DelayedFileRepository, percentile, start_server
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--uploads", type=int, default=20, help="방식별 업로드 횟수")
+parser.add_argument("--rtt", type=float, default=0.01, help="게이트웨이 요청당 추가 지연(초)")
+parser.add_argument("--db-rtt", type=float, default=0.002, help="GridFS 파일 열기/청크 읽기 지연(초)")
+parser.add_argument("--size", type=int, default=64, help="파일 크기(KiB)")
+args = parser.parse_args()
+
+os.environ.setdefault("HISTORY_LOG_ENABLED", "0")
+os.environ.setdefault("MOCK_FLEET_SIZE", "1")
+
+from main import app as mock_app
+from src.repositories.machine import MachineRepository
+from src.services.machine import MachineService
+
+MACHINE = 1
+
+
+async def upload_sequential(service: MachineService, project_id: str, file_id: str):
+    """이전 upload_torus_file과 같은 순서의 순차 호출"""
+    repo = service.machine_repo
+    stream = await service.file_repo.open_file_stream(file_id)
+    chunks = stream.chunks()
+    header = await anext(chunks, b"")
+    ncpath_root = await repo.get_nc_root_path(MACHINE)
+    folder_path = f"{ncpath_root}OM/"
+    await repo.ensure_folder_exists(MACHINE, folder_path)
+    folder_path += f"{project_id}/"
+    machine = await service.registry.get(MACHINE)
+    if machine.vendorCode.lower() == "fanuc":
+        assert re.search(r"\bO(\d+)", header.decode(errors="ignore"))
+
+    async def body():
+        yield header
+        async for chunk in chunks:
+            yield chunk
+
+    await repo.ensure_folder_exists(MACHINE, folder_path)
+    await repo.remove_file_if_exists(MACHINE, folder_path, stream.filename)
+    await repo.put_nc_file_stream(MACHINE, folder_path, stream.filename, body(), size=stream.length)
+
+
+async def main():
+    counter = CountingApp(mock_app, args.rtt)
+    server = start_server(counter)
+    file_repo = DelayedFileRepository(args.size * 1024, args.db_rtt)
+    modes = (
+        ("sequential", 0.0, lambda service, project: upload_sequential(service, project, "bench")),
+        ("pipelined", 0.0, lambda service, project: service.upload_torus_file(project, MACHINE, "bench")),
+        ("pipelined+cache", None, lambda service, project: service.upload_torus_file(project, MACHINE, "bench")),
+    )
+    try:
+        for label, nc_ttl, upload in modes:
+            ttl = {} if nc_ttl is None else {"nc_dir_ttl": nc_ttl, "nc_index_ttl": nc_ttl}
+            service = MachineService(MachineRepository(server.base_url, **ttl), file_repo=file_repo)
+            await service.registry.refresh()
+            project = f"bench-{label}"
+            latencies = []
+            before = counter.requests
+            for _ in range(args.uploads):
+                started = time.perf_counter()
+                await upload(service, project)
+                latencies.append(time.perf_counter() - started)
+            requests = (counter.requests - before) / args.uploads
+            print(f"{label:>15}: first={latencies[0] * 1000:.1f} ms "
+                  f"p50={percentile(latencies[1:] or latencies, 50) * 1000:.1f} ms "
+                  f"gateway_requests/upload={requests:.1f}")
+            await service.aclose()
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
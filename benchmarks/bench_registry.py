@@ -0,0 +1,61 @@
+"""
+장비 한 대의 정보(제조사 등) 조회: /machine/list 재조회 vs MachineRegistry 색인 비교 벤치마크.
+
+- refetch: 호출마다 /machine/list를 조회해 MachineInfo 모델을 다시 만들고 선형 탐색 (이전 upload_torus_file 방식)
+- registry: 백그라운드로 갱신되는 MachineRegistry에서 ID로 바로 조회
+
+조회당 평균 소요 시간과 게이트웨이 요청 수를 보고한다.
+
+사용 예)
+    python benchmarks/bench_registry.py --machines 200 --lookups 500
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from common import CountingApp, start_server
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--machines", type=int, default=200, help="시뮬레이션 장비 수")
+parser.add_argument("--lookups", type=int, default=500)
+parser.add_argument("--rtt", type=float, default=0.002, help="요청당 추가 지연(초)")
+args = parser.parse_args()
+
+os.environ.setdefault("HISTORY_LOG_ENABLED", "0")
+os.environ["MOCK_FLEET_SIZE"] = str(args.machines)
+
+from main import app as mock_app
+from src.repositories.machine import MachineRepository
+from src.schemas.machine import MachineInfo, MachineListResponse
+from src.services.machine import MachineService
+
+
+async def refetch(service: MachineService, machine_id: int):
+    raw_list = await service.machine_repo.get_machine_list()
+    machines = MachineListResponse(machines=[MachineInfo(**item) for item in raw_list])
+    return next((m for m in machines.machines if m.id == machine_id), None)
+
+
+async def main():
+    counter = CountingApp(mock_app, args.rtt)
+    server = start_server(counter)
+    service = MachineService(MachineRepository(server.base_url))
+    try:
+        await service.registry.refresh()
+        for label, lookup in (("refetch", lambda i: refetch(service, i)), ("registry", service.registry.get)):
+            before = counter.requests
+            started = time.perf_counter()
+            for i in range(args.lookups):
+                machine = await lookup(i % args.machines + 1)
+                assert machine is not None
+            elapsed = time.perf_counter() - started
+            print(f"{label:>8}: machines={args.machines} per_lookup={elapsed / args.lookups * 1e6:,.0f} us "
+                  f"gateway_requests={counter.requests - before}")
+    finally:
+        await service.aclose()
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""
+고속 신호(/machine/buffer/stream/value) 수집 방식 비교 벤치마크.
+- poll: HTTP GET을 동시에 --concurrency개씩 반복 (요청 하나당 샘플 하나)
+- stream: WebSocket /stream 구독 (--rate Hz로 샘플링, --frame-ms마다 묶어서 수신)
+
+초당 수신 샘플 수와 샘플당 전송 바이트(응답 본문 기준)를 보고한다.
+
+사용 예)
+    python benchmarks/bench_stream.py --duration 5 --rate 5000
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+import websockets
+
+from common import start_server
+
+from main import app as mock_app
+
+ENDPOINT = "/machine/buffer/stream/value"
+PARAMS = {"machine": 1, "buffer": 1, "stream": 1}
+
+
+async def run_poll(base_url: str, duration: float, concurrency: int):
+    samples = 0
+    payload = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal samples, payload
+        while time.perf_counter() < deadline:
+            response = await client.get(ENDPOINT, params=PARAMS)
+            samples += 1
+            payload += len(response.content)
+
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+    return samples, payload, 0
+
+
+async def run_stream(base_url: str, duration: float, rate: float, frame_ms: float):
+    samples = payload = skipped = 0
+    url = base_url.replace("http://", "ws://") + "/stream"
+    async with websockets.connect(url) as ws:
+        await ws.send(json.dumps({"subscribe": [{"endpoint": ENDPOINT, "params": PARAMS}],
+                                  "rate": rate, "frame_ms": frame_ms}))
+        reply = json.loads(await ws.recv())
+        if reply.get("status") != 0:
+            raise RuntimeError(reply)
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            message = await ws.recv()
+            frame = json.loads(message)
+            samples += frame["n"]
+            payload += len(message)
+            skipped = frame["skipped"]
+    return samples, payload, skipped
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=5.0, help="방식별 측정 시간(초)")
+    parser.add_argument("--concurrency", type=int, default=8, help="poll 방식 동시 요청 수")
+    parser.add_argument("--rate", type=float, default=5000.0, help="stream 방식 샘플링 주기(Hz)")
+    parser.add_argument("--frame-ms", type=float, default=20.0, help="stream 방식 프레임 주기(ms)")
+    args = parser.parse_args()
+
+    server = start_server(mock_app)
+    try:
+        runs = (
+            ("poll", run_poll(server.base_url, args.duration, args.concurrency)),
+            ("stream", run_stream(server.base_url, args.duration, args.rate, args.frame_ms)),
+        )
+        for label, run in runs:
+            samples, payload, skipped = await run
+            print(f"{label:>6}: samples/s={samples / args.duration:,.0f} "
+                  f"bytes/sample={payload / max(samples, 1):.1f} skipped={skipped}")
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
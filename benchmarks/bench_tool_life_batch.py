@@ -0,0 +1,59 @@
+"""
+공구 수명 조회(MachineService.get_toolLife_info) 워크로드에서
+개별 GET 방식과 배치(POST /batch) 방식의 왕복 횟수와 소요 시간을 비교하는 벤치마크.
+
+모의 서버를 로컬 uvicorn으로 띄우고, --rtt 로 게이트웨이 왕복 지연을 요청마다 추가할 수 있다.
+
+사용 예)
+    python benchmarks/bench_tool_life_batch.py --rtt 0.005 --batch-size 100
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from common import CountingApp, start_server
+
+from main import app as mock_app
+from src.repositories.machine import MachineRepository
+from src.services.machine import MachineService
+
+
+async def measure(service: MachineService, counter: CountingApp, rounds: int):
+    durations = []
+    counter.requests = 0
+    rows = 0
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = await service.get_toolLife_info(1)
+        durations.append(time.perf_counter() - started)
+        rows = len(result) if isinstance(result, list) else 0
+    return statistics.median(durations), counter.requests / rounds, rows
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rtt", type=float, default=0.002, help="요청당 추가 지연(초)")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    counter = CountingApp(mock_app, args.rtt)
+    server = start_server(counter)
+    base_url = server.base_url
+
+    try:
+        for label, batch_size in (("single", 0), ("batch", args.batch_size)):
+            # 공구 수명 표 캐시를 쓰지 않고 호출마다 전체 표를 다시 조회
+            service = MachineService(MachineRepository(base_url, batch_size=batch_size),
+                                     tool_life_options={"structure_ttl": 0})
+            await service.get_toolLife_info(1)  # 워밍업
+            median, requests, rows = await measure(service, counter, args.rounds)
+            print(f"{label:>6}: rows={rows} http_requests/call={requests:.0f} "
+                  f"median={median * 1000:.1f} ms")
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
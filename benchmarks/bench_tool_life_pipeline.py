@@ -0,0 +1,142 @@
+"""
+공구 수명 표 전체 조회: 단계별 조회(phase barrier) vs 공구별 파이프라인 조회 비교 벤치마크.
+
+- phased: 이전 방식. 모든 공구의 날 수/수명 단위 조회가 끝난 뒤에야 날별 수명 값(최대/남은 수명, 사용 횟수)을 요청
+- pipelined: 공구마다 날 수를 받는 즉시 그 공구의 수명 값을 요청하고, 끝나는 순서대로 결과를 모음
+- stream: pipelined와 같은 조회를 stream_toolLife_info(비동기 제너레이터)로 받아 공구별 행이 도착하는 시각을 기록
+
+--tools개 공구(3번째 공구마다 날 2개)가 등록된 게이트웨이에서 요청마다 --rtt 지연이 있고,
+--slow 비율의 요청은 --slow-delay초 더 늦게 응답한다(라운드마다 같은 요청이 느림). 라운드마다 공구 수명 표를 처음부터 읽어
+전체 소요 시간 p50과, stream에서 첫 공구/절반의 공구가 도착한 시각 p50을 보고한다.
+
+사용 예)
+    python benchmarks/bench_tool_life_pipeline.py --tools 120 --slow 0.02 --slow-delay 0.3 --rounds 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+import zlib
+from urllib.parse import parse_qs
+
+from common import start_server
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--tools", type=int, default=120, help="등록된 공구 수")
+parser.add_argument("--rtt", type=float, default=0.01, help="게이트웨이 요청 왕복 지연(초)")
+parser.add_argument("--slow", type=float, default=0.02, help="느리게 응답할 요청 비율")
+parser.add_argument("--slow-delay", type=float, default=0.3, help="느린 요청의 추가 지연(초)")
+parser.add_argument("--rounds", type=int, default=5)
+args = parser.parse_args()
+
+os.environ.setdefault("HISTORY_LOG_ENABLED", "0")
+
+from src.repositories.machine import MachineRepository
+from src.services.machine import MachineService
+from src.services.toollife import LIFE_ENDPOINT, ToolLifeTable, _scalar
+
+
+class ToolGateway:
+    """공구 수명 관련 엔드포인트만 TORUS 형식으로 응답하는 게이트웨이 (ASGI). 일부 요청은 느리게 응답"""
+
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+        self.round = 0
+        self.requests = 0
+
+    @staticmethod
+    def value(field: str, tool: int):
+        return {"numberOfRegisteredTools": args.tools, "numberOfEdges": 2 if tool % 3 == 0 else 1,
+                "toolLifeUnit": 1, "maxToolLife": 1000.0, "restToolLife": 900.0 - tool,
+                "toolLifeCount": tool}.get(field)
+
+    def is_slow(self, path: str, query: bytes) -> bool:
+        return zlib.crc32(f"{self.round}{path}{query}".encode()) % 10000 < args.slow * 10000
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        self.requests += 1
+        params = parse_qs(scope["query_string"].decode())
+        delay = self.rtt + (args.slow_delay if self.is_slow(scope["path"], scope["query_string"]) else 0.0)
+        await asyncio.sleep(delay)
+        value = self.value(scope["path"].rsplit("/", 1)[1], int(params.get("registerTools", ["0"])[0]))
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": json.dumps({"status": 0, "value": [value]}).encode()})
+
+
+class PhasedToolLifeTable(ToolLifeTable):
+    """이전 방식: 모든 공구의 날 수/수명 단위 -> 모든 날의 수명 값을 단계별로 조회"""
+
+    async def _load_tools(self, machine_param: dict, count: int, on_tool=None):
+        repo = self.machine_repo
+        tools = range(1, count + 1)
+        results = await asyncio.gather(*(
+            request for tool in tools for request in (
+                repo.get_data("/machine/toolArea/registerTools/numberOfEdges",
+                              {**machine_param, "registerTools": tool}),
+                repo.get_data("/machine/toolArea/registerTools/toolLifeUnit",
+                              {**machine_param, "registerTools": tool, "toolLifeUnit": 1}),
+            )
+        ))
+        edges = {tool: _scalar(n) if isinstance(_scalar(n), int) else 1 for tool, n in zip(tools, results[0::2])}
+        keys = [(tool, edge) for tool in tools for edge in range(1, edges[tool] + 1)]
+        values = await asyncio.gather(*(
+            repo.get_data(f"{LIFE_ENDPOINT}/{field}", self._edge_params(machine_param, key, field))
+            for key in keys for field in ("maxToolLife", "restToolLife", "toolLifeCount")
+        ))
+        loaded = {tool: (True, _scalar(unit), []) for tool, unit in zip(tools, results[1::2])}
+        for i, (tool, edge) in enumerate(keys):
+            loaded[tool][2].append((edge, *values[3 * i:3 * i + 3]))
+        return loaded
+
+
+async def full_load(service: MachineService) -> float:
+    started = time.perf_counter()
+    rows = await service.get_toolLife_info(1)
+    assert len(rows) == sum(2 if tool % 3 == 0 else 1 for tool in range(1, args.tools + 1))
+    return time.perf_counter() - started
+
+
+async def stream_load(service: MachineService):
+    """(첫 공구 도착, 절반의 공구 도착, 전체) 소요 시간"""
+    started = time.perf_counter()
+    arrivals = []
+    async for rows in service.stream_toolLife_info(1):
+        assert isinstance(rows, list)
+        arrivals.append(time.perf_counter() - started)
+    assert len(arrivals) == args.tools
+    return arrivals[0], arrivals[len(arrivals) // 2], arrivals[-1]
+
+
+async def main():
+    gateway = ToolGateway(args.rtt)
+    server = start_server(gateway)
+    try:
+        results = {"phased": [], "pipelined": [], "stream": []}
+        for round_ in range(args.rounds):
+            gateway.round = round_
+            for label in results:
+                # 공구 수명 표 캐시를 쓰지 않고 라운드마다 전체 표를 처음부터 조회
+                service = MachineService(MachineRepository(server.base_url), tool_life_options={"structure_ttl": 0})
+                if label == "phased":
+                    service.tool_life = PhasedToolLifeTable(service.machine_repo, structure_ttl=0)
+                load = stream_load if label == "stream" else full_load
+                results[label].append(await load(service))
+                await service.aclose()
+
+        for label in ("phased", "pipelined"):
+            print(f"{label:>9}: full table p50={statistics.median(results[label]) * 1000:.0f} ms "
+                  f"(rounds: {' '.join(f'{t * 1000:.0f}' for t in results[label])})")
+        first, half, total = (statistics.median(values) for values in zip(*results["stream"]))
+        print(f"{'stream':>9}: first tool p50={first * 1000:.0f} ms, half of tools p50={half * 1000:.0f} ms, "
+              f"all tools p50={total * 1000:.0f} ms")
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
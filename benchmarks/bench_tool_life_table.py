@@ -0,0 +1,140 @@
+"""
+공구 수명 조회(get_toolLife_info): 매번 전체 조회 vs 장비별 공구 수명 표(ToolLifeTable) 비교 벤치마크.
+
+- full: 호출마다 공구 수 -> 공구별 날 수/수명 단위 -> 날별 최대 수명/남은 수명/사용 횟수를 모두 다시 조회
+- table: 공구 구성은 캐시하고, 최근 사용한 공구(수명 값이 바뀐 공구)만 --active-ttl초마다,
+  나머지는 --idle-ttl초마다 수명 값을 다시 조회
+- delta: table과 같되 이전 응답의 version을 넘겨 바뀐 행만 받음
+
+--tools개 공구(3번째 공구마다 날 2개)가 등록된 장비에서 공구 하나만 사용 중(--switch초마다 다른 공구로 교체)이고
+사용 중인 공구의 수명만 줄어든다. --period초마다 --duration초 동안 호출해 호출당 소요 시간 p50/p99,
+게이트웨이 요청 수(백그라운드 갱신 포함), 돌려받은 행 수, 사용 중인 공구의 남은 수명 오차(실제 값 대비 최대)를 보고한다.
+
+사용 예)
+    python benchmarks/bench_tool_life_table.py --tools 120 --rtt 0.01 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from urllib.parse import parse_qs
+
+from common import percentile, start_server
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--tools", type=int, default=120, help="등록된 공구 수")
+parser.add_argument("--rtt", type=float, default=0.01, help="게이트웨이 요청 왕복 지연(초)")
+parser.add_argument("--duration", type=float, default=10.0, help="방식별 측정 시간(초)")
+parser.add_argument("--period", type=float, default=0.5, help="호출 간격(초)")
+parser.add_argument("--switch", type=float, default=2.0, help="사용 중인 공구를 바꾸는 간격(초)")
+parser.add_argument("--active-ttl", type=float, default=0.5)
+parser.add_argument("--idle-ttl", type=float, default=5.0)
+args = parser.parse_args()
+
+os.environ.setdefault("HISTORY_LOG_ENABLED", "0")
+
+from src.repositories.machine import MachineRepository
+from src.services.machine import MachineService
+
+WEAR_RATE = 10.0  # 사용 중인 공구의 초당 수명 감소량
+
+
+class ToolGateway:
+    """공구 수명 관련 엔드포인트만 TORUS 형식으로 응답하는 게이트웨이 (ASGI). 사용 중인 공구의 수명만 줄어듦"""
+
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+        self.requests = 0
+        self.used = {tool: 0.0 for tool in range(1, args.tools + 1)}  # 공구 -> 사용 시간(초)
+        self.active = 1
+        self.active_since = time.time()
+
+    def switch(self, tool: int):
+        now = time.time()
+        self.used[self.active] += now - self.active_since
+        self.active, self.active_since = tool, now
+
+    def rest_life(self, tool: int, now: float) -> float:
+        used = self.used[tool] + (now - self.active_since if tool == self.active else 0.0)
+        return round(1000.0 - used * WEAR_RATE, 1)
+
+    def value(self, path: str, params: dict, now: float):
+        field = path.rsplit("/", 1)[1]
+        if field == "numberOfRegisteredTools":
+            return args.tools
+        tool = int(params["registerTools"][0])
+        if field == "numberOfEdges":
+            return 2 if tool % 3 == 0 else 1
+        if field == "toolLifeUnit":
+            return 1
+        if field == "maxToolLife":
+            return 1000.0
+        if field == "restToolLife":
+            return self.rest_life(tool, now)
+        if field == "toolLifeCount":
+            return int(self.used[tool] + (now - self.active_since if tool == self.active else 0.0))
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        self.requests += 1
+        await asyncio.sleep(self.rtt / 2)
+        value = self.value(scope["path"], parse_qs(scope["query_string"].decode()), time.time())
+        await asyncio.sleep(self.rtt / 2)
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": json.dumps({"status": 0, "value": [value]}).encode()})
+
+
+async def run(label: str, gateway: ToolGateway, base_url: str, options: dict, delta: bool):
+    service = MachineService(MachineRepository(base_url), tool_life_options=options)
+    table = {}
+    version = 0 if delta else None  # 0: 첫 호출은 전체 표와 version
+    durations, requests, rows, errors = [], [], [], []
+    next_switch = time.perf_counter() + args.switch
+    deadline = time.perf_counter() + args.duration
+    while time.perf_counter() < deadline:
+        if time.perf_counter() >= next_switch:
+            gateway.switch(gateway.active % args.tools + 7)
+            next_switch += args.switch
+        before = gateway.requests
+        started = time.perf_counter()
+        result = await service.get_toolLife_info(1, since=version)
+        durations.append(time.perf_counter() - started)
+        requests.append(gateway.requests - before)
+        if len(requests) == 1:
+            first_requests = gateway.requests
+        if delta:
+            version = result["version"]
+            result = result["rows"]
+        rows.append(len(result))
+        table.update({(row["registerTools"], row["toolEdges"]): row for row in result})
+        truth = gateway.rest_life(gateway.active, time.time())
+        rest = table[(gateway.active, 1)]["restToolLife"]  # 응답 값 그대로 ([값])
+        errors.append(abs((rest[0] if isinstance(rest, list) else rest) - truth))
+        await asyncio.sleep(max(0.0, args.period - durations[-1]))
+    # 첫 호출(표 구성)은 따로 보고. 이후 요청 수는 백그라운드 갱신까지 포함해 호출 수로 나눔
+    after_first = gateway.requests - first_requests
+    await service.aclose()
+    print(f"{label:>5}: first call {durations[0] * 1000:.0f} ms / {requests[0]} requests | "
+          f"after: p50={percentile(durations[1:], 50) * 1000:.1f} ms p99={percentile(durations[1:], 99) * 1000:.1f} ms "
+          f"requests/call={after_first / len(requests[1:]):.1f} rows/call={sum(rows[1:]) / len(rows[1:]):.1f} "
+          f"active_tool_error max={max(errors):.1f}")
+
+
+async def main():
+    gateway = ToolGateway(args.rtt)
+    server = start_server(gateway)
+    table_options = {"active_ttl": args.active_ttl, "idle_ttl": args.idle_ttl}
+    try:
+        await run("full", gateway, server.base_url, {"structure_ttl": 0}, delta=False)
+        await run("table", gateway, server.base_url, table_options, delta=False)
+        await run("delta", gateway, server.base_url, table_options, delta=True)
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,133 @@
+"""
+가공 상태 추적: 장비별 태스크(고정 주기) vs FleetTracker(단일 스케줄러, 가공 여부에 따른 주기) 비교 벤치마크.
+
+- per-task: 이전 방식. 장비마다 태스크 하나가 --legacy-interval초마다 programMode를 조회하고, 장비가 제거되어도 멈추지 않음
+- scheduler: FleetTracker가 하나의 루프에서 예정 시각이 된 장비만 최대 --concurrency대씩 조회.
+  가공 중인 장비는 --busy-interval, 대기 중인 장비는 --idle-interval부터 --max-idle-interval까지 간격을 늘림
+
+--busy개의 장비를 가공 중으로 간주하고, 측정 중간에 --remove개의 장비를 목록에서 제거한다.
+(기본 주기는 실제 설정(1/3/15초, 이전 3초)을 1/5로 줄인 값)
+게이트웨이 요청 수(가공/대기 장비, 제거 후 제거된 장비), 가공 중 장비의 조회 간격 p50/p99, 실행 중인 태스크 수,
+스케줄러의 예정 시각 대비 조회 시작 지연 p99를 보고한다.
+
+사용 예)
+    python benchmarks/bench_tracker.py --machines 200 --busy 20 --duration 12
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from common import CountingApp, percentile, start_server
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--machines", type=int, default=200, help="시뮬레이션 장비 수")
+parser.add_argument("--busy", type=int, default=20, help="가공 중으로 간주할 장비 수")
+parser.add_argument("--remove", type=int, default=20, help="측정 중간에 제거할 장비 수")
+parser.add_argument("--duration", type=float, default=12.0, help="방식별 측정 시간(초)")
+parser.add_argument("--legacy-interval", type=float, default=0.6)
+parser.add_argument("--busy-interval", type=float, default=0.2)
+parser.add_argument("--idle-interval", type=float, default=0.6)
+parser.add_argument("--max-idle-interval", type=float, default=3.0)
+parser.add_argument("--concurrency", type=int, default=16)
+parser.add_argument("--rtt", type=float, default=0.002, help="요청당 추가 지연(초)")
+args = parser.parse_args()
+
+os.environ.setdefault("HISTORY_LOG_ENABLED", "0")
+os.environ["MOCK_FLEET_SIZE"] = str(args.machines)
+
+from main import app as mock_app
+from src.repositories.machine import MachineRepository
+from src.services.tracker import FleetTracker
+
+
+class Workload:
+    """programMode 조회 한 번을 장비 조회로 사용하고, 장비 종류별 조회 시각을 기록"""
+
+    def __init__(self, repo: MachineRepository):
+        self.repo = repo
+        self.removed = set()
+        self.removed_at = None
+        self.polls = {}  # 장비 ID -> 조회 시각 목록
+
+    async def poll(self, machine_id: int) -> bool:
+        await self.repo.get_data("/machine/channel/currentProgram/programMode", {"machine": machine_id, "channel": 1})
+        self.polls.setdefault(machine_id, []).append(time.perf_counter())
+        return machine_id <= args.busy
+
+    def report(self, label: str, tasks: int, lags: list):
+        busy = [m for m in self.polls if m <= args.busy]
+        idle = [m for m in self.polls if m > args.busy and m not in self.removed]
+        gaps = [b - a for m in busy for a, b in zip(self.polls[m], self.polls[m][1:])]
+        after_removal = sum(1 for m in self.removed for t in self.polls.get(m, []) if t > self.removed_at)
+        lag = f"{percentile(lags, 99) * 1000:.1f} ms" if lags else "-"
+        print(f"{label:>9}: requests busy={sum(len(self.polls[m]) for m in busy)} "
+              f"idle={sum(len(self.polls[m]) for m in idle)} removed_after={after_removal} "
+              f"busy_gap p50={percentile(gaps, 50) * 1000:.0f} ms p99={percentile(gaps, 99) * 1000:.0f} ms "
+              f"tasks={tasks} scheduler_lag_p99={lag}")
+
+
+async def run_per_task(workload: Workload):
+    async def track(machine_id: int):
+        while True:
+            try:
+                await workload.poll(machine_id)
+            except Exception:
+                pass
+            await asyncio.sleep(args.legacy_interval)
+
+    tasks = [asyncio.create_task(track(m)) for m in range(1, args.machines + 1)]
+    await asyncio.sleep(args.duration / 2)
+    # 이전 방식은 장비가 제거되어도 태스크를 멈추지 않음
+    workload.removed = set(range(args.machines - args.remove + 1, args.machines + 1))
+    workload.removed_at = time.perf_counter()
+    await asyncio.sleep(args.duration / 2)
+    running = len(asyncio.all_tasks())
+    for task in tasks:
+        task.cancel()
+    return running, []
+
+
+async def run_scheduler(workload: Workload):
+    tracker = FleetTracker(workload.poll, busy_interval=args.busy_interval, idle_interval=args.idle_interval,
+                           max_idle_interval=args.max_idle_interval, concurrency=args.concurrency)
+    for machine_id in range(1, args.machines + 1):
+        tracker.add(machine_id)
+    tracker.start()
+    lags = []
+    seen = {}  # 장비 ID -> 마지막으로 확인한 조회 수 (새 조회의 지연만 기록)
+    deadline = time.perf_counter() + args.duration
+    removed = False
+    while time.perf_counter() < deadline:
+        await asyncio.sleep(0.05)
+        for machine_id, stats in tracker.stats()["by_machine"].items():
+            if stats["polls"] != seen.get(machine_id, 0):
+                seen[machine_id] = stats["polls"]
+                lags.append(stats["last_lag_ms"] / 1000)
+        if not removed and time.perf_counter() > deadline - args.duration / 2:
+            workload.removed = set(range(args.machines - args.remove + 1, args.machines + 1))
+            workload.removed_at = time.perf_counter()
+            for machine_id in workload.removed:
+                tracker.remove(machine_id)
+            removed = True
+    running = len(asyncio.all_tasks())
+    await tracker.stop()
+    return running, lags
+
+
+async def main():
+    counter = CountingApp(mock_app, args.rtt)
+    server = start_server(counter)
+    try:
+        for label, run in (("per-task", run_per_task), ("scheduler", run_scheduler)):
+            repo = MachineRepository(server.base_url)
+            workload = Workload(repo)
+            tasks, lags = await run(workload)
+            workload.report(label, tasks, lags)
+            await repo.aclose()
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,153 @@
+"""
+가공 상태 추적 한 번(tick)의 읽기: 순차 조회 vs 동시/예측 조회 비교 벤치마크.
+
+- sequential: 이전 방식. programMode -> 프로그램 경로 -> 공구 번호를 차례로 조회하고, 로그 시각은 처리 시점(datetime.now())
+- concurrent: 직전에 가공 중이었으면 세 값을 동시에 조회(왕복 1회), 아니면 programMode 확인 후 나머지 두 값을 동시에 조회.
+  로그 시각은 각 값을 읽은 샘플 시각(요청~응답의 중간)
+
+요청마다 --rtt 지연(절반은 값을 읽기 전, 절반은 읽은 후)이 있는 게이트웨이에서 장비 한 대가
+--job초 동안 가공하며 --min-tool~--max-tool초마다 공구를 바꾼다. 추적 스케줄러(FleetTracker)로 --interval초마다 조회해
+가공 중 tick 소요 시간, 기록된 공구 교체/가공 시작·종료 시각의 실제 대비 오차, 놓친 공구 수를 보고한다.
+
+사용 예)
+    python benchmarks/bench_tracker_tick.py --rtt 0.05 --interval 0.2 --job 15
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from datetime import datetime
+from urllib.parse import parse_qs
+
+from common import JobTracker, LogCollector, percentile, start_server
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--rtt", type=float, default=0.05, help="게이트웨이 요청 왕복 지연(초)")
+parser.add_argument("--interval", type=float, default=0.2, help="가공 중 조회 간격(초)")
+parser.add_argument("--job", type=float, default=15.0, help="가공 시간(초)")
+parser.add_argument("--min-tool", type=float, default=0.1, help="공구 하나의 최소 사용 시간(초)")
+parser.add_argument("--max-tool", type=float, default=1.5, help="공구 하나의 최대 사용 시간(초)")
+parser.add_argument("--seed", type=int, default=1)
+args = parser.parse_args()
+
+os.environ.setdefault("HISTORY_LOG_ENABLED", "0")
+
+from src.repositories.machine import MachineRepository
+from src.services.machine import MachineService, MachineTrackingState
+
+MACHINE = 1
+PROGRAM = "//CNC_MEM/USER/OM/bench/O1234.nc"
+
+
+class MachineGateway:
+    """장비 한 대의 가공 모드/프로그램/공구를 시간에 따라 돌려주는 게이트웨이 (ASGI)"""
+
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+        self.job_start = self.job_end = None
+        self.tools = []  # [(시작 시각, 공구 번호)]
+
+    def start_job(self, length: float, min_tool: float, max_tool: float, rng: random.Random):
+        self.job_start = time.time() + 0.5
+        self.job_end = self.job_start + length
+        self.tools = []
+        at, tool = self.job_start, 1
+        while at < self.job_end:
+            self.tools.append((at, tool))
+            at += rng.uniform(min_tool, max_tool)
+            tool += 1
+
+    def value(self, path: str, now: float):
+        busy = self.job_start is not None and self.job_start <= now < self.job_end
+        if path.endswith("/programMode"):
+            return 3 if busy else 1
+        if path.endswith("/programNameWithPath"):
+            return PROGRAM
+        if path.endswith("/toolNumber"):
+            return next((tool for at, tool in reversed(self.tools) if at <= now), 0) if busy else 0
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        await asyncio.sleep(self.rtt / 2)
+        params = parse_qs(scope["query_string"].decode())
+        assert params["machine"] == [str(MACHINE)]
+        value = self.value(scope["path"], time.time())
+        await asyncio.sleep(self.rtt / 2)
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": json.dumps({"status": 0, "value": [value]}).encode()})
+
+
+class SequentialService(MachineService):
+    """이전 방식: 세 값을 차례로 조회하고 처리 시점을 로그 시각으로 사용"""
+
+    async def _read_tracking_sample(self, machine_id: int, speculative: bool):
+        repo = self.machine_repo
+        mode = await repo.get_machine_status(machine_id)
+        if mode != 3:
+            return (mode, datetime.now()), None, None
+        program = await repo.get_current_program_name(machine_id)
+        tool = await repo.get_active_tool_number(machine_id)
+        now = datetime.now()
+        return (mode, now), (program, now), (tool, now)
+
+
+async def run(service_class, gateway: MachineGateway, base_url: str, rng: random.Random):
+    logs = LogCollector()
+    service = service_class(MachineRepository(base_url, cache_classes=None),
+                            log_repo=logs, job_tracker=JobTracker(),
+                            tracker_options={"busy_interval": args.interval, "idle_interval": args.interval,
+                                             "max_idle_interval": args.interval})
+    ticks = []
+
+    async def timed_poll(machine_id: int):
+        started = time.perf_counter()
+        busy = await service._poll_machine(machine_id)
+        if busy:
+            ticks.append(time.perf_counter() - started)
+        return busy
+
+    service.tracker.poll = timed_poll
+    gateway.start_job(args.job, args.min_tool, args.max_tool, rng)
+    service._tracking_states[MACHINE] = MachineTrackingState()
+    service.tracker.add(MACHINE)
+    service.tracker.start()
+    while not logs.docs and time.time() < gateway.job_end + 5:
+        await asyncio.sleep(0.1)
+    await service.aclose()
+    return ticks, logs.docs[0] if logs.docs else None
+
+
+def report(label: str, ticks: list, doc: dict, gateway: MachineGateway):
+    true_starts = {tool: datetime.fromtimestamp(at) for at, tool in gateway.tools}
+    errors = [abs((op["start_time"] - true_starts[op["toolNumber"]]).total_seconds())
+              for op in doc["operations"] if op["toolNumber"] in true_starts]
+    missed = len(set(true_starts) - {op["toolNumber"] for op in doc["operations"]})
+    start_error = abs((doc["start_time"] - datetime.fromtimestamp(gateway.job_start)).total_seconds())
+    finish_error = abs((doc["finish_time"] - datetime.fromtimestamp(gateway.job_end)).total_seconds())
+    print(f"{label:>10}: tick p50={percentile(ticks, 50) * 1000:.0f} ms p99={percentile(ticks, 99) * 1000:.0f} ms "
+          f"tool_start_error p50={percentile(errors, 50) * 1000:.0f} ms p90={percentile(errors, 90) * 1000:.0f} ms "
+          f"missed_tools={missed}/{len(true_starts)} job_start_error={start_error * 1000:.0f} ms "
+          f"job_finish_error={finish_error * 1000:.0f} ms")
+
+
+async def main():
+    gateway = MachineGateway(args.rtt)
+    server = start_server(gateway)
+    try:
+        for label, service_class in (("sequential", SequentialService), ("concurrent", MachineService)):
+            ticks, doc = await run(service_class, gateway, server.base_url, random.Random(args.seed))
+            if doc is None:
+                print(f"{label:>10}: no finished job was logged")
+                continue
+            report(label, ticks, doc, gateway)
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,124 @@
+"""
+uvicorn 워커 수에 따른 모의 서버 처리량과 워커 간 값 일관성 벤치마크.
+
+워커 수마다 `uvicorn main:app --workers N`을 별도 프로세스로 띄우고,
+--clients개의 부하 프로세스가 동적 엔드포인트를 반복 조회해 초당 요청 수를 잰다.
+이어서 매번 새 연결(= 임의의 워커)로 가공 시간을 조회해, 값이 뒤로 가는 횟수를 센다.
+공유 상태(MOCK_SHARED_STATE)를 켜면 모든 워커가 같은 시계를 쓰므로 0이어야 한다.
+
+사용 예)
+    python benchmarks/bench_workers.py --workers 1 2 4 --duration 5
+    python benchmarks/bench_workers.py --workers 4 --no-shared
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+from common import APP_DIR, free_port
+
+ENDPOINT = "/machine/channel/workStatus/machiningTime/processingMachiningTime"
+PARAMS = {"machine": 1, "channel": 1, "workStatus": 1}
+
+
+def wait_ready(base_url: str, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(base_url + ENDPOINT, params=PARAMS).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+def load_client(base_url: str, duration: float, concurrency: int, results):
+    """부하 프로세스 1개: concurrency개의 동시 요청을 duration초 동안 반복"""
+    async def run():
+        count = 0
+        deadline = time.perf_counter() + duration
+
+        async def worker(client):
+            nonlocal count
+            while time.perf_counter() < deadline:
+                await client.get(ENDPOINT, params=PARAMS)
+                count += 1
+
+        async with httpx.AsyncClient(base_url=base_url) as client:
+            await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        return count
+
+    results.put(asyncio.run(run()))
+
+
+def count_regressions(base_url: str, samples: int) -> int:
+    """새 연결로 가공 시간을 연속 조회했을 때 이전 값보다 작아진 횟수"""
+    regressions = 0
+    previous = None
+    for _ in range(samples):
+        with httpx.Client(base_url=base_url) as client:
+            value = client.get(ENDPOINT, params=PARAMS).json()
+        if previous is not None and value < previous:
+            regressions += 1
+        previous = value
+    return regressions
+
+
+def run_workers(workers: int, args) -> dict:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = dict(os.environ)
+    if args.shared:
+        env["MOCK_SHARED_STATE"] = f"torus_mock_bench_{port}"
+    else:
+        env.pop("MOCK_SHARED_STATE", None)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL,
+    )
+    try:
+        wait_ready(base_url)
+        time.sleep(1.0)  # 모든 워커가 뜰 때까지 대기
+
+        results = multiprocessing.Queue()
+        clients = [multiprocessing.Process(target=load_client,
+                                           args=(base_url, args.duration, args.concurrency, results))
+                   for _ in range(args.clients)]
+        for client in clients:
+            client.start()
+        total = sum(results.get() for _ in clients)
+        for client in clients:
+            client.join()
+
+        return {"rps": total / args.duration, "regressions": count_regressions(base_url, args.samples)}
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--clients", type=int, default=2, help="부하 생성 프로세스 수")
+    parser.add_argument("--concurrency", type=int, default=16, help="부하 프로세스당 동시 요청 수")
+    parser.add_argument("--samples", type=int, default=200, help="일관성 확인 조회 횟수")
+    parser.add_argument("--no-shared", dest="shared", action="store_false", help="공유 상태 없이 실행")
+    args = parser.parse_args()
+
+    print(f"cpus={os.cpu_count()} shared={args.shared}")
+    for workers in args.workers:
+        result = run_workers(workers, args)
+        print(f"workers={workers}: rps={result['rps']:,.0f} "
+              f"machiningTime regressions={result['regressions']}/{args.samples - 1}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+벤치마크 스크립트 공용 헬퍼.
+- 모의 서버(app/)와 Operation_Manager 패키지를 import 경로에 추가
+- 같은 프로세스 안에서 uvicorn 서버를 백그라운드 스레드로 실행
+- GridFS 대신 지연을 주는 NC 파일 리포지토리 (업로드 벤치마크용)
+- 장비 추적 벤치마크용 작업 추적기/로그 저장소
+"""
+import asyncio
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+APP_DIR = os.path.join(ROOT, "app")
+OPERATION_MANAGER_DIR = os.path.join(ROOT, "Operation_Manager")
+
+for _path in (ROOT, OPERATION_MANAGER_DIR, APP_DIR):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+import uvicorn
+
+
+class CountingApp:
+    """
+    HTTP 요청 수와 클라이언트 연결(주소:포트) 수를 세고, 요청마다 rtt초 지연을 추가하는 ASGI 래퍼.
+    connect_rtt를 주면 새 연결의 첫 요청에 그만큼 더 지연 (원격 게이트웨이의 TCP/TLS 연결 수립 비용 모사)
+    """
+
+    def __init__(self, app, rtt: float = 0.0, connect_rtt: float = 0.0):
+        self.app = app
+        self.rtt = rtt
+        self.connect_rtt = connect_rtt
+        self.requests = 0
+        self.clients = set()
+
+    @property
+    def connections(self) -> int:
+        return len(self.clients)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            self.requests += 1
+            client = scope.get("client")
+            if client not in self.clients:
+                self.clients.add(client)
+                if self.connect_rtt:
+                    await asyncio.sleep(self.connect_rtt)
+            if self.rtt:
+                await asyncio.sleep(self.rtt)
+        await self.app(scope, receive, send)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(app, port: int = None) -> uvicorn.Server:
+    """uvicorn 서버를 백그라운드 스레드로 시작하고 준비될 때까지 대기 (종료: server.should_exit = True)"""
+    port = port or free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    server.base_url = f"http://127.0.0.1:{port}"
+    return server
+
+
+def percentile(values, q: int) -> float:
+    """q번째 백분위수 (값이 2개 미만이면 그 값)"""
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+class DelayedNcFile:
+    """GridFS 스트림처럼 filename/length/chunks()/close()를 제공하는 O1234 프로그램 (청크마다 db_rtt 지연)"""
+
+    CHUNK_SIZE = 255 * 1024
+
+    def __init__(self, repo: "DelayedFileRepository"):
+        self.repo = repo
+        self.filename = "O1234.nc"
+        self.length = repo.size
+
+    async def chunks(self):
+        data = b"%\nO1234 (BENCH)\n" + b"N0010 G01 X1.0 Y2.0 F100\n" * (self.length // 25 + 1)
+        for start in range(0, self.length, self.CHUNK_SIZE):
+            await asyncio.sleep(self.repo.db_rtt)
+            chunk = data[start:min(start + self.CHUNK_SIZE, self.length)]
+            self.repo.bytes_read += len(chunk)
+            yield chunk
+
+    async def close(self):
+        self.repo.closes += 1
+
+
+class DelayedFileRepository:
+    """FileRepository.open_file_stream과 같은 인터페이스 (열기에 db_rtt 지연, 열기/닫기 횟수와 읽은 바이트 수를 셈)"""
+
+    def __init__(self, size: int, db_rtt: float):
+        self.size = size
+        self.db_rtt = db_rtt
+        self.opens = 0
+        self.closes = 0
+        self.bytes_read = 0
+
+    async def open_file_stream(self, file_id: str):
+        await asyncio.sleep(self.db_rtt)
+        self.opens += 1
+        return DelayedNcFile(self)
+
+
+class JobTracker:
+    """모든 프로그램을 "bench" 프로젝트로 보는 작업 추적기"""
+
+    def find_project_id_by_filename(self, filename, machine_id):
+        return "bench"
+
+    def mark_processing(self, *args):
+        pass
+
+    def mark_finished(self, *args):
+        pass
+
+
+class LogCollector:
+    """HistoryLogRepository.insert_log 대신 문서를 메모리에 모음"""
+
+    def __init__(self):
+        self.docs = []
+
+    async def insert_log(self, doc):
+        self.docs.append(doc)
@@ -0,0 +1,207 @@
+"""
+모의 서버 + MCP 도구(MachineService) 부하/지연 벤치마크.
+
+N개의 가상 에이전트가 동시에 MachineService.get_async_data / get_toolLife_info 호출을
+실제 에이전트와 비슷한 비율로 반복하고, 도구 호출 단위의 처리량(RPS), p50/p95/p99 지연,
+에러율과 게이트웨이 HTTP 요청 수를 보고한다.
+
+- 기본: 같은 프로세스 안에서 모의 서버(app/main.py)를 uvicorn 스레드로 실행
+- --url 지정 시: 이미 실행 중인 모의 서버/게이트웨이를 대상으로 측정
+
+결과는 --save 경로(JSON)에 저장되며, --baseline 파일과 비교해 p99/RPS가
+--tolerance 이상 나빠지면 종료 코드 1을 반환한다 (커밋 간 회귀 확인용).
+
+사용 예)
+    python benchmarks/load_test.py --agents 16 --duration 10 --save benchmarks/results/baseline.json
+    python benchmarks/load_test.py --agents 16 --duration 10 --baseline benchmarks/results/baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import time
+
+from common import ROOT, CountingApp, percentile, start_server
+
+# 에이전트가 get_async_data로 자주 묻는 모니터링 엔드포인트와 파라미터 생성 함수
+MONITORING_ENDPOINTS = [
+    ("/machine/cncModel", lambda m: {"machine": m}),
+    ("/machine/ncLinkState", lambda m: {"machine": m}),
+    ("/machine/channel/currentProgram/programMode", lambda m: {"machine": m, "channel": 1}),
+    ("/machine/channel/activeTool/toolNumber", lambda m: {"machine": m, "channel": 1}),
+    ("/machine/channel/axis/machinePosition", lambda m: {"machine": m, "channel": 1, "axis": random.randint(1, 4)}),
+    ("/machine/channel/axis/axisLoad", lambda m: {"machine": m, "channel": 1, "axis": random.randint(1, 4)}),
+    ("/machine/channel/spindle/rpm/actualSpeed", lambda m: {"machine": m, "channel": 1, "spindle": 1}),
+    ("/machine/channel/spindle/spindleLoad", lambda m: {"machine": m, "channel": 1, "spindle": 1}),
+    ("/machine/channel/workStatus/workCounter/currentWorkCounter", lambda m: {"machine": m, "channel": 1, "workStatus": 1}),
+    ("/machine/channel/alarm/alarmNumber", lambda m: {"machine": m, "channel": 1, "alarm": 1}),
+    ("/machine/ncMemory/usedCapacity", lambda m: {"machine": m}),
+]
+
+
+def _is_error(result) -> bool:
+    return isinstance(result, dict) and result.get("__error__")
+
+
+class AgentStats:
+    def __init__(self):
+        self.latencies = {"get_async_data": [], "get_toolLife_info": []}
+        self.items = 0
+        self.item_errors = 0
+        self.call_errors = 0
+
+
+async def run_agent(service, stats: AgentStats, deadline: float, machines: int,
+                    toollife_ratio: float, think_time: float):
+    """가상 에이전트 1개: 도구 호출 -> (생각 시간) -> 도구 호출 ... 반복"""
+    while time.perf_counter() < deadline:
+        machine = random.randint(1, machines)
+        started = time.perf_counter()
+        try:
+            if random.random() < toollife_ratio:
+                tool = "get_toolLife_info"
+                results = await service.get_toolLife_info(machine)
+                results = results if isinstance(results, list) else [results]
+            else:
+                tool = "get_async_data"
+                picks = random.sample(MONITORING_ENDPOINTS, random.randint(3, len(MONITORING_ENDPOINTS)))
+                results = await service.get_async_data(
+                    [endpoint for endpoint, _ in picks],
+                    [make_params(machine) for _, make_params in picks],
+                )
+        except Exception:
+            stats.call_errors += 1
+            continue
+        stats.latencies[tool].append(time.perf_counter() - started)
+
+        flat = []
+        for row in results:
+            flat.extend(row.values() if isinstance(row, dict) and not _is_error(row) else [row])
+        stats.items += len(flat)
+        stats.item_errors += sum(1 for value in flat if _is_error(value) or value == "error")
+
+        if think_time:
+            await asyncio.sleep(random.uniform(0, think_time * 2))
+
+
+def summarize(stats: AgentStats, elapsed: float, http_requests) -> dict:
+    all_latencies = [v for values in stats.latencies.values() for v in values]
+    calls = len(all_latencies)
+
+    def latency_summary(values):
+        if not values:
+            return None
+        return {
+            "count": len(values),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+        }
+
+    return {
+        "duration_s": round(elapsed, 2),
+        "tool_calls": calls,
+        "rps": round(calls / elapsed, 1),
+        "http_requests": http_requests,
+        "http_rps": round(http_requests / elapsed, 1) if http_requests is not None else None,
+        "error_rate": round((stats.item_errors + stats.call_errors) / max(stats.items + stats.call_errors, 1), 4),
+        "latency": latency_summary(all_latencies),
+        "by_tool": {tool: latency_summary(values) for tool, values in stats.latencies.items()},
+    }
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> bool:
+    """기준 결과 대비 RPS 감소/p99 증가가 tolerance를 넘으면 False"""
+    ok = True
+    checks = [
+        ("rps", result["rps"], baseline["rps"], -1),
+        ("p99_ms", result["latency"]["p99_ms"], baseline["latency"]["p99_ms"], 1),
+    ]
+    for name, current, previous, direction in checks:
+        change = (current - previous) / previous if previous else 0.0
+        regressed = change * direction > tolerance
+        ok = ok and not regressed
+        mark = "REGRESSION" if regressed else "ok"
+        print(f"  {name:>7}: {previous} -> {current} ({change:+.1%}) {mark}")
+    return ok
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="대상 서버 주소 (미지정 시 프로세스 내 uvicorn)")
+    parser.add_argument("--agents", type=int, default=16, help="동시 에이전트 수")
+    parser.add_argument("--duration", type=float, default=10.0, help="측정 시간(초)")
+    parser.add_argument("--machines", type=int, default=10, help="요청을 분산할 장비 수")
+    parser.add_argument("--toollife-ratio", type=float, default=0.1, help="get_toolLife_info 호출 비율")
+    parser.add_argument("--think-time", type=float, default=0.0, help="에이전트 호출 간 평균 대기(초)")
+    parser.add_argument("--rtt", type=float, default=0.0, help="프로세스 내 서버의 요청당 추가 지연(초)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save", default=None, help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", default=None, help="비교할 기준 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="허용 회귀 비율")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    # 부하 테스트 중에는 MongoDB 이력 저장을 하지 않음
+    os.environ.setdefault("HISTORY_LOG_ENABLED", "0")
+    os.environ.setdefault("MOCK_FLEET_SIZE", str(args.machines))
+    os.environ.setdefault("MOCK_FLEET_SEED", str(args.seed))
+
+    from src.repositories import get_machine_repository
+    from src.services.machine import MachineService
+
+    server = counter = None
+    if args.url:
+        os.environ["TORUS_GATEWAY_URL"] = args.url
+    else:
+        from main import app as mock_app
+        counter = CountingApp(mock_app, args.rtt)
+        server = start_server(counter)
+        os.environ["TORUS_GATEWAY_URL"] = server.base_url
+
+    service = MachineService(await get_machine_repository())
+    try:
+        stats = AgentStats()
+        started = time.perf_counter()
+        if counter is not None:
+            counter.requests = 0
+        await asyncio.gather(*(
+            run_agent(service, stats, started + args.duration, args.machines,
+                      args.toollife_ratio, args.think_time)
+            for _ in range(args.agents)
+        ))
+        elapsed = time.perf_counter() - started
+        result = summarize(stats, elapsed, counter.requests if counter is not None else None)
+    finally:
+        await service.aclose()
+        if server is not None:
+            server.should_exit = True
+
+    result["config"] = {k: v for k, v in vars(args).items() if k not in ("save", "baseline")}
+    result["commit"] = _git_commit()
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"baseline {baseline.get('commit')} -> current {result['commit']}")
+        return 0 if compare(result, baseline, args.tolerance) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(main()))